@@ -0,0 +1,58 @@
+# ----------------------------
+# Dados sintéticos compartilhados pelos benchmarks
+# ----------------------------
+# run.py e os scripts por tema usam os mesmos geradores (mesma semente, mesmos
+# formatos), então uma base salva por run.py mede as mesmas entradas que os
+# scripts avulsos.
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from setpoint import carregar_tabela_valvulas
+from setpoint.dados import COLUNA_CAPACIDADE, COLUNA_SETTING, TabelaValvulas
+from setpoint.hidraulica import CATALOGO_TUBOS, COLUNA_COMPRIMENTO, COLUNA_DIAMETRO, COLUNA_TRECHO
+from setpoint.hidraulica import COLUNA_VAZAO_M3H as COLUNA_VAZAO_TRECHO
+from setpoint.lote import COLUNA_UNIDADE, COLUNA_VAZAO_M3H
+from setpoint.selecao import capacidade_to_dn
+
+
+def tabela_valvulas_sintetica(n_settings: int, n_dns: int, seed: int = 0) -> TabelaValvulas:
+    """Curvas crescentes com ruído; os DNs da tabela real vêm primeiro."""
+    rng = np.random.default_rng(seed)
+    reais = carregar_tabela_valvulas(os.path.join(RAIZ, "tabela_valvulas.xlsx")).dn_options
+    nomes = list(reais) + [f"DN{i:03d} X (L/h)" for i in range(max(n_dns - len(reais), 0))]
+    settings = np.linspace(1, 100, n_settings).round(2)
+    base = settings / 100
+    colunas = {COLUNA_SETTING: settings}
+    for nome, fator in zip(nomes, rng.uniform(200, 6000, len(nomes))):
+        colunas[nome] = np.maximum.accumulate(base * fator + rng.normal(0, fator * 1e-4, n_settings)).round(1)
+    df = pd.DataFrame(colunas)
+    versao = hashlib.sha256(pd.util.hash_pandas_object(df).to_numpy().tobytes()).hexdigest()
+    return TabelaValvulas(df=df, dn_options=nomes, versao=versao)
+
+
+def unidades_sinteticas(n: int, seed: int = 0) -> pd.DataFrame:
+    """Planilha de unidades (ler_planilha_unidades) com capacidades do mapa padrão."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        COLUNA_UNIDADE: [f"FC-{i:06d}" for i in range(n)],
+        COLUNA_CAPACIDADE: rng.choice(np.array(sorted(capacidade_to_dn)), n),
+        COLUNA_VAZAO_M3H: rng.uniform(0.05, 4.5, n),
+    })
+
+
+def trechos_sinteticos(n: int, seed: int = 0) -> pd.DataFrame:
+    """Trechos de prumada (calcular_prumada) com diâmetros do catálogo."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        COLUNA_TRECHO: [f"T-{i:06d}" for i in range(n)],
+        COLUNA_VAZAO_TRECHO: rng.uniform(0.05, 20.0, n),
+        COLUNA_DIAMETRO: rng.choice(list(CATALOGO_TUBOS.values()), n),
+        COLUNA_COMPRIMENTO: rng.uniform(1.0, 30.0, n),
+    })
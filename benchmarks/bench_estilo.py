@@ -0,0 +1,72 @@
+# ----------------------------
+# Benchmark: estilo neon da tabela (por linha x vetorizado)
+# ----------------------------
+# Compara a neon_pulse_style original (Styler.apply por linha) com
+# setpoint.estilo em tabelas sintéticas com centenas de colunas DN, e
+# confere que as duas geram o mesmo CSS.
+# Uso: python benchmarks/bench_estilo.py
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from _dados import tabela_valvulas_sintetica
+from setpoint.estilo import aplicar_estilo_neon, estilo_neon_frame
+
+COR = "#ff0000"
+
+
+def estilo_por_linha(df, dn_choice, vazao_lh, ajuste=1):
+    # Cópia da neon_pulse_style original do main.py
+    def neon_pulse_style(row):
+        styles = []
+        for col in df.columns:
+            if col == dn_choice and ajuste is not None:
+                if row[col] == vazao_lh:
+                    styles.append(f"background-color: {COR}; color: #000; font-weight: bold;")
+                else:
+                    diff = abs(row[col] - vazao_lh)
+                    intensity = max(0, 1 - diff / vazao_lh)
+                    styles.append(f"text-shadow: 0 0 {5*intensity}px {COR}; color: {COR};")
+            else:
+                styles.append("")
+        return styles
+    return df.style.apply(neon_pulse_style, axis=1)
+
+
+def estilo_vetorizado(df, dn_choice, vazao_lh):
+    return aplicar_estilo_neon(df, estilo_neon_frame(df, dn_choice, vazao_lh, COR))
+
+
+def medir(funcao, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()._compute()
+        tempos.append(time.perf_counter() - t0)
+    return statistics.median(tempos)
+
+
+def main():
+    for n_settings, n_dns in [(19, 9), (19, 200), (200, 200), (1000, 500)]:
+        df = tabela_valvulas_sintetica(n_settings, n_dns).df
+        dn = df.columns[n_dns // 2 + 1]
+        vazao = float(df[dn].iloc[n_settings // 3])
+
+        antigo = estilo_por_linha(df, dn, vazao)
+        novo = estilo_vetorizado(df, dn, vazao)
+        antigo._compute()
+        novo._compute()
+        assert antigo.ctx == novo.ctx, "CSS diferente entre as implementações"
+
+        t_antigo = medir(lambda: estilo_por_linha(df, dn, vazao))
+        t_novo = medir(lambda: estilo_vetorizado(df, dn, vazao))
+        print(f"{n_settings:5d} settings x {n_dns:4d} DNs: por linha {t_antigo*1000:9.1f} ms | "
+              f"vetorizado {t_novo*1000:8.1f} ms | {t_antigo / t_novo:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ----------------------------
+# Benchmark: exportação Excel do lote (constant_memory x pandas.to_excel)
+# ----------------------------
+# Uso: python benchmarks/bench_excel.py [n_unidades]
+# Cada variante roda num processo novo para que o pico de memória (ru_maxrss)
+# de uma não esconda o da outra.
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir(variante: str, n: int):
+    from _dados import unidades_sinteticas
+    from setpoint import carregar_tabela_valvulas, dimensionar_lote
+    from setpoint.exportacao import gerar_excel_lote
+
+    tabela = carregar_tabela_valvulas(os.path.join(RAIZ, "tabela_valvulas.xlsx"))
+    df_lote = dimensionar_lote(unidades_sinteticas(n), tabela)
+    destino = os.path.join(tempfile.gettempdir(), f"bench_excel_{variante}.xlsx")
+
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if variante == "constant_memory":
+        gerar_excel_lote(df_lote, tabela.df, destino)
+    else:
+        df_lote.to_excel(destino, index=False, engine="xlsxwriter")
+    tempo = time.perf_counter() - t0
+    pico = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - antes) / 1024
+    print(f"{variante:>16}: {tempo:6.2f} s | +{pico:7.1f} MB de pico | "
+          f"{os.path.getsize(destino) / 1e6:.1f} MB no disco")
+    os.remove(destino)
+
+
+def main():
+    if len(sys.argv) > 2:
+        medir(sys.argv[2], int(sys.argv[1]))
+        return
+    n = sys.argv[1] if len(sys.argv) > 1 else "200000"
+    print(f"{n} unidades")
+    for variante in ("pandas", "constant_memory"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), n, variante], check=True)
+
+
+if __name__ == "__main__":
+    main()
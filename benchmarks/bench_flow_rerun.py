@@ -0,0 +1,158 @@
+# ----------------------------
+# Benchmark: payload e latência de rerun do Flow Dashboard
+# ----------------------------
+# Uso: python benchmarks/bench_flow_rerun.py [revisão_git_para_comparar]
+# Sobe `streamlit run pages/Flow.py` de verdade e conversa com ele pelo
+# websocket como o navegador faz (BackMsg/ForwardMsg), incluindo o cache de
+# mensagens do navegador (cached_message_hashes). Para cada interação mede
+# os bytes recebidos e o tempo até o script_finished. Com uma revisão git, a
+# mesma medição roda também no Flow.py daquela revisão (com o
+# minCachedMessageSize padrão), para comparar.
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+REPETICOES = 7
+
+# Script mínimo com os mesmos widgets: mede o piso de latência do servidor
+# (laço do runtime + websocket), que não depende da página
+SCRIPT_VAZIO = """
+import streamlit as st
+st.checkbox("Mostrar tabela detalhada")
+st.number_input("Velocidade do fluido (m/s)")
+"""
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Cliente:
+    def __init__(self, ws):
+        self.ws = ws
+        self.cache: set[str] = set()
+        self.widgets: dict[str, tuple[str, str]] = {}   # rótulo -> (id, fragment_id)
+
+    async def rerun(self, widgets=(), fragment_id: str = "") -> tuple[int, float]:
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(widgets)
+        msg.rerun_script.cached_message_hashes.extend(self.cache)
+        msg.rerun_script.fragment_id = fragment_id
+        t0 = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+
+        recebidos = 0
+        while True:
+            bruto = await self.ws.read_message()
+            recebidos += len(bruto)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(bruto)
+            if fwd.metadata.cacheable:
+                self.cache.add(fwd.hash)
+            if fwd.WhichOneof("type") == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                elemento = fwd.delta.new_element
+                tipo = elemento.WhichOneof("type")
+                widget = getattr(elemento, tipo)
+                if hasattr(widget, "label") and hasattr(widget, "id") and widget.id:
+                    self.widgets[widget.label] = (widget.id, fwd.delta.fragment_id)
+            if fwd.WhichOneof("type") == "script_finished":
+                return recebidos, time.perf_counter() - t0
+
+
+def estado(widget_id: str, **valor):
+    w = WidgetState(id=widget_id)
+    for campo, v in valor.items():
+        setattr(w, campo, v)
+    return w
+
+
+async def medir(porta: int):
+    ws = await websocket_connect(f"ws://127.0.0.1:{porta}/_stcore/stream")
+    cliente = Cliente(ws)
+    await cliente.rerun()       # carga inicial
+    await cliente.rerun()       # browser já com o cache preenchido
+
+    cenarios = {}
+
+    async def repetir(nome, gerar):
+        bytes_, tempos = [], []
+        for i in range(REPETICOES):
+            widgets, fragmento = gerar(i)
+            b, t = await cliente.rerun(widgets, fragmento)
+            bytes_.append(b)
+            tempos.append(t)
+        cenarios[nome] = (statistics.median(bytes_), statistics.median(tempos))
+
+    await repetir("rerun sem mudança", lambda i: ((), ""))
+
+    id_tabela, frag_tabela = cliente.widgets["Mostrar tabela detalhada"]
+    await repetir("checkbox da tabela",
+                  lambda i: ([estado(id_tabela, bool_value=i % 2 == 0)], frag_tabela))
+
+    id_vel, _ = cliente.widgets["Velocidade do fluido (m/s)"]
+    await repetir("velocidade (gauges iguais)",
+                  lambda i: ([estado(id_vel, double_value=1.0 + (i % 2) * 0.1)], ""))
+
+    ws.close()
+    return cenarios
+
+
+def rodar(pagina: str, extra_args=()) -> dict:
+    porta = porta_livre()
+    env = dict(os.environ, PYTHONPATH=RAIZ)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", pagina, "--server.headless", "true",
+         "--server.port", str(porta), "--browser.gatherUsageStats", "false", *extra_args],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", porta), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        return asyncio.run(medir(porta))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def imprimir(titulo: str, cenarios: dict):
+    print(titulo)
+    for nome, (b, t) in cenarios.items():
+        print(f"  {nome:<30} {b / 1024:8.1f} KB  {t * 1000:7.1f} ms")
+
+
+def main():
+    pasta = tempfile.mkdtemp()
+    vazio = os.path.join(pasta, "vazio.py")
+    with open(vazio, "w") as f:
+        f.write(SCRIPT_VAZIO)
+    imprimir("piso (script vazio)", rodar(vazio))
+
+    imprimir("atual", rodar(os.path.join("pages", "Flow.py")))
+    if len(sys.argv) > 1:
+        revisao = sys.argv[1]
+        antigo = os.path.join(pasta, "Flow.py")
+        with open(antigo, "wb") as f:
+            f.write(subprocess.check_output(["git", "show", f"{revisao}:pages/Flow.py"], cwd=RAIZ))
+        imprimir(f"{revisao}", rodar(antigo, ["--global.minCachedMessageSize", "10000"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# ----------------------------
+# Benchmark: gráfico de comparação de DNs (px.line x figura_curvas)
+# ----------------------------
+# Uso: python benchmarks/bench_grafico_curvas.py [n_settings] [n_dns_comparados]
+# Mede, numa tabela sintética, o tempo de montar a figura como o main.py
+# fazia (px.line + uma cópia do DataFrame por DN), o de figura_curvas sem
+# cache (com e sem LTTB) e com cache, e o tempo (o st.plotly_chart serializa
+# a figura a cada rerun) e o tamanho do JSON enviado ao navegador.
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from setpoint import grafico_curvas
+from setpoint.grafico_curvas import figura_curvas
+
+
+def figura_antiga(df_valvulas, dn_choice, dn_comparar, ajuste, vazao_lh, cor_titulo):
+    # Trecho do main.py antes do cache
+    import plotly.express as px
+
+    df_plot = df_valvulas[['Setting (%)', dn_choice]].copy()
+    fig = px.line(df_plot, x='Setting (%)', y=dn_choice, markers=True,
+                  labels={'Setting (%)': 'Setting (%)', dn_choice: 'Vazão (L/h)'},
+                  title=f"Curva de ajuste {dn_choice}")
+    fig.add_scatter(x=[ajuste], y=[vazao_lh], mode='markers+text',
+                    marker=dict(color='red', size=14, symbol='star'),
+                    text=[f"💧 {vazao_lh:.0f} L/h"], textposition='top center', name='Ponto recomendado')
+    for dn in dn_comparar:
+        df_tmp = df_valvulas[['Setting (%)', dn]].copy()
+        fig.add_scatter(x=df_tmp['Setting (%)'], y=df_tmp[dn], mode='lines+markers', name=f"DN {dn}")
+    fig.update_layout(template='plotly_dark', title_font=dict(family='Orbitron, monospace', size=22, color=cor_titulo),
+                      legend=dict(title='Legenda', font=dict(family='Orbitron, monospace', size=12)),
+                      xaxis=dict(title='Setting (%)', showgrid=True, gridcolor='#333'),
+                      yaxis=dict(title='Vazão (L/h)', showgrid=True, gridcolor='#333'),
+                      plot_bgcolor='#111111', paper_bgcolor='#111111')
+    return fig
+
+
+def cronometrar(func, repeticoes: int = 5) -> tuple[float, object]:
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, resultado
+
+
+def main():
+    from _dados import tabela_valvulas_sintetica
+
+    n_settings = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_comparados = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    tabela = tabela_valvulas_sintetica(n_settings, n_comparados + 1)
+    dn_choice, dn_comparar = tabela.dn_options[0], tuple(tabela.dn_options[1:n_comparados + 1])
+    ajuste, vazao = 50.0, float(tabela.df[dn_choice].iloc[n_settings // 2])
+    print(f"{n_settings} settings, 1 + {len(dn_comparar)} DNs")
+
+    def sem_cache(**opcoes):
+        def montar():
+            grafico_curvas._cache.clear()
+            return figura_curvas(tabela, dn_choice, dn_comparar, ajuste, vazao, "#ff0000", **opcoes)
+        return montar
+
+    casos = [
+        ("px.line + cópias (antes)", lambda: figura_antiga(tabela.df, dn_choice, dn_comparar, ajuste, vazao, "#ff0000")),
+        ("figura_curvas sem LTTB", sem_cache(max_pontos=n_settings)),
+        ("figura_curvas, LTTB 500", sem_cache()),
+        ("figura_curvas, LTTB, WebGL", sem_cache(webgl=True)),
+        ("figura_curvas em cache", lambda: figura_curvas(tabela, dn_choice, dn_comparar, ajuste, vazao, "#ff0000")),
+    ]
+    for nome, func in casos:
+        segundos, fig = cronometrar(func)
+        serializar, json_fig = cronometrar(fig.to_json, 3)
+        print(f"  {nome:<28} montar {segundos * 1000:8.2f} ms | to_json {serializar * 1000:7.2f} ms"
+              f" | {len(json_fig) / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# ----------------------------
+# Benchmark: verificação hidráulica de prumadas
+# ----------------------------
+# Uso: python benchmarks/bench_hidraulica.py [n_trechos]
+# Compara calcular_prumada (Colebrook vetorizado) com um laço trecho a trecho
+# usando math e a mesma iteração de Colebrook.
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from _dados import trechos_sinteticos
+from setpoint.fluidos import AGUA, propriedades
+from setpoint.hidraulica import (
+    COLUNA_DIAMETRO,
+    COLUNA_VAZAO_M3H,
+    RE_LAMINAR,
+    RUGOSIDADE_MM,
+    calcular_prumada,
+)
+
+RUGOSIDADE = RUGOSIDADE_MM["Aço carbono"]
+
+
+def perda_escalar(vazao_m3h, diametro_mm, rho, mu):
+    d = diametro_mm / 1000
+    v = vazao_m3h / 3600 / (math.pi * d * d / 4)
+    re = rho * v * d / mu
+    if re < RE_LAMINAR:
+        f = 64 / re
+    else:
+        eps = RUGOSIDADE / diametro_mm
+        x = -2 * math.log10(eps / 3.7 + 5.74 / re ** 0.9)
+        for _ in range(50):
+            novo = -2 * math.log10(eps / 3.7 + 2.51 * x / re)
+            if abs(novo - x) < 1e-10:
+                x = novo
+                break
+            x = novo
+        f = 1 / (x * x)
+    return f / d * rho * v * v / 2
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    props = propriedades(AGUA, 10.0)
+    trechos = trechos_sinteticos(n)
+
+    tempos = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        resultado = calcular_prumada(trechos, props.rho, props.mu, RUGOSIDADE)
+        tempos.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    escalar = [perda_escalar(q, d, props.rho, props.mu)
+               for q, d in zip(trechos[COLUNA_VAZAO_M3H], trechos[COLUNA_DIAMETRO])]
+    tempo_escalar = time.perf_counter() - t0
+
+    np.testing.assert_allclose(resultado["Perda (Pa/m)"].to_numpy(), escalar, rtol=1e-9)
+    print(f"{n} trechos")
+    print(f"  vetorizado: melhor {min(tempos)*1000:.1f} ms | mediana {np.median(tempos)*1000:.1f} ms")
+    print(f"  escalar:    {tempo_escalar*1000:.1f} ms ({tempo_escalar / min(tempos):.0f}x)")
+    print(f"  perda total: {resultado['Perda no trecho (kPa)'].sum():.0f} kPa")
+
+
+if __name__ == "__main__":
+    main()
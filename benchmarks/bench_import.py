@@ -0,0 +1,62 @@
+# ----------------------------
+# Benchmark: tempo de import na partida do main.py
+# ----------------------------
+# Cada cenário roda num interpretador novo, várias vezes; mostra a mediana.
+# streamlit e pandas já estão carregados no servidor, então são importados
+# antes do cronômetro. "antes" reproduz os imports de topo que o main.py fazia
+# em toda execução; "depois" são os imports de topo do main.py atual, lidos
+# do próprio arquivo (acompanham o que ele importa até o primeiro gráfico/PDF
+# ser pedido).
+# Uso: python benchmarks/bench_import.py [repetições]
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imports_do_main() -> str:
+    """Imports de nível de módulo do main.py, na ordem do arquivo."""
+    with open(os.path.join(RAIZ, "main.py"), encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    return "\n".join(ast.unparse(no) for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom)))
+
+
+CENARIOS = {
+    "antes (plotly + reportlab no topo)": """
+import base64, re
+import plotly.express, plotly.graph_objects, plotly.io
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+""",
+    "depois (imports do main.py atual)": imports_do_main() + """
+importlib.util.find_spec("plotly"); importlib.util.find_spec("reportlab")
+""",
+    "só o núcleo de cálculo (setpoint.fluxo)": """
+import setpoint.fluxo
+""",
+}
+
+
+def medir(codigo: str) -> float:
+    script = "import streamlit, pandas, time; t0 = time.perf_counter()\n" + codigo + "\nprint(time.perf_counter() - t0)"
+    saida = subprocess.run(
+        [sys.executable, "-c", script], cwd=RAIZ, check=True, capture_output=True, text=True,
+    )
+    return float(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for nome, codigo in CENARIOS.items():
+        tempos = [medir(codigo) for _ in range(repeticoes)]
+        print(f"{nome:45s} mediana {statistics.median(tempos)*1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
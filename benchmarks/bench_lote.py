@@ -0,0 +1,36 @@
+# ----------------------------
+# Benchmark: dimensionamento em lote
+# ----------------------------
+# Uso: python benchmarks/bench_lote.py [n_unidades]
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from _dados import unidades_sinteticas
+from setpoint import carregar_tabela_valvulas
+from setpoint.lote import dimensionar_lote
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tabela = carregar_tabela_valvulas(os.path.join(RAIZ, "tabela_valvulas.xlsx"))
+    unidades = unidades_sinteticas(n)
+    tabela.indice  # construção do índice fora da medição
+
+    tempos = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        resultado = dimensionar_lote(unidades, tabela)
+        tempos.append(time.perf_counter() - t0)
+
+    print(f"{n} unidades: melhor {min(tempos)*1000:.1f} ms | mediana {np.median(tempos)*1000:.1f} ms")
+    print(f"sem DN: {int(resultado['DN'].isna().sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# ----------------------------
+# Benchmark: gráfico do PDF nativo (reportlab) x plotly/Kaleido
+# ----------------------------
+# Uso: python benchmarks/bench_pdf.py [repetições]
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from setpoint import carregar_tabela_valvulas
+from setpoint.relatorio import RENDERIZADORES, gerar_pdf_premium
+
+
+def sem_grafico(*args):
+    # Referência: relatório sem gráfico, para isolar o custo de cada caminho
+    from reportlab.platypus import Spacer
+    return Spacer(1, 1)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    tabela = carregar_tabela_valvulas(os.path.join(RAIZ, "tabela_valvulas.xlsx"))
+    dns = tabela.dn_options[1:5]
+    logo = os.path.join(RAIZ, "logo_fabricante.png")
+
+    cenarios = {"sem gráfico": sem_grafico, **RENDERIZADORES}
+    for nome, renderizador in cenarios.items():
+        # O caminho plotly depende do Kaleido + Chrome; sem eles o relatório
+        # sai com a mensagem de erro no lugar do gráfico
+        try:
+            renderizador(dns, tabela.df, tabela.indice, 40, 480.0)
+        except Exception as erro:
+            print(f"{nome:12s} indisponível: {str(erro).strip().splitlines()[0]}")
+            continue
+
+        tempos = []
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            pdf = gerar_pdf_premium(dns, tabela.df, "benchmark", 40, 480.0, logo_path=logo,
+                                    indice=tabela.indice, renderizador=renderizador)
+            tempos.append(time.perf_counter() - t0)
+        print(f"{nome:12s} mediana {statistics.median(tempos)*1000:8.1f} ms | PDF {len(pdf)/1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# ----------------------------
+# Benchmark: custo dos cronômetros de setpoint.rastreio
+# ----------------------------
+# Uso: python benchmarks/bench_rastreio.py [n_chamadas]
+# Mede o custo por chamada de uma função decorada com @rastrear desligado e
+# ligado, contra a função original (__wrapped__), e do `with medir(...)`.
+import os
+import sys
+import timeit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from setpoint import rastreio
+from setpoint.selecao import find_matching_dn_column
+
+
+def por_chamada(func, n: int) -> float:
+    return min(timeit.repeat(func, number=n, repeat=5)) / n * 1e9
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    opcoes = ["DN 10", "DN 15 L/h", "DN 15 HF", "DN 20 HF"]
+    original = find_matching_dn_column.__wrapped__
+
+    base = por_chamada(lambda: original("DN 15 HF", opcoes), n)
+    rastreio.ativar(False)
+    desligado = por_chamada(lambda: find_matching_dn_column("DN 15 HF", opcoes), n)
+
+    def bloco():
+        with rastreio.medir("bloco"):
+            pass
+    bloco_desligado = por_chamada(bloco, n)
+
+    rastreio.ativar(True)
+    ligado = por_chamada(lambda: find_matching_dn_column("DN 15 HF", opcoes), n)
+    bloco_ligado = por_chamada(bloco, n)
+
+    print(f"find_matching_dn_column ({n} chamadas)")
+    print(f"  original:         {base:7.0f} ns")
+    print(f"  @rastrear off:    {desligado:7.0f} ns (+{desligado - base:.0f} ns)")
+    print(f"  @rastrear on:     {ligado:7.0f} ns (+{ligado - base:.0f} ns)")
+    print(f"with medir(): off {bloco_desligado:.0f} ns | on {bloco_ligado:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ----------------------------
+# Benchmark: revalidação incremental de projetos salvos (setpoint.resultados)
+# ----------------------------
+# Uso: python benchmarks/bench_resultados.py [n_valvulas] [n_settings] [n_dns]
+# Salva um projeto com n válvulas espalhadas por todos os DNs de uma tabela
+# sintética e mede revalidar() depois de alterar 1, 10 e todos os DNs da
+# tabela (algumas linhas de cada), contra o redimensionamento completo
+# (solver em todas as válvulas + regravar o projeto).
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from setpoint.dados import COLUNA_CAPACIDADE, TabelaValvulas
+from setpoint.lote import COLUNA_UNIDADE, COLUNAS_RESULTADO
+from setpoint.resultados import ArmazemResultados
+
+
+def projeto_sintetico(tabela: TabelaValvulas, n: int, seed: int = 0) -> pd.DataFrame:
+    """Planilha de dimensionar_lote com DN escolhido à mão (todos os DNs)."""
+    rng = np.random.default_rng(seed)
+    dns = rng.choice(np.array(tabela.dn_options, dtype=object), n)
+    vazoes = np.empty(n)
+    ajuste = np.empty(n)
+    vazao_ajustada = np.empty(n)
+    for dn in tabela.dn_options:
+        sel = np.flatnonzero(dns == dn)
+        curva = tabela.df[dn].to_numpy(dtype=float)
+        vazoes[sel] = rng.uniform(np.nanmin(curva), np.nanmax(curva), len(sel))
+        ajuste[sel], vazao_ajustada[sel], _ = tabela.solver.resolver(dn, vazoes[sel])
+    return pd.DataFrame({
+        COLUNA_UNIDADE: [f"FC-{i:07d}" for i in range(n)],
+        COLUNA_CAPACIDADE: np.nan,
+        "DN": dns,
+        "Vazão projeto (L/h)": vazoes,
+        "Ajuste (%)": ajuste,
+        "Vazão ajustada (L/h)": vazao_ajustada,
+        "Desvio (%)": (vazao_ajustada - vazoes) / vazoes * 100,
+    }, columns=COLUNAS_RESULTADO)
+
+
+def tabela_alterada(tabela: TabelaValvulas, n_dns: int, nome: str, seed: int = 1) -> TabelaValvulas:
+    # Algumas linhas de n_dns colunas sobem 5%, mantendo a curva crescente
+    rng = np.random.default_rng(seed)
+    df = tabela.df.copy()
+    for dn in tabela.dn_options[:n_dns]:
+        linhas = rng.choice(len(df), 3, replace=False)
+        coluna = df[dn].to_numpy(dtype=float).copy()
+        coluna[linhas] *= 1.05
+        df[dn] = np.maximum.accumulate(coluna)
+    return TabelaValvulas(df=df, dn_options=tabela.dn_options, versao=f"{tabela.versao[:16]}-{nome}")
+
+
+def main():
+    from _dados import tabela_valvulas_sintetica
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_settings = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    n_dns = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    tabela = tabela_valvulas_sintetica(n_settings, n_dns)
+    projeto = projeto_sintetico(tabela, n)
+    print(f"{n} válvulas, tabela {n_settings} settings x {n_dns} DNs")
+
+    pasta = tempfile.mkdtemp()
+    try:
+        armazem = ArmazemResultados(os.path.join(pasta, "resultados.sqlite"))
+        t0 = time.perf_counter()
+        armazem.salvar_lote("obra", projeto, tabela, automatico=False)
+        print(f"  salvar projeto                 {time.perf_counter() - t0:7.2f} s")
+
+        for alterados in (1, 10, n_dns):
+            nova = tabela_alterada(tabela, alterados, f"{alterados}dns")
+            armazem.salvar_lote("obra", projeto, tabela, automatico=False)   # volta à versão original
+            resultado = armazem.revalidar("obra", nova)
+            print(f"  revalidar, {alterados:3d} DN(s) alterado(s)  {resultado.segundos:7.2f} s | "
+                  f"{resultado.reavaliadas:7d} redimensionadas, {len(resultado.alteracoes):6d} com ajuste novo")
+
+        # Referência: redimensionar tudo e regravar
+        t0 = time.perf_counter()
+        completo = projeto.copy()
+        for dn in tabela.dn_options:
+            sel = np.flatnonzero(completo["DN"].to_numpy() == dn)
+            ajuste, vazao, _ = nova.solver.resolver(dn, completo["Vazão projeto (L/h)"].to_numpy()[sel])
+            completo.iloc[sel, completo.columns.get_loc("Ajuste (%)")] = ajuste
+            completo.iloc[sel, completo.columns.get_loc("Vazão ajustada (L/h)")] = vazao
+        armazem.salvar_lote("obra", completo, nova, automatico=False)
+        print(f"  redimensionar tudo e regravar  {time.perf_counter() - t0:7.2f} s")
+    finally:
+        shutil.rmtree(pasta)
+
+
+if __name__ == "__main__":
+    main()
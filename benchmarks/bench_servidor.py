@@ -0,0 +1,147 @@
+# ----------------------------
+# Teste de carga do serviço HTTP (setpoint.servidor)
+# ----------------------------
+# Uso: python benchmarks/bench_servidor.py [--conexoes 32] [--duracao 5] [--janela-ms 0 2] [--sem-lote]
+#      python benchmarks/bench_servidor.py --url http://127.0.0.1:8600   (servidor já no ar)
+# Sobe o servidor num processo separado para cada janela de agrupamento e
+# abre N conexões keep-alive que repetem pedidos avulsos de /ajuste, /vazao e
+# /faixa (e um /ajuste/lote de 500 itens) pelo tempo dado. Mostra p50/p99 da
+# latência e pedidos por segundo de cada rota, e quantos pedidos avulsos o
+# servidor juntou por cálculo. Cliente só com asyncio.
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CAPACIDADES = [10000, 12000, 16000, 20000, 24000, 32000, 36000, 42000, 55000]
+
+
+def corpo_avulso(rota: str, sorteio: random.Random) -> dict:
+    capacidade = sorteio.choice(CAPACIDADES)
+    vazao = capacidade / 20 * sorteio.uniform(0.8, 1.2)
+    if rota == "/ajuste":
+        return {"capacidade_btuh": capacidade, "vazao_lh": vazao, "modo": sorteio.choice(["nearest", "pchip"])}
+    if rota == "/faixa":
+        return {"capacidade_btuh": capacidade, "vazao_lh": vazao}
+    return {"capacidade_btuh": capacidade}
+
+
+def corpo_lote(sorteio: random.Random, n: int = 500) -> dict:
+    return {"itens": [corpo_avulso("/ajuste", sorteio) for _ in range(n)]}
+
+
+async def pedir(reader, writer, host: str, rota: str, corpo: dict) -> int:
+    dados = json.dumps(corpo).encode()
+    writer.write(f"POST {rota} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(dados)}\r\n\r\n".encode() + dados)
+    cabecalho = await reader.readuntil(b"\r\n\r\n")
+    linhas = cabecalho.decode("latin-1").split("\r\n")
+    tamanho = next(int(l.split(":", 1)[1]) for l in linhas if l.lower().startswith("content-length"))
+    await reader.readexactly(tamanho)
+    return int(linhas[0].split()[1])
+
+
+async def cliente(host: str, porta: int, rotas: list[str], fim: float, tempos: dict, semente: int):
+    sorteio = random.Random(semente)
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        while time.perf_counter() < fim:
+            rota = sorteio.choice(rotas)
+            corpo = corpo_lote(sorteio) if rota == "/ajuste/lote" else corpo_avulso(rota, sorteio)
+            t0 = time.perf_counter()
+            status = await pedir(reader, writer, host, rota, corpo)
+            if status != 200:
+                raise RuntimeError(f"{rota} respondeu {status}")
+            tempos[rota].append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def carga(host: str, porta: int, conexoes: int, duracao: float, lotes: bool = True) -> tuple[dict, float]:
+    # 1 conexão em 8 manda lotes (se `lotes`); as outras, pedidos avulsos
+    avulsas = ["/ajuste", "/vazao", "/faixa"]
+    tempos = {rota: [] for rota in avulsas + ["/ajuste/lote"]}
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    await asyncio.gather(*(
+        cliente(host, porta, ["/ajuste/lote"] if lotes and i % 8 == 7 else avulsas, fim, tempos, i)
+        for i in range(conexoes)
+    ))
+    return tempos, time.perf_counter() - inicio
+
+
+def percentil(valores: list[float], q: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * q))]
+
+
+def relatorio(tempos: dict, decorrido: float) -> None:
+    total = sum(len(v) for v in tempos.values())
+    for rota, valores in tempos.items():
+        if valores:
+            print(f"  {rota:<13} {len(valores) / decorrido:8.0f} req/s | p50 {statistics.median(valores) * 1000:7.2f} ms"
+                  f" | p99 {percentil(valores, 0.99) * 1000:7.2f} ms")
+    print(f"  {'total':<13} {total / decorrido:8.0f} req/s")
+
+
+def agrupamento(host: str, porta: int) -> str:
+    with urlopen(f"http://{host}:{porta}/saude") as resposta:
+        grupos = json.load(resposta)["agrupamento"]
+    return ", ".join(f"{rota} {g['itens'] / g['lotes']:.1f}" for rota, g in grupos.items() if g["lotes"])
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir_servidor(janela_ms: float) -> tuple[subprocess.Popen, int]:
+    porta = porta_livre()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "setpoint.servidor", "--porta", str(porta), "--janela-ms", str(janela_ms)],
+        cwd=RAIZ, env=dict(os.environ, PYTHONPATH=RAIZ), stdout=subprocess.PIPE, text=True)
+    processo.stdout.readline()   # "setpoint.servidor em ..." depois de carregar as tabelas
+    return processo, porta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="servidor já em execução (senão sobe um por janela)")
+    parser.add_argument("--conexoes", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=5.0)
+    parser.add_argument("--janela-ms", type=float, nargs="+", default=[0.0, 2.0])
+    parser.add_argument("--sem-lote", action="store_true", help="só pedidos avulsos")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        print(f"{args.url}, {args.conexoes} conexões, {args.duracao:.0f} s")
+        relatorio(*asyncio.run(carga(url.hostname, url.port, args.conexoes, args.duracao, not args.sem_lote)))
+        print(f"  itens por lote agrupado (desde o início do servidor): {agrupamento(url.hostname, url.port)}")
+        return
+
+    for janela in args.janela_ms:
+        processo, porta = subir_servidor(janela)
+        try:
+            print(f"janela {janela:g} ms, {args.conexoes} conexões, {args.duracao:.0f} s")
+            relatorio(*asyncio.run(carga("127.0.0.1", porta, args.conexoes, args.duracao, not args.sem_lote)))
+            print(f"  itens por lote agrupado: {agrupamento('127.0.0.1', porta)}")
+        finally:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ----------------------------
+# Benchmark: memória do servidor por sessão
+# ----------------------------
+# Uso: python benchmarks/bench_sessoes.py [n_sessoes]
+# Sobe `streamlit run main.py`, abre N sessões pelo websocket (cada uma faz a
+# carga inicial e abre o Flow Dashboard) e mede o RSS do servidor antes e
+# depois. Depois abre a página de memória numa sessão extra e mostra o que
+# ela reporta, para conferir com a medição de fora.
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from bench_flow_rerun import Cliente, porta_livre
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from tornado.websocket import websocket_connect
+
+MB = 1024 * 1024
+
+
+def rss_processo(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for linha in f:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) * 1024
+    return 0
+
+
+async def abrir_sessao(porta: int, pagina: str = "") -> Cliente:
+    cliente = Cliente(await websocket_connect(f"ws://127.0.0.1:{porta}/_stcore/stream"))
+    await cliente.rerun()
+    if pagina:
+        await abrir_pagina(cliente, pagina)
+    return cliente
+
+
+async def abrir_pagina(cliente: Cliente, pagina: str) -> list:
+    msg = BackMsg()
+    msg.rerun_script.page_name = pagina
+    msg.rerun_script.cached_message_hashes.extend(cliente.cache)
+    await cliente.ws.write_message(msg.SerializeToString(), binary=True)
+    metricas = []
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    while True:
+        fwd = ForwardMsg()
+        fwd.ParseFromString(await cliente.ws.read_message())
+        if fwd.WhichOneof("type") == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+            elemento = fwd.delta.new_element
+            if elemento.WhichOneof("type") == "metric":
+                metricas.append((elemento.metric.label, elemento.metric.body))
+        if fwd.WhichOneof("type") == "script_finished":
+            return metricas
+
+
+async def medir(porta: int, pid: int, n: int):
+    antes = rss_processo(pid)
+    clientes = []
+    for i in range(n):
+        clientes.append(await abrir_sessao(porta, "Flow"))
+    await asyncio.sleep(1)
+    depois = rss_processo(pid)
+    print(f"RSS do servidor: {antes / MB:.1f} MB -> {depois / MB:.1f} MB com {n} sessões "
+          f"({(depois - antes) / n / 1024:.0f} KB por sessão)")
+
+    admin = await abrir_sessao(porta)
+    for rotulo, valor in await abrir_pagina(admin, "Memoria"):
+        print(f"  {rotulo:<30} {valor}")
+    for c in clientes + [admin]:
+        c.ws.close()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    porta = porta_livre()
+    # SETPOINT_ADMIN=1: a página de memória abre sem senha (setpoint.admin)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "main.py", "--server.headless", "true",
+         "--server.port", str(porta), "--browser.gatherUsageStats", "false"],
+        cwd=RAIZ, env=dict(os.environ, PYTHONPATH=RAIZ, SETPOINT_ADMIN="1"),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        import socket
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", porta), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        async def aquecer_e_medir():
+            # Primeira sessão carrega módulos e caches por processo; fica fora da conta
+            aquecimento = await abrir_sessao(porta, "Flow")
+            await medir(porta, proc.pid, n)
+            aquecimento.ws.close()
+
+        asyncio.run(aquecer_e_medir())
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
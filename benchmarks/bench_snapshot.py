@@ -0,0 +1,67 @@
+# ----------------------------
+# Benchmark: carga da tabela de válvulas (Excel x snapshot .npy)
+# ----------------------------
+# Uso: python benchmarks/bench_snapshot.py
+# Gera planilhas sintéticas de tamanhos crescentes, compila o snapshot e mede,
+# num processo novo para cada caso, o tempo de carregar_tabela_valvulas (e
+# de uma passada pelos dados) e o aumento do pico de RSS, pelo Excel e pelo
+# snapshot.
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+TAMANHOS = [(19, 10), (2000, 200), (5000, 400)]
+
+# Pico pelo VmHWM: o ru_maxrss do filho herda o pico do processo pai
+MEDIR = """
+import sys, time
+from setpoint import dados
+
+def pico_kb():
+    with open("/proc/self/status") as f:
+        return next(int(l.split()[1]) for l in f if l.startswith("VmHWM:"))
+
+pico = pico_kb()
+t0 = time.perf_counter()
+tabela = dados.carregar_tabela_valvulas(sys.argv[1])
+t_abrir = time.perf_counter() - t0
+tabela.df.iloc[:, 1:].sum().sum()   # toca os dados
+print(t_abrir, time.perf_counter() - t0, pico_kb() - pico)
+"""
+
+
+def medir(caminho: str) -> tuple[float, float, float]:
+    """(tempo para abrir, tempo com uma passada nos dados, aumento do pico de RSS em MB)."""
+    saida = subprocess.check_output([sys.executable, "-c", MEDIR, caminho],
+                                    env=dict(os.environ, PYTHONPATH=RAIZ), text=True)
+    abrir, total, rss_kb = saida.split()
+    return float(abrir), float(total), float(rss_kb) / 1024
+
+
+def main():
+    from _dados import tabela_valvulas_sintetica
+    from setpoint import snapshot
+
+    pasta = tempfile.mkdtemp()
+    try:
+        for n_settings, n_dns in TAMANHOS:
+            caminho = os.path.join(pasta, f"valvulas_{n_settings}x{n_dns}.xlsx")
+            tabela_valvulas_sintetica(n_settings, n_dns).df.to_excel(caminho, index=False, engine="xlsxwriter")
+            _, t_excel, rss_excel = medir(caminho)
+            snapshot.compilar(caminho, "valvulas")
+            t_abrir, t_snap, rss_snap = medir(caminho)
+            print(f"{n_settings:6d} x {n_dns:3d} ({os.path.getsize(caminho) / 1024 / 1024:5.1f} MB xlsx): "
+                  f"Excel {t_excel * 1000:8.1f} ms +{rss_excel:6.1f} MB | "
+                  f"snapshot abre {t_abrir * 1000:5.1f} ms, com leitura {t_snap * 1000:5.1f} ms +{rss_snap:5.1f} MB")
+    finally:
+        shutil.rmtree(pasta)
+
+
+if __name__ == "__main__":
+    main()
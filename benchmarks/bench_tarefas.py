@@ -0,0 +1,73 @@
+# ----------------------------
+# Benchmark: latência das sessões com relatórios em geração (threads x processos)
+# ----------------------------
+# Uso: python benchmarks/bench_tarefas.py [n_pdfs]
+# Enquanto a fila gera n PDFs, a thread principal faz o papel de uma sessão:
+# repete um rerun leve (solver + dimensionamento de um lote pequeno) e mede a
+# latência de cada um. No modo threads a geração disputa o GIL com a sessão;
+# no modo processos só disputa CPU com o escalonador do sistema. Mede também
+# o tempo total até o último PDF ficar pronto.
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from setpoint import trabalhos
+from setpoint.dados import carregar_tabela_valvulas
+from setpoint.lote import dimensionar_lote
+from setpoint.tarefas import MODO_PROCESSOS, MODO_THREADS, FilaTarefas
+
+
+def rerun_leve(tabela, unidades):
+    dimensionar_lote(unidades, tabela)
+
+
+def latencias(tabela, unidades, duracao: float) -> list[float]:
+    tempos = []
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        t0 = time.perf_counter()
+        rerun_leve(tabela, unidades)
+        tempos.append(time.perf_counter() - t0)
+    return tempos
+
+
+def resumo(tempos: list[float]) -> str:
+    tempos = sorted(tempos)
+    p99 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))]
+    return f"p50 {statistics.median(tempos) * 1000:7.2f} ms | p99 {p99 * 1000:7.2f} ms"
+
+
+def main():
+    from _dados import unidades_sinteticas
+
+    n_pdfs = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    ref = trabalhos.ref_tabela(os.path.join(RAIZ, "tabela_valvulas.xlsx"))
+    tabela = carregar_tabela_valvulas(ref.caminho)
+    unidades = unidades_sinteticas(50)
+    dns = tabela.dn_options[:3]
+
+    print(f"ocioso          {resumo(latencias(tabela, unidades, 1.0))}")
+    for modo in (MODO_THREADS, MODO_PROCESSOS):
+        fila = FilaTarefas(max_workers=2, modo=modo)
+        # Aquece o pool (no modo processos, sobe os trabalhadores e abre a tabela)
+        fila.solicitar(("aquecer",), trabalhos.pdf_premium, ref, dns[:1], "").resultado()
+
+        t0 = time.perf_counter()
+        tarefas = [fila.solicitar(("pdf", i), trabalhos.pdf_premium, ref, dns, f"obs {i}")
+                   for i in range(n_pdfs)]
+        tempos = []
+        while not all(t.concluida for t in tarefas):
+            tempos.extend(latencias(tabela, unidades, 0.05))
+        total = time.perf_counter() - t0
+        for t in tarefas:
+            t.resultado()
+        print(f"{modo:<15} {resumo(tempos)} | {n_pdfs} PDFs em {total:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# ----------------------------
+# Benchmark: varredura capacidade × ΔT × diâmetro
+# ----------------------------
+# Uso: python benchmarks/bench_varredura.py
+# Compara a grade em broadcast (setpoint.varredura.varrer) com o cálculo de
+# um cenário por vez, como o Flow Dashboard faz a cada rerun. O laço escalar
+# roda numa amostra e o tempo é extrapolado para a grade inteira.
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from setpoint.fluxo import classificar_faixa, vazao_por_capacidade, vazao_tubo
+from setpoint.varredura import COLUNA_STATUS, varrer
+
+CAPACIDADES = np.linspace(5_000, 60_000, 200)
+DELTAS_T = np.linspace(3.0, 8.0, 50)
+DIAMETROS = np.linspace(10.0, 110.0, 100)
+VELOCIDADE = 1.0
+AMOSTRA = 20_000
+
+
+def cenario_escalar(btu, delta_t, diametro):
+    maquina = vazao_por_capacidade(btu, delta_T=delta_t)
+    tubo = vazao_tubo(diametro, VELOCIDADE)
+    velocidade = maquina.q_m3_s / tubo.area
+    return velocidade, classificar_faixa(tubo.vazao_lh, maquina.limite_min_lh, maquina.limite_max_lh)
+
+
+def main():
+    total = len(CAPACIDADES) * len(DELTAS_T) * len(DIAMETROS)
+
+    tempos = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        df = varrer(CAPACIDADES, DELTAS_T, DIAMETROS, VELOCIDADE)
+        tempos.append(time.perf_counter() - t0)
+    vetorizado = min(tempos)
+
+    grade = np.stack(np.meshgrid(CAPACIDADES, DELTAS_T, DIAMETROS, indexing="ij"), axis=-1).reshape(-1, 3)
+    amostra = np.random.default_rng(0).choice(total, AMOSTRA, replace=False)
+    t0 = time.perf_counter()
+    status = [cenario_escalar(*grade[i])[1] for i in amostra]
+    escalar = (time.perf_counter() - t0) / AMOSTRA * total
+
+    assert list(df[COLUNA_STATUS].to_numpy()[amostra]) == status
+
+    print(f"{total:,} cenários ({len(CAPACIDADES)} capacidades × {len(DELTAS_T)} ΔT × {len(DIAMETROS)} diâmetros)")
+    print(f"  broadcast: {vetorizado * 1000:8.1f} ms ({df.memory_usage(deep=True).sum() / 1e6:.0f} MB)")
+    print(f"  escalar:   {escalar * 1000:8.1f} ms (extrapolado de {AMOSTRA:,} cenários)")
+    print(f"  speedup:   {escalar / vetorizado:8.0f}x")
+    print(df[COLUNA_STATUS].value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# ----------------------------
+# Suíte de benchmarks (regressão entre execuções)
+# ----------------------------
+# Uso: python benchmarks/run.py [-k filtro] [--salvar base.json] [--comparar base.json]
+#                               [--settings 2000] [--dns 200] [--tolerancia 0.25]
+# Cada caso é calibrado como no pytest-benchmark: repete a função até cada
+# rodada durar pelo menos --tempo-min e faz várias rodadas, reportando
+# mín/mediana/média/desvio por chamada. Roda sobre uma tabela de válvulas
+# sintética (milhares de settings x centenas de DNs, com os DNs reais na
+# frente para a seleção por capacidade funcionar). O PDF usa um renderizador
+# de gráfico falso (não precisa de Chrome/Kaleido) e também o nativo.
+# --salvar grava os resultados em JSON; --comparar lê um arquivo salvo,
+# mostra a razão atual/base dos tempos mínimos (menos sensíveis a ruído de
+# outros processos que a mediana) e sai com código 1 se algum caso ficou
+# mais lento que a tolerância.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from _dados import tabela_valvulas_sintetica, trechos_sinteticos, unidades_sinteticas
+from setpoint import grafico_curvas
+from setpoint.estilo import aplicar_estilo_neon, estilo_neon_frame
+from setpoint.exportacao import excel_resultado, gerar_excel_lote
+from setpoint.fluidos import AGUA, ETILENOGLICOL, propriedades
+from setpoint.fluxo import vazao_por_capacidade
+from setpoint.grafico_curvas import figura_curvas
+from setpoint.hidraulica import calcular_prumada
+from setpoint.indice import ValveCurveIndex
+from setpoint.lote import dimensionar_lote, resolver_dns
+from setpoint.relatorio import gerar_pdf_premium
+from setpoint.selecao import capacidade_to_dn, find_matching_dn_column
+from setpoint.varredura import varrer
+
+N_CONSULTAS = 100_000
+N_UNIDADES = 20_000
+
+
+# ----------------------------
+# Dados sintéticos (benchmarks/_dados.py)
+# ----------------------------
+def grafico_falso(dn_list, df_valvulas, indice, ajuste=None, vazao_lh=None):
+    # Mesma assinatura de grafico_nativo, sem desenhar nada
+    from reportlab.platypus import Spacer
+    return Spacer(1, 1)
+
+
+# ----------------------------
+# Casos
+# ----------------------------
+CASOS: list[tuple[str, object]] = []
+
+
+def caso(nome: str):
+    """Registra uma fábrica `preparar(ctx) -> função sem argumentos` a medir."""
+    def registrar(preparar):
+        CASOS.append((nome, preparar))
+        return preparar
+    return registrar
+
+
+@caso("indice/construcao")
+def _(ctx):
+    return lambda: ValveCurveIndex.from_frame(ctx.tabela.df, ctx.tabela.dn_options)
+
+
+@caso("busca/nearest_100k")
+def _(ctx):
+    solver, dn, q = ctx.tabela.solver, ctx.dn, ctx.vazoes
+    return lambda: solver.resolver(dn, q, "nearest")
+
+
+@caso("busca/pchip_100k")
+def _(ctx):
+    solver, dn, q = ctx.tabela.solver, ctx.dn, ctx.vazoes
+    return lambda: solver.resolver(dn, q, "pchip")
+
+
+@caso("busca/resolver_um")
+def _(ctx):
+    solver, dn, q = ctx.tabela.solver, ctx.dn, float(ctx.vazoes[0])
+    return lambda: solver.resolver_um(dn, q, "linear")
+
+
+@caso("dn/find_matching_dn_column")
+def _(ctx):
+    opcoes = ctx.tabela.dn_options[::-1]   # pior caso: DN real no fim da lista
+    return lambda: find_matching_dn_column("DN 32", opcoes)
+
+
+@caso("dn/resolver_dns_100k")
+def _(ctx):
+    caps = np.resize(np.array(sorted(capacidade_to_dn)), N_CONSULTAS)
+    return lambda: resolver_dns(caps, ctx.tabela.dn_options)
+
+
+@caso("lote/dimensionar")
+def _(ctx):
+    return lambda: dimensionar_lote(ctx.unidades, ctx.tabela, "pchip")
+
+
+@caso("estilo/frame")
+def _(ctx):
+    df, dn = ctx.tabela.df, ctx.dn
+    vazao = float(df[dn].iloc[len(df) // 3])
+    return lambda: estilo_neon_frame(df, dn, vazao, "#ff0000")
+
+
+@caso("estilo/styler_200x50")
+def _(ctx):
+    df = ctx.tabela.df.iloc[:200, :51]
+    dn = df.columns[2]
+    estilos = estilo_neon_frame(df, dn, float(df[dn].iloc[50]), "#ff0000")
+    return lambda: aplicar_estilo_neon(df, estilos)._compute()
+
+
+@caso("excel/resultado")
+def _(ctx):
+    df = ctx.tabela.df.iloc[:, :101]
+    return lambda: excel_resultado(df, ctx.dn, 500.0, 40, 498.0, "linear")
+
+
+@caso("excel/lote")
+def _(ctx):
+    lote = dimensionar_lote(ctx.unidades, ctx.tabela)
+    destino = os.path.join(ctx.pasta, "lote.xlsx")
+    return lambda: gerar_excel_lote(lote, ctx.tabela.df.iloc[:, :51], destino)
+
+
+@caso("pdf/grafico_falso")
+def _(ctx):
+    dns = ctx.tabela.dn_options[1:5]
+    return lambda: gerar_pdf_premium(dns, ctx.tabela.df, "benchmark", 40, 480.0, logo_path=ctx.logo,
+                                     indice=ctx.tabela.indice, renderizador=grafico_falso)
+
+
+@caso("pdf/nativo")
+def _(ctx):
+    dns = ctx.tabela.dn_options[1:5]
+    return lambda: gerar_pdf_premium(dns, ctx.tabela.df, "benchmark", 40, 480.0, logo_path=ctx.logo,
+                                     indice=ctx.tabela.indice, renderizador="nativo")
+
+
+@caso("grafico/curvas_10dns")
+def _(ctx):
+    dns = tuple(ctx.tabela.dn_options[1:11])
+
+    def montar():
+        grafico_curvas._cache.clear()
+        return figura_curvas(ctx.tabela, ctx.dn, dns, 40, 480.0).to_json()
+    return montar
+
+
+@caso("flow/vazao_por_capacidade")
+def _(ctx):
+    return lambda: vazao_por_capacidade(36000)
+
+
+@caso("flow/propriedades_100k")
+def _(ctx):
+    temperaturas = np.linspace(0, 80, N_CONSULTAS)
+    return lambda: propriedades(ETILENOGLICOL, temperaturas, 30)
+
+
+@caso("flow/varredura_1M")
+def _(ctx):
+    caps = np.linspace(5_000, 60_000, 20_000)
+    return lambda: varrer(caps, diametros_mm=(15.8, 20.9, 26.6, 35.1, 40.9, 52.5, 62.7, 77.9, 102.3, 128.2))
+
+
+@caso("flow/prumada_100k")
+def _(ctx):
+    trechos = trechos_sinteticos(N_CONSULTAS)
+    props = propriedades(AGUA, 10.0)
+    return lambda: calcular_prumada(trechos, props.rho, props.mu)
+
+
+# ----------------------------
+# Medição
+# ----------------------------
+class Contexto:
+    def __init__(self, n_settings: int, n_dns: int, pasta: str):
+        self.tabela = tabela_valvulas_sintetica(n_settings, n_dns)
+        self.tabela.solver   # índice e trechos fora da medição
+        self.dn = self.tabela.dn_options[2]
+        minimo, maximo = np.nanmin(self.tabela.df[self.dn]), np.nanmax(self.tabela.df[self.dn])
+        self.vazoes = np.random.default_rng(1).uniform(minimo, maximo, N_CONSULTAS)
+        self.unidades = unidades_sinteticas(N_UNIDADES)
+        self.logo = os.path.join(RAIZ, "logo_fabricante.png")
+        self.pasta = pasta
+
+
+def medir(funcao, tempo_min: float, rodadas: int, tempo_max: float) -> dict:
+    """Estatísticas por chamada (s), calibrando as iterações por rodada."""
+    t0 = time.perf_counter()
+    funcao()                      # aquecimento (caches, imports)
+    aquecimento = time.perf_counter() - t0
+    iteracoes = max(1, int(tempo_min / max(aquecimento, 1e-9)))
+    tempos = []
+    inicio = time.perf_counter()
+    while len(tempos) < rodadas and (len(tempos) < 3 or time.perf_counter() - inicio < tempo_max):
+        t0 = time.perf_counter()
+        for _ in range(iteracoes):
+            funcao()
+        tempos.append((time.perf_counter() - t0) / iteracoes)
+    q1, q3 = np.percentile(tempos, [25, 75])
+    return {
+        "min": min(tempos),
+        "mediana": statistics.median(tempos),
+        "media": statistics.fmean(tempos),
+        "desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        "iqr": float(q3 - q1),
+        "rodadas": len(tempos),
+        "iteracoes": iteracoes,
+    }
+
+
+def formatar(segundos: float) -> str:
+    for unidade, escala in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if segundos >= escala:
+            return f"{segundos / escala:8.2f} {unidade:2s}"
+    return f"{segundos / 1e-9:8.0f} ns"
+
+
+def ambiente() -> dict:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                         stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "maquina": platform.machine(),
+        "processador": platform.processor() or platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do Setpoint Tools")
+    parser.add_argument("-k", dest="filtro", default="", help="roda só os casos que contêm este texto")
+    parser.add_argument("--salvar", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", help="compara com um arquivo salvo por --salvar")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="regressão se o mínimo ficar mais que isso acima da base (0.25 = 25%%)")
+    parser.add_argument("--settings", type=int, default=2000, help="linhas da tabela sintética")
+    parser.add_argument("--dns", type=int, default=200, help="colunas DN da tabela sintética")
+    parser.add_argument("--tempo-min", type=float, default=0.05, help="duração mínima de uma rodada (s)")
+    parser.add_argument("--rodadas", type=int, default=15)
+    parser.add_argument("--tempo-max", type=float, default=2.0, help="tempo máximo por caso (s)")
+    args = parser.parse_args()
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        parametros_base = base.get("parametros", {})
+        if (parametros_base.get("settings"), parametros_base.get("dns")) != (args.settings, args.dns):
+            print(f"aviso: base medida com {parametros_base} e esta execução com "
+                  f"settings={args.settings}, dns={args.dns}")
+
+    resultados = {}
+    regressoes = []
+    with tempfile.TemporaryDirectory() as pasta:
+        ctx = Contexto(args.settings, args.dns, pasta)
+        print(f"tabela sintética: {args.settings} settings x {len(ctx.tabela.dn_options)} DNs")
+        for nome, preparar in CASOS:
+            if args.filtro not in nome:
+                continue
+            stats = medir(preparar(ctx), args.tempo_min, args.rodadas, args.tempo_max)
+            resultados[nome] = stats
+            linha = (f"{nome:<30} mín {formatar(stats['min'])} | mediana {formatar(stats['mediana'])} "
+                     f"| ±{stats['desvio'] / stats['mediana'] * 100:4.1f}% ({stats['rodadas']}x{stats['iteracoes']})")
+            anterior = base["casos"].get(nome) if base else None
+            if anterior:
+                razao = stats["min"] / anterior["min"]
+                marca = "REGRESSÃO" if razao > 1 + args.tolerancia else ("melhor" if razao < 1 - args.tolerancia else "")
+                linha += f" | {razao:5.2f}x base {marca}"
+                if marca == "REGRESSÃO":
+                    regressoes.append(nome)
+            print(linha)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({"ambiente": ambiente(), "parametros": {"settings": args.settings, "dns": args.dns},
+                       "casos": resultados}, f, ensure_ascii=False, indent=2)
+        print(f"resultados gravados em {args.salvar}")
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões): {', '.join(regressoes)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,15 @@
 # ----------------------------
-# Inicialização e instalação condicional
+# Inicialização
 # ----------------------------
+# plotly e reportlab são importados só quando um gráfico é desenhado ou um
+# PDF é pedido; no início só se verifica se estão instalados.
 import streamlit as st
-import sys
-import subprocess
+import importlib.util
+import os
+import sqlite3
+from time import perf_counter
 
-# Tenta importar plotly; se não estiver instalado, instala automaticamente
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-    import plotly.io as pio
-except ModuleNotFoundError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "plotly==6.3.0"])
-    import plotly.express as px
-    import plotly.graph_objects as go
-    import plotly.io as pio
+inicio_rerun = perf_counter()
 
 # ----------------------------
 # Imports principais
@@ -22,24 +17,33 @@ except ModuleNotFoundError:
 st.set_page_config(page_title="Valve Calibration AB-QM", layout="wide")
 
 import pandas as pd
-import base64
-from io import BytesIO
-import re
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.lib.pagesizes import A4
-from datetime import datetime
-from reportlab.lib import colors
+
+plotly_disponivel = importlib.util.find_spec("plotly") is not None
+reportlab_disponivel = importlib.util.find_spec("reportlab") is not None
+if not plotly_disponivel:
+    st.warning("plotly não está instalado (pip install -r requirements.txt): gráficos desativados.")
+
+from setpoint.assets import data_uri_asset, url_asset
+from setpoint import admin, carregar_tabela_maquinas, carregar_tabela_valvulas, rastreio, trabalhos
+from setpoint.estilo import aplicar_estilo_neon, estilos_neon
+from setpoint.exportacao import MIME_XLSX, excel_resultado
+from setpoint.fluidos import AGUA, NOMES_FLUIDOS, vazao_por_capacidade_fluido
+from setpoint.fluxo import delta_T
+from setpoint.grafico_curvas import figura_curvas
+from setpoint.lote import assinatura_lote, dimensionar_lote, ler_planilha_unidades
+from setpoint.relatorio import MAX_ITENS_DOCUMENTO, itens_do_lote
+from setpoint.resultados import armazem_resultados
+from setpoint.selecao import dn_automatico
+from setpoint.tarefas import FilaCheia, arquivo_resultado, chave_relatorio, fila_relatorios
 
 # ----------------------------
 # Funções auxiliares
 # ----------------------------
-def titulo_com_logo(texto: str, logo_base64: str, largura: int = 50):
+def titulo_com_logo(texto: str, logo_src: str, largura: int = 50):
     st.markdown(
         f"""
         <h3 style="display: flex; align-items: center;">
-            <img src="data:image/png;base64,{logo_base64}" 
+            <img src="{logo_src}" 
                  width="{largura}" style="margin-right:8px;">
             {texto}
         </h3>
@@ -47,64 +51,84 @@ def titulo_com_logo(texto: str, logo_base64: str, largura: int = 50):
         unsafe_allow_html=True
     )
 
-def carregar_logo_base64(caminho: str) -> str:
-    with open(caminho, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-
-def gerar_excel(df: pd.DataFrame, ajuste: int, vazao_lh: float):
-    output = BytesIO()
-    df_export = df.copy()
-    resumo = pd.DataFrame({
-        "Resumo Ajuste (%)": [f"Ajuste recomendado: {ajuste}%"],
-        "Resumo Vazão (L/h)": [f"Vazão L/h: {vazao_lh:.2f}"]
-    })
-    df_export = pd.concat([df_export, resumo], axis=1)
-    df_export.to_excel(output, index=False)
-    return output.getvalue()
-
-def normalize_label(label):
-    return re.sub(r'[^a-z0-9]', '', str(label).lower())
-
-def find_matching_dn_column(dn_label, dn_options):
-    if dn_label is None: return None
-    dn_norm = normalize_label(dn_label)
-    for col in dn_options:
-        if dn_norm in normalize_label(col):
-            return col
-    return None
-
-# ----------------------------
-# Carregar dados
-# ----------------------------
-df_valvulas = pd.read_excel("tabela_valvulas.xlsx")
-df_maquinas = pd.read_excel("Relação de capacidade das máquinas.xlsx")
-
-# ----------------------------
-# Processar tabela válvulas
-# ----------------------------
-if 'Setting (%)' in df_valvulas.columns:
-    df_valvulas['Setting (%)'] = (
-        df_valvulas['Setting (%)']
-        .astype(str)
-        .str.replace('%', '', regex=True)
-        .astype(float)
-        .round()
-        .astype(int)
-    )
-    dn_options = [col for col in df_valvulas.columns if col != "Setting (%)"]
-    df_valvulas[dn_options] = df_valvulas[dn_options].apply(pd.to_numeric, errors='coerce')
-else:
-    st.error("A tabela de válvulas não contém a coluna 'Setting (%)'. Verifique o arquivo Excel.")
+def src_imagem(caminho: str, largura: int = None, altura: int = None) -> str:
+    # Imagem reduzida ao tamanho exibido, gerada uma vez por processo; servida
+    # de ./static quando o static serving está ativo (.streamlit/config.toml)
+    if st.get_option("server.enableStaticServing"):
+        return url_asset(caminho, largura, altura)
+    return data_uri_asset(caminho, largura, altura)
+
+def painel_tarefa(chave_estado: str, rotulo: str, nome_arquivo: str, mime: str, aguardando: bool):
+    tarefa = fila_relatorios().obter(st.session_state.get(chave_estado))
+    if tarefa is None:
+        return
+    if not tarefa.concluida:
+        st.progress(tarefa.fracao, text=f"📄 {tarefa.etapa}...")
+        return
+    if aguardando:
+        # Terminou durante o polling: rerun completo para parar o timer
+        st.rerun()
+    try:
+        resultado = tarefa.resultado()
+    except Exception as erro:
+        st.error(f"Falha ao gerar o arquivo: {erro}")
+        return
+    if isinstance(resultado, str):
+        # Exportação em lote: o resultado é o caminho do arquivo em disco
+        # (apagado quando a tarefa sai do cache da fila)
+        try:
+            with open(resultado, "rb") as f:
+                resultado = f.read()
+        except OSError:
+            st.warning("O arquivo gerado não está mais disponível. Gere novamente.")
+            return
+    st.download_button(label=rotulo, data=resultado, file_name=nome_arquivo, mime=mime)
+
+def mostrar_tarefa(chave_estado: str, rotulo: str, nome_arquivo: str, mime: str):
+    # Enquanto a tarefa roda, só este fragmento é reexecutado (a cada 1 s)
+    tarefa = fila_relatorios().obter(st.session_state.get(chave_estado))
+    pendente = tarefa is not None and not tarefa.concluida
+    st.fragment(painel_tarefa, run_every=1.0 if pendente else None)(
+        chave_estado, rotulo, nome_arquivo, mime, pendente)
+
+def solicitar_relatorio(chave, funcao, *args) -> bool:
+    # Fila cheia: recusa agora em vez de acumular pedidos que ninguém vai esperar
+    try:
+        fila_relatorios().solicitar(chave, funcao, *args)
+    except FilaCheia:
+        st.warning("Muitos relatórios em geração no momento. Tente novamente em alguns segundos.")
+        return False
+    return True
+
+def usar_vazao_sugerida(vazao_m3h: float):
+    st.session_state["flow_m3h"] = vazao_m3h
+
+# ----------------------------
+# Carregar dados (cache por processo, recarrega se o arquivo mudar)
+# ----------------------------
+# Com o snapshot compilado (python -m setpoint.snapshot) as tabelas abrem por
+# mmap, sem read_excel; planilha alterada volta a ser lida do Excel.
+try:
+    tabela_valvulas = carregar_tabela_valvulas("tabela_valvulas.xlsx")
+except ValueError as erro:
+    st.error(str(erro))
     st.stop()
+tabela_maquinas = carregar_tabela_maquinas("Relação de capacidade das máquinas.xlsx")
+
+df_valvulas = tabela_valvulas.df
+dn_options = tabela_valvulas.dn_options
+# Relatórios recebem só o caminho: no modo processos cada trabalhador abre a
+# tabela pelo snapshot em mmap em vez de receber o DataFrame serializado
+ref_valvulas = trabalhos.ref_tabela("tabela_valvulas.xlsx")
 
 # ----------------------------
 # Sidebar com logo e cores
 # ----------------------------
-logo_sidebar = carregar_logo_base64("maquina.png")
+logo_sidebar = src_imagem("maquina.png", largura=200)
 st.sidebar.markdown(
     f"""
     <div style="text-align: center; margin-bottom: 20px;">
-        <img src="data:image/png;base64,{logo_sidebar}" width="200" style="cursor:pointer;">
+        <img src="{logo_sidebar}" width="200" style="cursor:pointer;">
         <p style="font-size: 14px; color: #888;">Setpoint Tools</p>
     </div>
     """,
@@ -114,7 +138,7 @@ st.sidebar.markdown(
 # ----------------------------
 # Seleção de capacidade
 # ----------------------------
-unique_caps = sorted(pd.Series(df_maquinas["Capacidade (Btuh)"].dropna().unique()).astype(int).tolist())
+unique_caps = tabela_maquinas.capacidades
 opcoes_capacidades = ["Selecione..."] + unique_caps
 
 if "selecao_cap" not in st.session_state:
@@ -127,19 +151,17 @@ selecao_cap = st.sidebar.selectbox(
 )
 st.session_state["selecao_cap"] = selecao_cap
 
-capacidade_to_dn = {
-    10000: "DN 15 L/h",
-    12000: "DN 15 HF",
-    16000: "DN 15 HF",
-    20000: "DN 15 HF",
-    24000: "DN 15 HF",
-    25000: "DN 15 HF",
-    32000: "DN 20 HF",
-    36000: "DN 20 HF",
-    42000: "DN 32",
-    44000: "DN 32",
-    55000: "DN 32"
-}
+# Fluido do circuito: define a vazão sugerida a partir da capacidade
+for chave, padrao in (("fluido", AGUA), ("concentracao", 0), ("temperatura_media", 10.0), ("delta_T", delta_T)):
+    if chave not in st.session_state:
+        st.session_state[chave] = padrao
+with st.sidebar.expander("Fluido do circuito"):
+    fluido = st.selectbox("Fluido", list(NOMES_FLUIDOS), format_func=NOMES_FLUIDOS.get, key="fluido")
+    concentracao = st.slider("Concentração de glicol (% em massa)", 0, 50, step=5, key="concentracao",
+                             disabled=fluido == AGUA)
+    temperatura_media = st.number_input("Temperatura média (°C)", min_value=0.0, max_value=80.0, step=0.5,
+                                        key="temperatura_media")
+    delta_T_circuito = st.number_input("ΔT do circuito (K)", min_value=0.5, step=0.5, key="delta_T")
 
 # ----------------------------
 # Setup de cores (fixo)
@@ -148,7 +170,7 @@ cor_hover_logo = "#ff0000"
 # ----------------------------
 # Cabeçalho futurista
 logo_path = "valvula.png"
-logo_base64 = carregar_logo_base64(logo_path)
+logo_src = src_imagem(logo_path, altura=75)
 st.markdown(f"""
 <style>
 @keyframes glow {{
@@ -164,7 +186,7 @@ st.markdown(f"""
 }}
 </style>
 <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 20px; background-color: #111; padding: 10px 15px; border-radius: 10px;">
-    <img src="data:image/png;base64,{logo_base64}" class="logo-hover" style="max-height: 75px; width: auto; background: linear-gradient(135deg, #ffffff, #dddddd); padding: 5px; border-radius: 8px;" />
+    <img src="{logo_src}" class="logo-hover" style="max-height: 75px; width: auto; background: linear-gradient(135deg, #ffffff, #dddddd); padding: 5px; border-radius: 8px;" />
     <h1 style="margin: 0; font-size: 2.0rem; line-height: 1.2; animation: glow 3s infinite; font-family: 'Orbitron', monospace;">Valve Calibration AB-QM</h1>
 </div>
 """, unsafe_allow_html=True)
@@ -176,16 +198,11 @@ dn_choice = None  # valor padrão
 
 with col1_dn:
     if selecao_cap != "Selecione...":
-        wanted_dn_label = capacidade_to_dn.get(int(selecao_cap))
-        
         # Ignora automaticamente DN que contenha "LF"
-        if wanted_dn_label and "LF" not in wanted_dn_label:
-            dn_choice_auto = find_matching_dn_column(wanted_dn_label, dn_options)
-            if dn_choice_auto:
-                dn_choice = dn_choice_auto
-                st.success(f"DN selecionado automaticamente: **{dn_choice}**")
-            else:
-                dn_choice = st.selectbox("Escolha o DN", dn_options, key="dn_escolhido")
+        dn_choice_auto = dn_automatico(selecao_cap, dn_options, tabela_maquinas.resolvedor_dn)
+        if dn_choice_auto:
+            dn_choice = dn_choice_auto
+            st.success(f"DN selecionado automaticamente: **{dn_choice}**")
         else:
             dn_choice = st.selectbox("Escolha o DN", dn_options, key="dn_escolhido")
     else:
@@ -196,6 +213,19 @@ if dn_choice == "Selecione...":
 
 with col2_vaz:
     flow_m3h = st.number_input("Digite a vazão de projeto (m³/h):", min_value=0.0, step=0.01, key="flow_m3h")
+    if selecao_cap != "Selecione...":
+        vazao_sugerida = vazao_por_capacidade_fluido(
+            selecao_cap, fluido, temperatura_media, concentracao if fluido != AGUA else 0, delta_T_circuito).q_m3_h
+        st.caption(f"💡 Vazão pela capacidade ({NOMES_FLUIDOS[fluido]}, ΔT {delta_T_circuito:g} K): "
+                   f"{vazao_sugerida:.3f} m³/h")
+        st.button("Usar vazão sugerida", on_click=usar_vazao_sugerida, args=(round(float(vazao_sugerida), 3),))
+
+modos_ajuste = {
+    "Linha mais próxima da tabela": "nearest",
+    "Interpolação linear": "linear",
+    "Interpolação monotônica (PCHIP)": "pchip",
+}
+modo_ajuste = modos_ajuste[st.radio("Modo de ajuste", list(modos_ajuste), horizontal=True, key="modo_ajuste")]
 
 # ----------------------------
 # Multiselect para comparar DNs
@@ -214,9 +244,8 @@ ajuste = None
 vazao_lh = None
 if dn_choice and flow_m3h > 0:
     flow_lh = flow_m3h * 1000
-    melhor_linha = df_valvulas.iloc[(df_valvulas[dn_choice] - flow_lh).abs().argsort()[0]]
-    ajuste = melhor_linha['Setting (%)']
-    vazao_lh = melhor_linha[dn_choice]
+    ajuste, vazao_lh, erro_lh = tabela_valvulas.solver.resolver_um(dn_choice, flow_lh, modo_ajuste)
+    ajuste = int(ajuste) if modo_ajuste == "nearest" else round(ajuste, 1)
     vazao_m3h = vazao_lh / 1000
 
 # ----------------------------
@@ -229,177 +258,158 @@ if ajuste and vazao_lh:
         st.write(f"💧 Vazão em m³/h: {vazao_m3h:.2f}")
     with col2:
         st.write(f"🔧 Ajuste recomendado: **{ajuste}%** → ({vazao_lh:.0f} L/h)")
+    st.caption(f"📐 Erro de vazão esperado: {erro_lh:+.0f} L/h ({erro_lh / flow_lh * 100:+.1f}%)")
 
 # ----------------------------
 # Gráfico interativo
 # ----------------------------
 with st.expander("📊 Visualizar curvas das válvulas"):
-    if dn_choice:
-        df_plot = df_valvulas[['Setting (%)', dn_choice]].copy()
-        fig = px.line(df_plot, x='Setting (%)', y=dn_choice, markers=True,
-                      labels={'Setting (%)':'Setting (%)', dn_choice:'Vazão (L/h)'},
-                      title=f"Curva de ajuste {dn_choice}")
-        # Ponto recomendado
-        if ajuste and vazao_lh:
-            idx = (df_plot[dn_choice] - vazao_lh).abs().idxmin()
-            fig.add_scatter(
-                x=[df_plot.loc[idx, 'Setting (%)']],
-                y=[df_plot.loc[idx, dn_choice]],
-                mode='markers+text',
-                marker=dict(color='red', size=14, symbol='star'),
-                text=[f"💧 {vazao_lh:.0f} L/h"],
-                textposition='top center',
-                name='Ponto recomendado'
-            )
-        # Comparar múltiplos DNs
-        for dn in dn_comparar:
-            if dn in df_valvulas.columns:
-                df_tmp = df_valvulas[['Setting (%)', dn]].copy()
-                fig.add_scatter(x=df_tmp['Setting (%)'], y=df_tmp[dn], mode='lines+markers', name=f"DN {dn}")
-        fig.update_layout(template='plotly_dark', title_font=dict(family='Orbitron, monospace', size=22, color=cor_titulo),
-                          legend=dict(title='Legenda', font=dict(family='Orbitron, monospace', size=12)),
-                          xaxis=dict(title='Setting (%)', showgrid=True, gridcolor='#333'),
-                          yaxis=dict(title='Vazão (L/h)', showgrid=True, gridcolor='#333'),
-                          plot_bgcolor='#111111', paper_bgcolor='#111111')
+    if dn_choice and plotly_disponivel:
+        # Figura em cache por (DNs, ponto recomendado); curvas longas reduzidas por LTTB
+        webgl = st.toggle("Renderizar com WebGL (muitos DNs/pontos)", key="grafico_webgl")
+        fig = figura_curvas(tabela_valvulas, dn_choice, dn_comparar, ajuste, vazao_lh, cor_titulo, webgl)
         st.plotly_chart(fig, use_container_width=True)
-    else:
+    elif not dn_choice:
         st.info("Selecione um DN para visualizar o gráfico.")
 
 # ----------------------------
 # Tabela Neon
 # ----------------------------
-logo_base64_fab = carregar_logo_base64("logo_fabricante.png")
-titulo_com_logo("Tabela de referência Danfoss (L/h)", logo_base64_fab, largura=70)
-df_display = df_valvulas.copy()
-def neon_pulse_style(row):
-    styles = []
-    for col in df_display.columns:
-        if col == dn_choice and ajuste is not None:
-            if row[col] == vazao_lh:
-                styles.append(f"background-color: {cor_titulo}; color: #000; font-weight: bold;")
-            else:
-                diff = abs(row[col] - vazao_lh)
-                intensity = max(0, 1 - diff / vazao_lh)
-                styles.append(f"text-shadow: 0 0 {5*intensity}px {cor_titulo}; color: {cor_titulo};")
-        else:
-            styles.append("")
-    return styles
-st.dataframe(df_display.style.apply(neon_pulse_style, axis=1), hide_index=True)
+logo_fab = src_imagem("logo_fabricante.png", largura=70)
+titulo_com_logo("Tabela de referência Danfoss (L/h)", logo_fab, largura=70)
+df_display = df_valvulas  # somente leitura, sem cópia por rerun
+# Brilho neon na coluna do DN escolhido (vetorizado, em cache por DN/vazão)
+estilos_tabela = estilos_neon(tabela_valvulas, dn_choice, vazao_lh if ajuste is not None else None, cor_titulo)
+st.dataframe(aplicar_estilo_neon(df_display, estilos_tabela), hide_index=True)
 
 # ----------------------------
 # Exportação Excel
 # ----------------------------
+# O arquivo só é montado quando o usuário pede (download_button não aceita
+# função geradora); o botão de download vale até o próximo rerun.
 if ajuste and vazao_lh:
-    excel_bytes = gerar_excel(df_display, ajuste, vazao_lh)
-    st.download_button(
-        label="📥 Baixar Excel",
-        data=excel_bytes,
-        file_name="valvula_resultado.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    if st.button("📊 Preparar Excel"):
+        st.download_button(
+            label="📥 Baixar Excel",
+            data=excel_resultado(df_display, dn_choice, flow_lh, ajuste, vazao_lh, modo_ajuste,
+                                 tabela_valvulas.indice.nearest_row(dn_choice, vazao_lh)),
+            file_name="valvula_resultado.xlsx",
+            mime=MIME_XLSX,
+            on_click="ignore"
+        )
 
 # ----------------------------
-# Função PDF premium
+# Dimensionamento em lote
 # ----------------------------
-def gerar_pdf_premium(dn_list, df_valvulas, observacao, ajuste=None, vazao_lh=None, logo_path="logo_fabricante.png"):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-    story = []
-
-    styles = getSampleStyleSheet()
-    titulo_style = ParagraphStyle('Titulo', parent=styles['Heading1'], textColor=colors.white,
-                                  alignment=1, fontSize=18, spaceAfter=12)
-    texto_style = ParagraphStyle('Texto', parent=styles['Normal'], textColor=colors.white, fontSize=10)
+with st.expander("📋 Dimensionamento em lote (CSV/XLSX)"):
+    st.caption("Colunas esperadas: Unidade, Capacidade (Btuh), Vazão projeto (m³/h)")
+    arquivo_lote = st.file_uploader("Planilha de unidades", type=["csv", "xlsx"], key="arquivo_lote")
+    if arquivo_lote is not None:
+        try:
+            unidades = ler_planilha_unidades(arquivo_lote, arquivo_lote.name)
+        except ValueError as erro:
+            st.error(str(erro))
+        else:
+            df_lote = dimensionar_lote(unidades, tabela_valvulas, modo_ajuste, tabela_maquinas.resolvedor_dn)
+            sem_dn = int(df_lote["DN"].isna().sum())
+            if sem_dn:
+                st.warning(f"{sem_dn} unidade(s) sem DN automático para a capacidade informada.")
+            st.dataframe(df_lote, hide_index=True)
+            st.download_button(
+                label="📥 Baixar planilha de ajustes (CSV)",
+                data=df_lote.to_csv(index=False).encode("utf-8"),
+                file_name="ajustes_lote.csv",
+                mime="text/csv"
+            )
 
-    # Logo no topo
+            # Histórico: o projeto salvo é revalidado quando a tabela de válvulas mudar
+            col_nome, col_salvar = st.columns([3, 1], vertical_alignment="bottom")
+            nome_projeto = col_nome.text_input("Nome do projeto", value=os.path.splitext(arquivo_lote.name)[0],
+                                               key="nome_projeto").strip()
+            if col_salvar.button("💾 Salvar projeto", disabled=not nome_projeto):
+                # O banco só é criado aqui, no primeiro projeto salvo
+                try:
+                    armazem_resultados().salvar_lote(nome_projeto, df_lote, tabela_valvulas, modo_ajuste)
+                except sqlite3.Error as erro:
+                    st.warning(f"Não foi possível salvar o projeto ({erro}).")
+                else:
+                    st.success(f"Projeto **{nome_projeto}** salvo ({len(df_lote)} válvulas).")
+
+            # Planilha do projeto (resumo + uma linha por válvula), gravada em disco
+            # O arquivo em disco leva o hash da chave inteira da tarefa
+            if st.button("📊 Gerar Excel do projeto"):
+                chave_excel = ("lote_excel", tabela_valvulas.versao, modo_ajuste, assinatura_lote(df_lote))
+                destino_excel = arquivo_resultado(chave_excel, "xlsx")
+                if solicitar_relatorio(chave_excel, trabalhos.excel_lote, ref_valvulas, df_lote,
+                                       destino_excel, modo_ajuste):
+                    st.session_state["lote_excel_chave"] = chave_excel
+            mostrar_tarefa("lote_excel_chave", "📥 Baixar planilha do projeto (XLSX)", "projeto_valvulas.xlsx",
+                           MIME_XLSX)
+
+            # PDF do projeto: todas as válvulas num build só, gravado em disco
+            formato_lote = st.radio("PDF do projeto", ["Um documento (PDF)", "Um arquivo por válvula (ZIP)"],
+                                    horizontal=True, key="formato_lote")
+            formato_lote = "zip" if "ZIP" in formato_lote else "pdf"
+            # Documento único fica todo em memória até o fim do build: projetos grandes vão por zip
+            grande_demais = formato_lote == "pdf" and int(df_lote["DN"].notna().sum()) > MAX_ITENS_DOCUMENTO
+            if grande_demais:
+                st.warning(f"Mais de {MAX_ITENS_DOCUMENTO} válvulas: gere um arquivo por válvula (ZIP).")
+            if st.button("📄 Gerar PDF do projeto", disabled=grande_demais):
+                chave_lote = ("lote", tabela_valvulas.versao, modo_ajuste, formato_lote, assinatura_lote(df_lote))
+                destino_lote = arquivo_resultado(chave_lote, formato_lote)
+                if solicitar_relatorio(chave_lote, trabalhos.pdf_lote, ref_valvulas, itens_do_lote(df_lote),
+                                       destino_lote, formato_lote):
+                    st.session_state["lote_pdf_chave"] = chave_lote
+            formato_gerado = st.session_state.get("lote_pdf_chave", (None, None, None, formato_lote))[3]
+            mostrar_tarefa("lote_pdf_chave", "📥 Baixar PDF do projeto", f"projeto_valvulas.{formato_gerado}",
+                           "application/zip" if formato_gerado == "zip" else "application/pdf")
+
+# ----------------------------
+# Projetos salvos: revalidação com a tabela atual
+# ----------------------------
+# Só as válvulas dos DNs cuja curva mudou são redimensionadas (setpoint.resultados)
+# O banco não é aberto (nem criado) enquanto nenhum projeto for salvo; sem
+# acesso ao arquivo (deploy somente leitura) o histórico só fica indisponível
+with st.expander("🔁 Projetos salvos"):
     try:
-        logo_bytes = open(logo_path, "rb").read()
-        story.append(Image(BytesIO(logo_bytes), width=6*cm, height=3*cm))
-        story.append(Spacer(1,12))
-    except:
-        story.append(Paragraph("⚠️ Logo não encontrada", texto_style))
-        story.append(Spacer(1,12))
-
-    # Título
-    story.append(Paragraph("Relatório de Válvulas AB-QM", titulo_style))
-    story.append(Spacer(1,12))
-
-    # Gráfico
-    if dn_list:
-        fig = go.Figure()
-        for dn_choice in dn_list:
-            if dn_choice in df_valvulas.columns:
-                fig.add_trace(go.Scatter(
-                    x=df_valvulas["Setting (%)"], y=df_valvulas[dn_choice],
-                    mode='lines+markers', name=f"DN {dn_choice}"
-                ))
-        # Ponto recomendado
-        if ajuste and vazao_lh:
-            for dn_choice in dn_list:
-                if dn_choice in df_valvulas.columns:
-                    idx = (df_valvulas[dn_choice] - vazao_lh).abs().idxmin()
-                    fig.add_scatter(
-                        x=[df_valvulas.loc[idx, 'Setting (%)']],
-                        y=[df_valvulas.loc[idx, dn_choice]],
-                        mode='markers+text',
-                        marker=dict(color='red', size=14, symbol='star'),
-                        text=[f"💧 {vazao_lh:.0f} L/h"],
-                        textposition='top center',
-                        name='Ponto recomendado'
-                    )
-        fig.update_layout(template="plotly_dark", width=800, height=400,
-                          xaxis_title="Setting (%)", yaxis_title="Vazão (L/h)")
-        try:
-            img_bytes = pio.to_image(fig, format="png")
-            story.append(Image(BytesIO(img_bytes), width=16*cm, height=10*cm))
-            story.append(Spacer(1,12))
-        except:
-            story.append(Paragraph("⚠️ Gráfico não pôde ser gerado", texto_style))
-            story.append(Spacer(1,12))
-
-    # Tabela de DNs
-    if dn_list:
-        df_pdf = df_valvulas[['Setting (%)'] + [dn for dn in dn_list if dn in df_valvulas.columns]].copy()
-        data_table = [df_pdf.columns.tolist()] + df_pdf.values.tolist()
-        table = Table(data_table, repeatRows=1)
-        # Estilo tabela
-        styles_table = TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#222222')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.gray),
-            ('BACKGROUND', (0,1), (-1,-1), colors.HexColor('#111111')),
-            ('TEXTCOLOR', (0,1), (-1,-1), colors.white)
-        ])
-        # Destaque do ponto recomendado
-        if ajuste and vazao_lh:
-            for dn_choice in dn_list:
-                if dn_choice in df_pdf.columns:
-                    col_idx = df_pdf.columns.get_loc(dn_choice)
-                    row_idx = (df_pdf[dn_choice] - vazao_lh).abs().idxmin() + 1
-                    styles_table.add('BACKGROUND', (col_idx, row_idx), (col_idx, row_idx), colors.HexColor('#00ffea'))
-                    styles_table.add('TEXTCOLOR', (col_idx, row_idx), (col_idx, row_idx), colors.black)
-        table.setStyle(styles_table)
-        story.append(table)
-        story.append(Spacer(1,12))
-
-    # Observações
-    if observacao:
-        story.append(Paragraph(f"Observações: {observacao}", texto_style))
-        story.append(Spacer(1,12))
-
-    # Rodapé e fundo
-    def add_footer(canvas, doc):
-        canvas.setFillColor(colors.black)
-        canvas.rect(0,0,doc.pagesize[0],doc.pagesize[1], stroke=0, fill=1)
-        data_hora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        canvas.setFillColor(colors.white)
-        canvas.setFont("Helvetica", 8)
-        canvas.drawRightString(doc.pagesize[0]-1*cm, 1*cm, f"Gerado em: {data_hora}")
-
-    doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
-    buffer.seek(0)
-    return buffer.getvalue()
+        armazem = armazem_resultados(criar=False)
+        projetos = armazem.projetos() if armazem is not None else pd.DataFrame()
+    except sqlite3.Error as erro:
+        st.warning(f"Histórico de projetos indisponível ({erro}).")
+    else:
+        if projetos.empty:
+            st.caption("Nenhum projeto salvo. Salve um pelo dimensionamento em lote.")
+        else:
+            projetos["tabela atual"] = projetos["versao"] == tabela_valvulas.versao
+            projetos["atualizado_em"] = pd.to_datetime(projetos["atualizado_em"], unit="s")
+            st.dataframe(projetos.drop(columns="versao"), hide_index=True)
+            desatualizados = projetos.loc[~projetos["tabela atual"], "projeto"].tolist()
+            if desatualizados and st.button(f"Revalidar {len(desatualizados)} projeto(s) com a tabela atual"):
+                try:
+                    st.session_state["revalidacoes"] = [
+                        armazem.revalidar(nome, tabela_valvulas, tabela_maquinas.resolvedor_dn)
+                        for nome in desatualizados
+                    ]
+                except sqlite3.Error as erro:
+                    st.warning(f"Não foi possível revalidar os projetos ({erro}).")
+                else:
+                    st.rerun()
+    for revalidacao in st.session_state.get("revalidacoes", []):
+        diferenca = revalidacao.diferenca
+        st.markdown(f"**{revalidacao.projeto}**: {len(diferenca.linhas_alteradas)} DN(s) com curva alterada, "
+                    f"{len(diferenca.dns_novos)} novo(s), {len(diferenca.dns_removidos)} removido(s); "
+                    f"{revalidacao.reavaliadas} válvula(s) redimensionada(s), "
+                    f"{len(revalidacao.alteracoes)} com resultado diferente.")
+        if len(revalidacao.alteracoes):
+            st.dataframe(revalidacao.alteracoes, hide_index=True)
+            st.download_button(
+                label="📥 Baixar relatório de alterações (CSV)",
+                data=revalidacao.alteracoes.to_csv(index=False).encode("utf-8"),
+                file_name=f"alteracoes_{revalidacao.projeto}.csv",
+                mime="text/csv",
+                key=f"alteracoes_{revalidacao.projeto}",
+                on_click="ignore"
+            )
 
 # ----------------------------
 # Exportação PDF com fallback DN
@@ -413,16 +423,19 @@ if st.sidebar.button("📄 Exportar PDF"):
     if not dn_para_pdf:
         dn_para_pdf = [dn_choice] if dn_choice else []
     
-    if dn_para_pdf:
-        pdf_bytes = gerar_pdf_premium(dn_para_pdf, df_valvulas, observacao, ajuste, vazao_lh)
-        st.download_button(
-            label="📥 Baixar PDF",
-            data=pdf_bytes,
-            file_name="relatorio_valvulas.pdf",
-            mime="application/pdf"
-        )
+    if not reportlab_disponivel:
+        st.sidebar.error("Exportação PDF requer reportlab instalado.")
+    elif dn_para_pdf:
+        # Gera em segundo plano; pedidos idênticos reaproveitam o mesmo PDF
+        chave_pdf = chave_relatorio(dn_para_pdf, ajuste, vazao_lh, observacao, tabela_valvulas.versao)
+        if solicitar_relatorio(chave_pdf, trabalhos.pdf_premium, ref_valvulas, dn_para_pdf, observacao,
+                               ajuste, vazao_lh):
+            st.session_state["pdf_chave"] = chave_pdf
     else:
         st.warning("Nenhum DN disponível para gerar o PDF.")
+
+with st.sidebar:
+    mostrar_tarefa("pdf_chave", "📥 Baixar PDF", "relatorio_valvulas.pdf", "application/pdf")
 # ----------------------------
 
 # Botão para limpar seleções
@@ -431,7 +444,43 @@ def limpar_selecoes():
     st.session_state["dn_escolhido"] = "Selecione..."
     st.session_state["dn_comparativo"] = []
     st.session_state["flow_m3h"] = 0.0
+    st.session_state.pop("pdf_chave", None)
+    st.session_state.pop("lote_pdf_chave", None)
+    st.session_state.pop("lote_excel_chave", None)
 
 st.sidebar.button("🧹 Limpar seleções", on_click=limpar_selecoes)
 
+# ----------------------------
+# Painel de administração (setpoint.admin): tempos por etapa
+# ----------------------------
+def alternar_rastreio():
+    rastreio.ativar(st.session_state["rastreio_ativo"])
+
+def admin_liberado() -> bool:
+    # ?admin=1 só mostra o campo da senha (setpoint.admin)
+    if admin.liberado_para_todos() or st.session_state.get("admin_liberado"):
+        return True
+    if st.query_params.get("admin") != "1" or not admin.senha_configurada():
+        return False
+    if admin.senha_confere(st.sidebar.text_input("Senha de administração", type="password")):
+        st.session_state["admin_liberado"] = True
+        return True
+    return False
+
+if admin_liberado():
+    with st.sidebar.expander("⏱️ Tempos por etapa", expanded=True):
+        st.toggle("Medir tempos", value=rastreio.ativo(), key="rastreio_ativo", on_change=alternar_rastreio)
+        tempos = pd.DataFrame(rastreio.resumo())
+        if len(tempos):
+            st.dataframe(tempos.drop(columns="total_s").round(2), hide_index=True)
+            col_json, col_prom = st.columns(2)
+            col_json.download_button("JSON", rastreio.json_metricas(), "tempos.json", "application/json",
+                                     on_click="ignore")
+            col_prom.download_button("Prometheus", rastreio.prometheus(), "tempos.prom", "text/plain",
+                                     on_click="ignore")
+        else:
+            st.caption("Nada medido ainda (ative e interaja com a página).")
+        st.button("Zerar", on_click=rastreio.limpar)
 
+if rastreio.ativo():
+    rastreio.registrar("main.py", perf_counter() - inicio_rerun)
@@ -1,8 +1,33 @@
 import streamlit as st
-import math
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from time import perf_counter
+
+inicio_rerun = perf_counter()
+
+from setpoint import admin, rastreio
+from setpoint.fluidos import AGUA, NOMES_FLUIDOS, ponto_congelamento, propriedades
+from setpoint.fluxo import (
+    classificar_faixa,
+    delta_T,
+    diametro_sugerido_mm,
+    vazao_por_capacidade,
+    vazao_tubo,
+)
+from setpoint.gauges import gauge_with_refs
+from setpoint.hidraulica import (
+    ACIMA_DO_CATALOGO,
+    RUGOSIDADE_MM,
+    TRECHOS_EXEMPLO,
+    VELOCIDADE_MAX,
+    VELOCIDADE_MIN,
+    calcular_prumada,
+    regime,
+    tubo_nominal,
+    verificar,
+)
+from setpoint.varredura import CATALOGO_TUBOS, COLUNA_STATUS, DELTAS_T, matriz_heatmap, varrer
 
 # --- Configuração do app ---
 st.set_page_config(page_title="Flow Dashboard", layout="wide")
@@ -24,6 +49,11 @@ if 'diametro' not in st.session_state: st.session_state.diametro = 1.0
 if 'velocidade' not in st.session_state: st.session_state.velocidade = 0.0
 if 'densidade' not in st.session_state: st.session_state.densidade = 1000.0
 if 'btu_choice' not in st.session_state: st.session_state.btu_choice = 10000
+if 'fluido' not in st.session_state: st.session_state.fluido = AGUA
+if 'concentracao' not in st.session_state: st.session_state.concentracao = 0
+if 'temperatura_media' not in st.session_state: st.session_state.temperatura_media = 10.0
+if 'delta_T' not in st.session_state: st.session_state.delta_T = delta_T
+if 'material' not in st.session_state: st.session_state.material = "Aço carbono"
 
 # --- Função para limpar inputs ---
 def limpar_inputs():
@@ -31,6 +61,18 @@ def limpar_inputs():
     st.session_state.velocidade = 0.0
     st.session_state.densidade = 1000.0
     st.session_state.btu_choice = 10000
+    st.session_state.fluido = AGUA
+    st.session_state.concentracao = 0
+    st.session_state.temperatura_media = 10.0
+    st.session_state.delta_T = delta_T
+    st.session_state.material = "Aço carbono"
+
+# --- Densidade acompanha o fluido escolhido (o campo continua editável) ---
+def atualizar_densidade():
+    if st.session_state.fluido == AGUA:
+        st.session_state.concentracao = 0
+    props = propriedades(st.session_state.fluido, st.session_state.temperatura_media, st.session_state.concentracao)
+    st.session_state.densidade = float(round(props.rho))
 
 # --- Sidebar ---
 with st.sidebar:
@@ -38,27 +80,33 @@ with st.sidebar:
     st.subheader("Capacidade térmica da máquina")
     capacidades_btu = [10000, 12000, 16000, 20000, 25000, 32000, 42000, 44000, 55000, 36000, 12000, 24000]
     btu_choice = st.selectbox("Btu/h", capacidades_btu, key='btu_choice')
+    st.subheader("Fluido")
+    fluido = st.selectbox("Fluido", list(NOMES_FLUIDOS), format_func=NOMES_FLUIDOS.get, key='fluido',
+                          on_change=atualizar_densidade)
+    concentracao = st.slider("Concentração de glicol (% em massa)", 0, 50, step=5, key='concentracao',
+                             disabled=fluido == AGUA, on_change=atualizar_densidade)
+    temperatura_media = st.number_input("Temperatura média do circuito (°C)", min_value=0.0, max_value=80.0,
+                                        step=0.5, key='temperatura_media', on_change=atualizar_densidade)
+    delta_T_circuito = st.number_input("ΔT do circuito (K)", min_value=0.5, step=0.5, key='delta_T')
     diametro = st.number_input("Diâmetro interno do tubo (mm)", min_value=1.0, step=0.01, key='diametro')
     velocidade = st.number_input("Velocidade do fluido (m/s)", min_value=0.0, step=0.01, key='velocidade')
     densidade = st.number_input("Densidade do fluido (kg/m³)", min_value=0, step=1, format="%d", key='densidade')
-    st.subheader("Visualizações")
-    mostrar_tabela = st.checkbox("Mostrar tabela detalhada", value=True)
+    material = st.selectbox("Material do tubo", list(RUGOSIDADE_MM), key='material')
     st.button("🧹 Limpar Inputs", on_click=limpar_inputs)
 
-# --- Constantes ---
-btu_to_kw = 0.000293
-cp = 4186
-delta_T = 5.5
-rho = 1000
-
 # --- Cálculo automático ---
-p_kw = st.session_state.btu_choice * btu_to_kw
-m_dot = (p_kw * 1000) / (cp * delta_T)
-q_m3_s = m_dot / rho
-q_m3_h = q_m3_s * 3600
-q_l_h = q_m3_h * 1000
-limite_min_lh = q_l_h * 0.8
-limite_max_lh = q_l_h * 1.2
+# cp do fluido na temperatura/concentração; ρ é o do campo de densidade
+# (preenchido pelo fluido), com o valor da tabela se o campo estiver zerado
+props_fluido = propriedades(fluido, temperatura_media, concentracao)
+rho_fluido = st.session_state.densidade if st.session_state.densidade > 0 else props_fluido.rho
+p_kw, m_dot, q_m3_s, q_m3_h, q_l_h, limite_min_lh, limite_max_lh = vazao_por_capacidade(
+    st.session_state.btu_choice, cp=props_fluido.cp, delta_T=delta_T_circuito, rho=rho_fluido)
+
+if fluido != AGUA and temperatura_media - ponto_congelamento(fluido, concentracao) < 3:
+    st.warning(f"⚠️ Temperatura média próxima do ponto de congelamento da mistura "
+               f"({ponto_congelamento(fluido, concentracao):.1f} °C).")
+st.caption(f"{NOMES_FLUIDOS[fluido]} a {temperatura_media:.1f} °C: ρ = {rho_fluido:.1f} kg/m³ | "
+           f"cp = {props_fluido.cp:.0f} J/(kg·K) | μ = {props_fluido.mu * 1000:.2f} mPa·s")
 
 # --- Tipo de cálculo ---
 use_manual = False
@@ -70,58 +118,14 @@ else:
 
 # --- Cálculo manual ---
 if use_manual:
-    area = math.pi * (st.session_state.diametro/1000 / 2) ** 2
-    vazao_m3s = area * st.session_state.velocidade
-    vazao_m3h = vazao_m3s * 3600
-    vazao_lh = vazao_m3h * 1000
-    massa_kg_s = vazao_m3s * st.session_state.densidade
-    massa_kg_h = massa_kg_s * 3600
+    area, vazao_m3s, vazao_m3h, vazao_lh, massa_kg_s, massa_kg_h = vazao_tubo(
+        st.session_state.diametro, st.session_state.velocidade, st.session_state.densidade)
 else:
     area = vazao_m3h = vazao_lh = massa_kg_s = massa_kg_h = np.nan
 
 # --- Funções SCADA ---
 def cor_faixa(valor, minimo, maximo):
-    if pd.isna(valor): return "⚪"
-    elif valor < minimo: return "🔴"
-    elif valor > maximo: return "🟠"
-    else: return "🟢"
-
-def faixa_gauge(valor, minimo, maximo):
-    if pd.isna(valor): return "grey"
-    elif valor < minimo: return "red"
-    elif valor > maximo: return "orange"
-    else: return "green"
-
-def gauge_with_refs(valor, minimo, maximo, unidade, cor_numero, titulo):
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=valor,
-        number={'suffix':f' {unidade}','font':{'color':cor_numero,'size':24}},
-        delta={'reference':maximo,'increasing':{'color':'#ff3333'}},
-        title={'text': f"{titulo}<br><span style='font-size:0.8em;color:#aaaaaa'>Faixa: {minimo:.2f} – {maximo:.2f} {unidade}</span>",
-               'font':{'size':20,'color':'#ffffff'}},
-        gauge={
-            'axis': {'range':[0, valor*1.5], 'tickcolor':'#ffffff', 'tickwidth':2},
-            'bar': {'color':faixa_gauge(valor,minimo,maximo)},
-            'steps': [
-                {'range':[0,minimo],'color':'#ff1a1a'},
-                {'range':[minimo,maximo],'color':'#33ff33'},
-                {'range':[maximo,valor*1.5],'color':'#ffcc33'}
-            ],
-            'threshold': {'line':{'color':'#00ffff','width':4}, 'thickness':0.75,'value':maximo}
-        }
-    ))
-    # Linha mínima neon
-    fig.add_trace(go.Indicator(
-        mode="gauge",
-        value=valor,
-        gauge={'axis':{'range':[0,valor*1.5],'visible':False},
-               'threshold':{'line':{'color':'#ff00ff','width':4}, 'thickness':0.75,'value':minimo},
-               'bar':{'color':'rgba(0,0,0,0)'}},
-        domain={'x':[0,1],'y':[0,1]}
-    ))
-    fig.update_layout(paper_bgcolor="#1e1e2f", font={'color':'#ffffff'}, margin=dict(t=30,b=20,l=20,r=20))
-    return fig
+    return classificar_faixa(valor, minimo, maximo)
 
 def card_neon(valor, minimo, maximo, unidade, emoji, cor_texto):
     status = cor_faixa(valor,minimo,maximo)
@@ -137,9 +141,16 @@ def card_neon(valor, minimo, maximo, unidade, emoji, cor_texto):
 
 # --- Sugestão automática de diâmetro ---
 if q_m3_s > 0 and st.session_state.velocidade > 0:
-    area_necessaria = q_m3_s / st.session_state.velocidade
-    diametro_sugerido_mm = 2 * (area_necessaria / math.pi) ** 0.5 * 1000
-    st.info(f"💡 Diâmetro sugerido: **{diametro_sugerido_mm:.1f} mm** (assumindo {st.session_state.velocidade:.1f} m/s)")
+    diametro_mm = diametro_sugerido_mm(q_m3_s, st.session_state.velocidade)
+    bitola = tubo_nominal(diametro_mm)
+    if bitola == ACIMA_DO_CATALOGO:
+        maior = max(CATALOGO_TUBOS, key=CATALOGO_TUBOS.get)
+        st.warning(f"⚠️ Diâmetro sugerido: **{diametro_mm:.1f} mm** (assumindo {st.session_state.velocidade:.1f} m/s)"
+                   f" — acima da maior bitola do catálogo ({maior}, {CATALOGO_TUBOS[maior]} mm internos). "
+                   f"Divida a vazão em mais de um ramal ou use tubo de bitola maior.")
+    else:
+        st.info(f"💡 Diâmetro sugerido: **{diametro_mm:.1f} mm** (assumindo {st.session_state.velocidade:.1f} m/s)"
+                f" → bitola comercial **{bitola}** (Sch 40)")
 
 # --- Cartões neon ---
 col1, col2, col3 = st.columns(3)
@@ -148,12 +159,13 @@ col2.markdown(card_neon(q_m3_h, limite_min_lh/1000, limite_max_lh/1000, "m³/h",
 col3.markdown(card_neon(m_dot, limite_min_lh/3600, limite_max_lh/3600, "kg/s", "🧪", "#ffcc33"), unsafe_allow_html=True)
 
 # --- Gauges neon ---
-
+# Figuras em cache pelos valores (setpoint.gauges); as seções abaixo que têm
+# widgets próprios são fragmentos, então mexer nelas não reenvia os gauges.
 st.markdown("<h3 style='text-align:center;color:#00ffff;'>📊 Flow verification</h3>", unsafe_allow_html=True)
 col1, col2, col3 = st.columns(3)
-col1.plotly_chart(gauge_with_refs(q_l_h,limite_min_lh,limite_max_lh,"L/h","#00ffff","Vazão em l/h"), use_container_width=True)
-col2.plotly_chart(gauge_with_refs(q_m3_h,limite_min_lh/1000,limite_max_lh/1000,"m³/h","#00ff00","Vazão em m³/h"), use_container_width=True)
-col3.plotly_chart(gauge_with_refs(m_dot,limite_min_lh/3600,limite_max_lh/3600,"kg/s","#ffcc33","Vazão em kg/s"), use_container_width=True)
+col1.plotly_chart(gauge_with_refs(float(q_l_h),float(limite_min_lh),float(limite_max_lh),"L/h","#00ffff","Vazão em l/h"), use_container_width=True)
+col2.plotly_chart(gauge_with_refs(float(q_m3_h),float(limite_min_lh/1000),float(limite_max_lh/1000),"m³/h","#00ff00","Vazão em m³/h"), use_container_width=True)
+col3.plotly_chart(gauge_with_refs(float(m_dot),float(limite_min_lh/3600),float(limite_max_lh/3600),"kg/s","#ffcc33","Vazão em kg/s"), use_container_width=True)
 
 # --- Legenda ---
 st.markdown("<h4 style='color:#00ffff;'>📌 Legenda de Status</h4>", unsafe_allow_html=True)
@@ -165,19 +177,19 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# --- Tabela detalhada ---
-if mostrar_tabela:
+# --- Tabela detalhada (fragmento: o checkbox só reexecuta esta parte) ---
+@st.fragment
+def tabela_detalhada():
+    if not st.checkbox("Mostrar tabela detalhada", value=True, key='mostrar_tabela'):
+        return
     unidades = ["Área da seção (m²)","Vazão m³/h","Vazão L/h","Vazão kg/h","Vazão kg/s"]
     manual = [area if use_manual else np.nan, vazao_m3h if use_manual else np.nan,
               vazao_lh if use_manual else np.nan, massa_kg_h if use_manual else np.nan,
               massa_kg_s if use_manual else np.nan]
-    maquina = [np.nan, q_m3_h, q_l_h, q_m3_h*rho, m_dot]
+    maquina = [np.nan, q_m3_h, q_l_h, q_m3_h*rho_fluido, m_dot]
 
     def status(val, minimo, maximo):
-        if pd.isna(val): return "-"
-        if val < minimo: return "🔴"
-        elif val > maximo: return "🟠"
-        else: return "🟢"
+        return classificar_faixa(val, minimo, maximo, indefinido="-")
 
     df = pd.DataFrame({
         "Unidade": unidades,
@@ -189,3 +201,105 @@ if mostrar_tabela:
 
     st.markdown("<h3 style='color:#00ffff;'>🔎 Tabela Detalhada</h3>", unsafe_allow_html=True)
     st.dataframe(df, use_container_width=True)
+
+tabela_detalhada()
+
+# --- Verificação hidráulica do tubo manual ---
+if use_manual:
+    hidraulica = verificar(st.session_state.velocidade, st.session_state.diametro, rho_fluido, props_fluido.mu,
+                           RUGOSIDADE_MM[material])
+    st.markdown("<h3 style='color:#00ffff;'>🔧 Verificação hidráulica</h3>", unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Reynolds", f"{float(hidraulica.reynolds):,.0f}".replace(",", "."), str(regime(hidraulica.reynolds)),
+                delta_color="off")
+    col2.metric("Fator de atrito (Darcy)", f"{float(hidraulica.fator_atrito):.4f}")
+    col3.metric("Perda de carga", f"{float(hidraulica.perda_pa_m):.0f} Pa/m")
+    col4.metric("Velocidade", f"{st.session_state.velocidade:.2f} m/s",
+                f"{classificar_faixa(st.session_state.velocidade, VELOCIDADE_MIN, VELOCIDADE_MAX)} "
+                f"faixa {VELOCIDADE_MIN}–{VELOCIDADE_MAX} m/s", delta_color="off")
+
+# --- Prumada: todos os trechos numa chamada (fragmento) ---
+@st.fragment
+def prumada():
+    with st.expander("🏗️ Prumada (perda de carga por trecho)"):
+        # Frame compartilhado entre sessões; cada uma guarda só as edições
+        trechos = st.data_editor(TRECHOS_EXEMPLO, num_rows="dynamic", hide_index=True, key='editor_trechos')
+        if len(trechos):
+            resultado_prumada = calcular_prumada(trechos, rho_fluido, props_fluido.mu, RUGOSIDADE_MM[material])
+            st.dataframe(resultado_prumada, use_container_width=True, hide_index=True)
+            st.caption(f"Perda total: **{resultado_prumada['Perda no trecho (kPa)'].sum():.2f} kPa** "
+                       f"({NOMES_FLUIDOS[fluido]}, {material})")
+            acima = int((resultado_prumada["Bitola sugerida"] == ACIMA_DO_CATALOGO).sum())
+            if acima:
+                st.warning(f"⚠️ {acima} trecho(s) precisam de diâmetro acima da maior bitola do catálogo.")
+
+prumada()
+
+# --- Varredura capacidade × ΔT × diâmetro (fragmento) ---
+@st.fragment
+def varredura():
+    with st.expander("🗺️ Varredura capacidade × ΔT × diâmetro"):
+        col_dt, col_v = st.columns(2)
+        deltas_varredura = col_dt.multiselect("ΔT (K)", list(DELTAS_T), default=list(DELTAS_T), key='deltas_varredura')
+        velocidade_varredura = col_v.number_input("Velocidade de referência (m/s)", min_value=0.1, value=1.0, step=0.1,
+                                                  key='velocidade_varredura')
+        if deltas_varredura:
+            # Grade inteira num passo só (broadcast); o heatmap mostra um ΔT por vez
+            df_varredura = varrer(sorted(set(capacidades_btu)), deltas_varredura, list(CATALOGO_TUBOS.values()),
+                                  velocidade_varredura, cp=props_fluido.cp, rho=rho_fluido)
+            delta_heatmap = st.select_slider("ΔT do mapa", options=sorted(deltas_varredura), key='delta_heatmap')
+            velocidades, status_mapa = matriz_heatmap(df_varredura, delta_heatmap)
+
+            fig_mapa = go.Figure(go.Heatmap(
+                z=velocidades.to_numpy(),
+                x=list(CATALOGO_TUBOS),
+                y=[f"{c:,.0f}".replace(",", ".") for c in velocidades.index],
+                text=status_mapa.to_numpy(),
+                texttemplate="%{text} %{z:.2f}",
+                colorscale="Turbo",
+                colorbar={'title': 'm/s'},
+                hovertemplate="Tubo %{x}<br>%{y} Btu/h<br>%{z:.2f} m/s<extra></extra>",
+            ))
+            fig_mapa.update_layout(paper_bgcolor="#1e1e2f", plot_bgcolor="#1e1e2f", font={'color':'#ffffff'},
+                                   title=f"Velocidade necessária (m/s) — ΔT {delta_heatmap} K; status a {velocidade_varredura:.1f} m/s",
+                                   xaxis_title="Tubo (Sch 40)", yaxis_title="Capacidade (Btu/h)",
+                                   margin=dict(t=50,b=20,l=20,r=20))
+            st.plotly_chart(fig_mapa, use_container_width=True)
+
+            st.dataframe(df_varredura, use_container_width=True, hide_index=True)
+            st.caption(" | ".join(f"{s} {n}" for s, n in df_varredura[COLUNA_STATUS].value_counts(sort=False).items() if n))
+
+varredura()
+
+# --- Painel de administração (setpoint.admin): tempos por etapa ---
+def alternar_rastreio():
+    rastreio.ativar(st.session_state.rastreio_ativo)
+
+def admin_liberado() -> bool:
+    # ?admin=1 só mostra o campo da senha (setpoint.admin)
+    if admin.liberado_para_todos() or st.session_state.get("admin_liberado"):
+        return True
+    if st.query_params.get("admin") != "1" or not admin.senha_configurada():
+        return False
+    if admin.senha_confere(st.sidebar.text_input("Senha de administração", type="password")):
+        st.session_state["admin_liberado"] = True
+        return True
+    return False
+
+if admin_liberado():
+    with st.sidebar.expander("⏱️ Tempos por etapa", expanded=True):
+        st.toggle("Medir tempos", value=rastreio.ativo(), key='rastreio_ativo', on_change=alternar_rastreio)
+        tempos = pd.DataFrame(rastreio.resumo())
+        if len(tempos):
+            st.dataframe(tempos.drop(columns="total_s").round(2), hide_index=True)
+            col_json, col_prom = st.columns(2)
+            col_json.download_button("JSON", rastreio.json_metricas(), "tempos.json", "application/json",
+                                     on_click="ignore")
+            col_prom.download_button("Prometheus", rastreio.prometheus(), "tempos.prom", "text/plain",
+                                     on_click="ignore")
+        else:
+            st.caption("Nada medido ainda (ative e interaja com a página).")
+        st.button("Zerar", on_click=rastreio.limpar)
+
+if rastreio.ativo():
+    rastreio.registrar("pages/Flow.py", perf_counter() - inicio_rerun)
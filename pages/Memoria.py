@@ -0,0 +1,137 @@
+import streamlit as st
+import pandas as pd
+
+from setpoint import admin
+from setpoint.memoria import caches_compartilhados, rss_bytes, rss_pico_bytes, tamanho
+
+# --- Configuração do app ---
+st.set_page_config(page_title="Memória do servidor", layout="wide")
+st.title("🧠 Memória do servidor")
+st.caption("Memória do processo, por sessão e dos caches compartilhados — para dimensionar réplicas.")
+
+
+def admin_liberado() -> bool:
+    # ?admin=1 só mostra o campo da senha (setpoint.admin)
+    if admin.liberado_para_todos() or st.session_state.get("admin_liberado"):
+        return True
+    if st.query_params.get("admin") != "1" or not admin.senha_configurada():
+        return False
+    if admin.senha_confere(st.sidebar.text_input("Senha de administração", type="password")):
+        st.session_state["admin_liberado"] = True
+        return True
+    return False
+
+
+# Lista todas as sessões conectadas: só com acesso de administração, como o painel de tempos
+if not admin_liberado():
+    if admin.senha_configurada():
+        st.info("Página de administração: abra com ?admin=1 na URL e informe a senha na barra lateral.")
+    else:
+        st.info(f"Página de administração desligada neste servidor (configure {admin.VARIAVEL_SENHA}).")
+    st.stop()
+
+MB = 1024 * 1024
+
+
+# --- Sessões ativas (APIs internas do runtime do Streamlit) ---
+def sessoes_ativas() -> list[dict]:
+    """Uma linha por sessão conectada; vazia se o runtime não expuser as sessões."""
+    try:
+        from streamlit.runtime import Runtime
+
+        runtime = Runtime.instance()
+        ativas = runtime._session_mgr.list_active_sessions()
+        uploads = runtime.uploaded_file_mgr.file_storage
+        midia = runtime.media_file_mgr
+        arquivos_midia = midia._storage._files_by_id
+        midia_por_sessao = midia._files_by_session_and_coord
+    except Exception:
+        return []
+
+    linhas = []
+    for info in ativas:
+        sessao = info.session
+        try:
+            estado = sessao.session_state
+            chaves = len(estado.filtered_state)
+            bytes_estado = sum(stat.byte_length for stat in estado.get_stats())
+        except Exception:
+            chaves, bytes_estado = 0, 0
+        try:
+            bytes_upload = sum(len(rec.data) for rec in uploads.get(sessao.id, {}).values())
+            ids_midia = set(midia_por_sessao.get(sessao.id, {}).values())
+            bytes_midia = sum(len(arquivos_midia[i].content) for i in ids_midia if i in arquivos_midia)
+        except Exception:
+            bytes_upload, bytes_midia = 0, 0
+        linhas.append({
+            "Sessão": sessao.id[:8],
+            "Execuções": info.script_run_count,
+            "Chaves": chaves,
+            "session_state (KB)": bytes_estado / 1024,
+            "Uploads (KB)": bytes_upload / 1024,
+            "Downloads/mídia (KB)": bytes_midia / 1024,
+        })
+    return linhas
+
+
+if st.button("🔄 Atualizar"):
+    st.rerun()
+
+sessoes = pd.DataFrame(sessoes_ativas())
+caches = pd.DataFrame(caches_compartilhados())
+rss = rss_bytes()
+
+colunas_sessao = ["session_state (KB)", "Uploads (KB)", "Downloads/mídia (KB)"]
+if len(sessoes):
+    sessoes["Total (KB)"] = sessoes[colunas_sessao].sum(axis=1)
+    por_sessao = sessoes["Total (KB)"].mean() * 1024
+else:
+    por_sessao = 0.0
+total_caches = int(caches["bytes_memoria"].sum())
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("RSS do processo", f"{rss / MB:.1f} MB", f"pico {rss_pico_bytes() / MB:.1f} MB", delta_color="off")
+col2.metric("Sessões ativas", len(sessoes))
+col3.metric("Média por sessão", f"{por_sessao / 1024:.1f} KB")
+col4.metric("Caches compartilhados", f"{total_caches / MB:.2f} MB")
+
+# --- Por sessão ---
+st.subheader("Sessões")
+if len(sessoes):
+    st.dataframe(sessoes.round(1), use_container_width=True, hide_index=True)
+    st.caption("Arquivos de mídia iguais são guardados uma vez só (hash do conteúdo); "
+               "o total por sessão pode contar o mesmo arquivo em mais de uma sessão.")
+else:
+    st.info("Nenhuma sessão visível (runtime sem gerenciador de sessões).")
+
+# --- Caches por processo ---
+st.subheader("Caches compartilhados (uma cópia por processo)")
+caches_kb = caches.assign(
+    bytes_memoria=caches["bytes_memoria"] / 1024,
+    bytes_disco=caches["bytes_disco"] / 1024,
+).rename(columns={"nome": "Cache", "itens": "Itens", "bytes_memoria": "Memória (KB)", "bytes_disco": "Disco (KB)"})
+st.dataframe(caches_kb.round(1), use_container_width=True, hide_index=True)
+st.caption("Caches com lru_cache mostram só a contagem de itens.")
+
+# --- Dimensionamento de réplicas ---
+st.subheader("Dimensionamento")
+col_n, col_extra, col_mem = st.columns(3)
+n_sessoes = col_n.number_input("Sessões simultâneas por réplica", min_value=1, value=50, step=10)
+# Threads, filas e cache de mensagens do runtime por sessão, fora do session_state.
+# Medido com benchmarks/bench_sessoes.py (~300 KB por sessão no main.py + Flow)
+extra_kb = col_extra.number_input("Overhead do runtime por sessão (KB)", min_value=0, value=300, step=50)
+custo_sessao = por_sessao + extra_kb * 1024
+base = max(rss - custo_sessao * len(sessoes), 0)
+estimativa = base + custo_sessao * n_sessoes
+col_mem.metric("Memória estimada por réplica", f"{estimativa / MB:.0f} MB")
+st.caption(f"Base (processo sem as sessões atuais) {base / MB:.0f} MB + {n_sessoes} × "
+           f"{custo_sessao / 1024:.0f} KB por sessão. Picos transitórios (geração de PDF/Excel) somam-se a isso.")
+
+with st.expander("session_state desta sessão"):
+    st.dataframe(
+        pd.DataFrame(
+            [(chave, tamanho(valor) / 1024) for chave, valor in st.session_state.items()],
+            columns=["Chave", "KB"],
+        ).sort_values("KB", ascending=False).round(2),
+        use_container_width=True, hide_index=True,
+    )
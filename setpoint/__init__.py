@@ -0,0 +1,41 @@
+# ----------------------------
+# Núcleo do Setpoint Tools
+# ----------------------------
+# Pacote sem dependência de Streamlit/plotly/reportlab: carregamento das
+# tabelas e cálculos compartilhados por main.py, pages/Flow.py e jobs em lote.
+# Os nomes abaixo são importados sob demanda, então `import setpoint.fluxo`
+# custa só o NumPy e não carrega pandas/openpyxl.
+from importlib import import_module
+
+_EXPORTS = {
+    "TabelaMaquinas": "setpoint.dados",
+    "TabelaValvulas": "setpoint.dados",
+    "carregar_tabela_maquinas": "setpoint.dados",
+    "carregar_tabela_valvulas": "setpoint.dados",
+    "ValveCurveIndex": "setpoint.indice",
+    "SettingSolver": "setpoint.solver",
+    "dimensionar_lote": "setpoint.lote",
+    "vazao_por_capacidade": "setpoint.fluxo",
+    "vazao_tubo": "setpoint.fluxo",
+    "diametro_sugerido_mm": "setpoint.fluxo",
+    "classificar_faixa": "setpoint.fluxo",
+    "codigo_faixa": "setpoint.fluxo",
+    "varrer": "setpoint.varredura",
+    "propriedades": "setpoint.fluidos",
+    "calcular_prumada": "setpoint.hidraulica",
+    "vazao_por_capacidade_fluido": "setpoint.fluidos",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(nome):
+    if nome in _EXPORTS:
+        valor = getattr(import_module(_EXPORTS[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module 'setpoint' has no attribute {nome!r}")
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,33 @@
+# ----------------------------
+# Acesso aos painéis de administração
+# ----------------------------
+# Os painéis de tempos (main.py, pages/Flow.py) ligam e zeram o rastreio do
+# processo inteiro, e a página de memória lista as sessões de todos os
+# usuários: nada disso pode depender só de um ?admin=1 na URL. Ficam
+# desligados a menos que o servidor configure um dos dois:
+#   SETPOINT_ADMIN_SENHA=<senha>  ?admin=1 pede a senha (uma vez por sessão)
+#   SETPOINT_ADMIN=1              liberado para todos (máquina local, benchmarks)
+# Sem Streamlit aqui; o campo da senha fica nas páginas.
+from __future__ import annotations
+
+import hmac
+import os
+
+VARIAVEL_SENHA = "SETPOINT_ADMIN_SENHA"
+VARIAVEL_LIVRE = "SETPOINT_ADMIN"
+
+
+def liberado_para_todos() -> bool:
+    return os.environ.get(VARIAVEL_LIVRE, "") not in ("", "0")
+
+
+def senha_configurada() -> bool:
+    return bool(os.environ.get(VARIAVEL_SENHA))
+
+
+def senha_confere(senha: str | None) -> bool:
+    """True se `senha` é a de SETPOINT_ADMIN_SENHA (falso se não houver senha configurada)."""
+    esperada = os.environ.get(VARIAVEL_SENHA, "")
+    if not esperada or not senha:
+        return False
+    return hmac.compare_digest(senha.encode("utf-8"), esperada.encode("utf-8"))
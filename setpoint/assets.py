@@ -0,0 +1,99 @@
+# ----------------------------
+# Imagens do app (logos) reduzidas e servidas como arquivo estático
+# ----------------------------
+# As PNGs originais têm centenas de KB e eram embutidas em base64 no HTML a
+# cada rerun. Aqui cada imagem é reduzida uma vez para o tamanho em que é
+# exibida, recomprimida e gravada em ./static (servida pelo Streamlit com
+# server.enableStaticServing, com ETag/Last-Modified). O nome do arquivo leva
+# o hash do conteúdo, então o navegador pode guardar a imagem em cache sem
+# risco de mostrar uma versão antiga.
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+# ./static ao lado do main.py, que é onde o Streamlit procura
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+URL_STATIC = "app/static"
+
+_cache: dict[tuple, tuple[str | None, bytes]] = {}
+_lock = threading.Lock()
+
+
+def reduzir_png(caminho: str, largura: int | None, altura: int | None) -> bytes:
+    """PNG reduzido para caber em largura x altura (px), sem ampliar."""
+    from PIL import Image
+
+    with Image.open(caminho) as img:
+        img.load()
+        limite = (largura or img.width, altura or img.height)
+        img.thumbnail(limite, Image.LANCZOS)
+        saida = BytesIO()
+        img.save(saida, format="PNG", optimize=True)
+    return saida.getvalue()
+
+
+def _preparar(caminho: str, largura: int | None, altura: int | None, pasta: str) -> tuple[str | None, bytes]:
+    caminho = os.path.abspath(caminho)
+    stat = os.stat(caminho)
+    chave = (caminho, stat.st_mtime_ns, stat.st_size, largura, altura, os.path.abspath(pasta))
+
+    with _lock:
+        if chave in _cache:
+            return _cache[chave]
+
+        conteudo = reduzir_png(caminho, largura, altura)
+        base = os.path.splitext(os.path.basename(caminho))[0]
+        medida = f"w{largura}" if largura else f"h{altura}"
+        nome = f"{base}_{medida}_{hashlib.sha256(conteudo).hexdigest()[:10]}.png"
+
+        destino = os.path.join(pasta, nome)
+        if not os.path.exists(destino) and not _gravar(destino, conteudo):
+            nome = None
+
+        _cache[chave] = (nome, conteudo)
+        return nome, conteudo
+
+
+def _gravar(destino: str, conteudo: bytes) -> bool:
+    # Checkout/contêiner somente leitura: sem arquivo estático, a imagem
+    # segue como data URI (ver url_asset)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, destino)
+    except OSError:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def url_asset(caminho: str, largura: int | None = None, altura: int | None = None,
+              pasta: str = PASTA_STATIC) -> str:
+    """URL estática (app/static/...) da imagem reduzida para largura/altura.
+
+    Se ./static não puder ser gravada, devolve o data URI da mesma imagem.
+    """
+    nome, conteudo = _preparar(caminho, largura, altura, pasta)
+    if nome is None:
+        return _data_uri(conteudo)
+    return f"{URL_STATIC}/{nome}"
+
+
+def data_uri_asset(caminho: str, largura: int | None = None, altura: int | None = None,
+                   pasta: str = PASTA_STATIC) -> str:
+    """Alternativa sem static serving: data URI da imagem já reduzida."""
+    _, conteudo = _preparar(caminho, largura, altura, pasta)
+    return _data_uri(conteudo)
+
+
+def _data_uri(conteudo: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(conteudo).decode()
@@ -0,0 +1,184 @@
+# ----------------------------
+# Carregamento das tabelas Excel com cache
+# ----------------------------
+# Cada rerun do Streamlit reexecuta o script inteiro; aqui as planilhas são
+# lidas e normalizadas uma única vez por processo. A chave do cache é o caminho
+# do arquivo + (mtime, tamanho) e, quando isso muda, o hash SHA-256 do
+# conteúdo: se o arquivo foi só "tocado", nada é reprocessado; se o conteúdo
+# mudou, a tabela é recarregada automaticamente. Se houver um snapshot
+# compilado da planilha (setpoint.snapshot) ainda válido, ele é aberto por
+# mmap no lugar do read_excel.
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from io import BytesIO
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from setpoint.rastreio import rastrear
+
+COLUNA_SETTING = "Setting (%)"
+COLUNA_CAPACIDADE = "Capacidade (Btuh)"
+COLUNA_DN = "DN"
+
+ARQUIVO_VALVULAS = "tabela_valvulas.xlsx"
+ARQUIVO_MAQUINAS = "Relação de capacidade das máquinas.xlsx"
+
+
+@dataclass(frozen=True)
+class TabelaValvulas:
+    df: pd.DataFrame          # somente leitura
+    dn_options: list[str]
+    versao: str               # hash SHA-256 do arquivo de origem
+
+    @cached_property
+    def indice(self):
+        # Construído uma vez por versão da tabela e compartilhado entre sessões
+        from setpoint.indice import ValveCurveIndex
+        return ValveCurveIndex.from_frame(self.df, self.dn_options)
+
+    @cached_property
+    def solver(self):
+        from setpoint.solver import SettingSolver
+        return SettingSolver(self.indice)
+
+
+@dataclass(frozen=True)
+class TabelaMaquinas:
+    df: pd.DataFrame          # somente leitura
+    capacidades: list[int]    # capacidades únicas, ordenadas
+    versao: str
+
+    @cached_property
+    def resolvedor_dn(self):
+        # Capacidade -> rótulo de DN da coluna "DN" da planilha (ou o mapa padrão)
+        from setpoint.selecao import RESOLVEDOR_PADRAO, ResolvedorDN
+        if COLUNA_DN not in self.df.columns:
+            return RESOLVEDOR_PADRAO
+        return ResolvedorDN.da_tabela(self.df, COLUNA_CAPACIDADE, COLUNA_DN)
+
+
+_cache: dict[str, tuple[tuple[int, int], str, object]] = {}
+_lock = threading.Lock()
+
+
+def _frame_somente_leitura(colunas: dict[str, np.ndarray]) -> pd.DataFrame:
+    # Agrupa colunas consecutivas de mesmo dtype num bloco 2D somente leitura
+    # e monta o DataFrame sem cópia: qualquer escrita levanta ValueError.
+    partes: list[pd.DataFrame] = []
+    nomes = list(colunas)
+    dtypes = [colunas[n].dtype for n in nomes]
+    runs = [d for i, d in enumerate(dtypes) if i == 0 or d != dtypes[i - 1]]
+    if len(runs) != len(set(runs)):
+        # O pandas consolidaria blocos repetidos numa cópia gravável
+        comum = np.result_type(*runs)
+        colunas = {n: colunas[n].astype(comum) for n in nomes}
+    inicio = 0
+    while inicio < len(nomes):
+        dtype = colunas[nomes[inicio]].dtype
+        fim = inicio
+        while fim < len(nomes) and colunas[nomes[fim]].dtype == dtype:
+            fim += 1
+        bloco = np.column_stack([colunas[n] for n in nomes[inicio:fim]])
+        bloco.flags.writeable = False
+        partes.append(pd.DataFrame(bloco, columns=nomes[inicio:fim], copy=False))
+        inicio = fim
+    if len(partes) == 1:
+        return partes[0]
+    return pd.concat(partes, axis=1, copy=False)
+
+
+def _carregar_com_cache(caminho: str, tipo: str):
+    caminho = os.path.abspath(caminho)
+    stat = os.stat(caminho)
+    chave_stat = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        entrada = _cache.get(caminho)
+        if entrada is not None and entrada[0] == chave_stat:
+            return entrada[2]
+
+        from setpoint import snapshot
+        aberto = snapshot.abrir(caminho, tipo, chave_stat)
+        if aberto is not None:
+            versao, tabela = aberto
+            _cache[caminho] = (chave_stat, versao, tabela)
+            return tabela
+
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+        versao = hashlib.sha256(conteudo).hexdigest()
+
+        # Mesmo conteúdo com mtime novo: só atualiza a chave
+        if entrada is not None and entrada[1] == versao:
+            _cache[caminho] = (chave_stat, versao, entrada[2])
+            return entrada[2]
+
+        tabela = _PARSERS[tipo](conteudo, versao)
+        _cache[caminho] = (chave_stat, versao, tabela)
+        if os.path.isdir(snapshot.pasta_snapshot(caminho)):
+            # Snapshot desatualizado: recompila para a próxima carga
+            try:
+                snapshot.salvar(tabela, tipo, caminho, chave_stat)
+            except OSError:
+                pass
+        return tabela
+
+
+@rastrear()
+def _parse_valvulas(conteudo: bytes, versao: str) -> TabelaValvulas:
+    bruto = pd.read_excel(BytesIO(conteudo))
+    if COLUNA_SETTING not in bruto.columns:
+        raise ValueError("A tabela de válvulas não contém a coluna 'Setting (%)'. Verifique o arquivo Excel.")
+
+    setting = (
+        bruto[COLUNA_SETTING]
+        .astype(str)
+        .str.replace('%', '', regex=True)
+        .astype(float)
+        .round()
+        .astype(int)
+        .to_numpy()
+    )
+    dn_options = [col for col in bruto.columns if col != COLUNA_SETTING]
+    vazoes = bruto[dn_options].apply(pd.to_numeric, errors='coerce')
+
+    colunas = {COLUNA_SETTING: setting}
+    colunas.update({col: vazoes[col].to_numpy() for col in dn_options})
+    df = _frame_somente_leitura(colunas)
+    return TabelaValvulas(df=df, dn_options=dn_options, versao=versao)
+
+
+@rastrear()
+def _parse_maquinas(conteudo: bytes, versao: str) -> TabelaMaquinas:
+    bruto = pd.read_excel(BytesIO(conteudo))
+    df = _frame_somente_leitura({col: bruto[col].to_numpy() for col in bruto.columns})
+    capacidades = sorted(pd.Series(bruto[COLUNA_CAPACIDADE].dropna().unique()).astype(int).tolist())
+    return TabelaMaquinas(df=df, capacidades=capacidades, versao=versao)
+
+
+_PARSERS: dict[str, Callable[[bytes, str], object]] = {
+    "valvulas": _parse_valvulas,
+    "maquinas": _parse_maquinas,
+}
+
+
+@rastrear()
+def carregar_tabela_valvulas(caminho: str = ARQUIVO_VALVULAS) -> TabelaValvulas:
+    return _carregar_com_cache(caminho, "valvulas")
+
+
+@rastrear()
+def carregar_tabela_maquinas(caminho: str = ARQUIVO_MAQUINAS) -> TabelaMaquinas:
+    return _carregar_com_cache(caminho, "maquinas")
+
+
+def limpar_cache() -> None:
+    with _lock:
+        _cache.clear()
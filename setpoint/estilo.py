@@ -0,0 +1,74 @@
+# ----------------------------
+# Estilo "neon" da tabela de referência, vetorizado
+# ----------------------------
+# Antes, neon_pulse_style rodava em Python para cada linha e cada coluna.
+# Aqui a intensidade do brilho é calculada de uma vez na coluna do DN
+# escolhido (NumPy) e o Styler recebe só essa coluna (subset), então o
+# custo não cresce com o número de colunas DN. As strings geradas são as
+# mesmas da versão por linha. O quadro de estilos fica em cache por
+# (versão da tabela, DN, vazão, cor).
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from setpoint.rastreio import rastrear
+
+_cache: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+_lock = threading.Lock()
+_MAX_CACHE = 128
+
+
+def estilo_neon_frame(df: pd.DataFrame, dn_choice, vazao_lh, cor: str) -> pd.DataFrame | None:
+    """CSS da coluna `dn_choice`: destaque na vazão exata e brilho
+    proporcional à proximidade de `vazao_lh`.
+
+    Só a coluna do DN tem estilo, então o quadro devolvido tem só ela (use
+    com Styler.apply(..., axis=None, subset=[dn_choice])); None quando não há
+    o que destacar.
+    """
+    if dn_choice not in df.columns or vazao_lh is None:
+        return None
+    coluna = df[dn_choice].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intensidade = 1 - np.abs(coluna - vazao_lh) / vazao_lh
+    # max(0, x) do Python devolvia o int 0 para x <= 0 (e para NaN)
+    raio = (5 * intensidade).astype(str)
+    raio[~(intensidade > 0)] = "0"
+    brilho = np.char.add(np.char.add("text-shadow: 0 0 ", raio), f"px {cor}; color: {cor};")
+
+    estilos = np.where(
+        coluna == vazao_lh,
+        f"background-color: {cor}; color: #000; font-weight: bold;",
+        brilho.astype(object),
+    )
+    return pd.DataFrame({dn_choice: estilos}, index=df.index)
+
+
+def aplicar_estilo_neon(df: pd.DataFrame, estilos: pd.DataFrame | None):
+    """Styler de `df` com os estilos de estilo_neon_frame/estilos_neon."""
+    styler = df.style
+    if estilos is not None:
+        styler = styler.apply(lambda _: estilos, axis=None, subset=list(estilos.columns))
+    return styler
+
+
+@rastrear()
+def estilos_neon(tabela, dn_choice, vazao_lh, cor: str) -> pd.DataFrame | None:
+    """estilo_neon_frame com cache por (versão da tabela, DN, vazão, cor)."""
+    chave = (tabela.versao, dn_choice, None if vazao_lh is None else float(vazao_lh), cor)
+    with _lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    estilos = estilo_neon_frame(tabela.df, dn_choice, vazao_lh, cor)
+    with _lock:
+        _cache[chave] = estilos
+        while len(_cache) > _MAX_CACHE:
+            _cache.popitem(last=False)
+    return estilos
@@ -0,0 +1,164 @@
+# ----------------------------
+# Exportação Excel (XlsxWriter em modo constant_memory)
+# ----------------------------
+# O gerar_excel antigo copiava a tabela, colava o resumo ao lado com
+# pd.concat(axis=1) (preenchendo tudo com NaN) e montava o arquivo em memória
+# a cada rerun. Aqui o arquivo é escrito linha a linha com constant_memory:
+# o XlsxWriter só guarda a linha corrente de cada aba, então uma planilha de
+# lote com centenas de milhares de unidades não aumenta a memória. Abas:
+#   Resumo  — pares campo/valor (e contagem por DN no lote)
+#   Lote    — uma linha por válvula dimensionada (só no lote)
+#   Tabela  — a tabela de referência, com a coluna do DN destacada
+# No constant_memory cada aba precisa ser escrita em ordem de linhas, e a
+# ordem das abas é a de criação.
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from setpoint.rastreio import rastrear
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_LINHAS_POR_BLOCO = 10_000
+
+
+def _sem_progresso(fracao: float, etapa: str) -> None:
+    pass
+
+
+def _valor(v):
+    # NaN/None viram célula vazia (write_number recusa NaN)
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+class _Formatos:
+    def __init__(self, workbook):
+        self.cabecalho = workbook.add_format({"bold": True, "font_color": "#FFFFFF", "bg_color": "#111111",
+                                              "border": 1})
+        self.campo = workbook.add_format({"bold": True})
+        self.destaque = workbook.add_format({"bg_color": "#FF0000", "font_color": "#000000", "bold": True})
+        self.numero = workbook.add_format({"num_format": "0.00"})
+        self.inteiro = workbook.add_format({"num_format": "0"})
+
+
+def _escrever_resumo(ws, formatos: _Formatos, resumo: dict, contagem_dn: pd.Series | None = None) -> None:
+    ws.set_column(0, 0, 28)
+    ws.set_column(1, 1, 22)
+    ws.write_row(0, 0, ["Campo", "Valor"], formatos.cabecalho)
+    linha = 1
+    for campo, valor in resumo.items():
+        ws.write(linha, 0, campo, formatos.campo)
+        ws.write(linha, 1, _valor(valor))
+        linha += 1
+
+    if contagem_dn is not None and len(contagem_dn):
+        linha += 1
+        ws.write_row(linha, 0, ["DN", "Válvulas"], formatos.cabecalho)
+        for dn, qtd in contagem_dn.items():
+            linha += 1
+            ws.write_row(linha, 0, [dn, int(qtd)])
+
+
+def _escrever_frame(ws, formatos: _Formatos, df: pd.DataFrame, progresso=_sem_progresso,
+                    fracao: tuple[float, float] = (0.0, 1.0), destacar: str | None = None,
+                    linha_destaque: int | None = None) -> None:
+    """Cabeçalho + linhas de `df`, em blocos (sem materializar a aba inteira)."""
+    colunas = list(df.columns)
+    ws.set_column(0, len(colunas) - 1, 16)
+    ws.write_row(0, 0, colunas, formatos.cabecalho)
+    col_destaque = colunas.index(destacar) if destacar in colunas else None
+
+    total = max(len(df), 1)
+    inicio, fim = fracao
+    for ini in range(0, len(df), _LINHAS_POR_BLOCO):
+        bloco = df.iloc[ini:ini + _LINHAS_POR_BLOCO]
+        for i, registro in enumerate(bloco.itertuples(index=False, name=None), start=ini):
+            ws.write_row(i + 1, 0, [_valor(v) for v in registro])
+            if col_destaque is not None and i == linha_destaque:
+                ws.write(i + 1, col_destaque, _valor(registro[col_destaque]), formatos.destaque)
+        progresso(inicio + (fim - inicio) * min(ini + _LINHAS_POR_BLOCO, total) / total,
+                  f"Escrevendo {min(ini + _LINHAS_POR_BLOCO, len(df))}/{len(df)} linhas")
+
+
+def escrever_excel(destino, df_valvulas: pd.DataFrame, resumo: dict, lote: pd.DataFrame | None = None,
+                   dn_destaque: str | None = None, linha_destaque: int | None = None, progresso=_sem_progresso):
+    """Grava o .xlsx em `destino` (caminho ou arquivo binário) e devolve `destino`.
+
+    `resumo` vira a aba Resumo (campo → valor). Com `lote`, também a aba
+    Lote e a contagem de válvulas por DN. `dn_destaque`/`linha_destaque`
+    (posição na tabela, ex.: ValveCurveIndex.nearest_row) marcam na aba
+    Tabela a célula do ponto recomendado.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    try:
+        formatos = _Formatos(workbook)
+        contagem_dn = None
+        if lote is not None:
+            contagem_dn = lote["DN"].dropna().value_counts().sort_index()
+
+        progresso(0.0, "Resumo")
+        _escrever_resumo(workbook.add_worksheet("Resumo"), formatos, resumo, contagem_dn)
+
+        if lote is not None:
+            _escrever_frame(workbook.add_worksheet("Lote"), formatos, lote, progresso, fracao=(0.05, 0.9))
+
+        _escrever_frame(workbook.add_worksheet("Tabela"), formatos, df_valvulas, destacar=dn_destaque,
+                        linha_destaque=linha_destaque)
+
+        progresso(0.95, "Compactando")
+    finally:
+        workbook.close()
+    progresso(1.0, "Concluído")
+    return destino
+
+
+@rastrear()
+def excel_resultado(df_valvulas: pd.DataFrame, dn: str, vazao_projeto_lh: float, ajuste, vazao_lh: float,
+                    modo: str = "nearest", linha: int | None = None) -> bytes:
+    """Bytes do .xlsx de um único dimensionamento (tabela + resumo).
+
+    `linha`: linha da tabela destacada na coluna `dn`. Nos modos
+    interpolados o ajuste não coincide com nenhum Setting da tabela, então
+    quem chama passa a linha mais próxima da vazão ajustada.
+    """
+    resumo = {
+        "DN": dn,
+        "Vazão de projeto (L/h)": round(float(vazao_projeto_lh), 2),
+        "Ajuste recomendado (%)": ajuste,
+        "Vazão ajustada (L/h)": round(float(vazao_lh), 2),
+        "Desvio (L/h)": round(float(vazao_lh - vazao_projeto_lh), 2),
+        "Modo de ajuste": modo,
+        "Gerado em": datetime.now().strftime("%d/%m/%Y %H:%M"),
+    }
+    saida = BytesIO()
+    escrever_excel(saida, df_valvulas, resumo, dn_destaque=dn, linha_destaque=linha)
+    return saida.getvalue()
+
+
+@rastrear()
+def gerar_excel_lote(df_lote: pd.DataFrame, df_valvulas: pd.DataFrame, destino: str, modo: str = "nearest",
+                     progresso=_sem_progresso) -> str:
+    """Planilha do projeto (resumo + uma linha por válvula) gravada em `destino`."""
+    desvio = df_lote["Desvio (%)"].to_numpy(dtype=float)
+    dimensionadas = int(np.isfinite(desvio).sum())
+    resumo = {
+        "Unidades": len(df_lote),
+        "Válvulas dimensionadas": dimensionadas,
+        "Unidades sem DN": int(df_lote["DN"].isna().sum()),
+        "Desvio médio absoluto (%)": round(float(np.nanmean(np.abs(desvio))), 2) if dimensionadas else None,
+        "Desvio máximo absoluto (%)": round(float(np.nanmax(np.abs(desvio))), 2) if dimensionadas else None,
+        "Modo de ajuste": modo,
+        "Gerado em": datetime.now().strftime("%d/%m/%Y %H:%M"),
+    }
+    return escrever_excel(destino, df_valvulas, resumo, lote=df_lote, progresso=progresso)
@@ -0,0 +1,156 @@
+# ----------------------------
+# Propriedades do fluido (água e misturas com glicol)
+# ----------------------------
+# Densidade, calor específico e viscosidade em função da temperatura e da
+# concentração (% em massa), interpoladas bilinearmente em tabelas. Os
+# valores são aproximados e arredondados a partir das tabelas de
+# propriedades de soluções de glicol do ASHRAE Handbook — Fundamentals
+# (cap. 31); a linha 0% é água pura. Fora da faixa tabelada (0–80 °C,
+# 0–50%) os valores são limitados às bordas da tabela.
+#
+# Aceita escalares ou arrays (com broadcast). Consultas escalares, que são o
+# caso de cada rerun das páginas, ficam memorizadas.
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from setpoint import fluxo
+
+AGUA = "agua"
+ETILENOGLICOL = "etilenoglicol"
+PROPILENOGLICOL = "propilenoglicol"
+
+NOMES_FLUIDOS = {
+    AGUA: "Água",
+    ETILENOGLICOL: "Etilenoglicol (MEG)",
+    PROPILENOGLICOL: "Propilenoglicol (MPG)",
+}
+
+TEMPERATURAS_C = np.array([0.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 80.0])
+CONCENTRACOES = np.array([0.0, 10.0, 20.0, 30.0, 40.0, 50.0])
+
+# Ponto de congelamento (°C) por concentração, para avisos
+CONGELAMENTO_C = {
+    AGUA: np.array([0.0]),
+    ETILENOGLICOL: np.array([0.0, -3.2, -7.8, -14.1, -22.3, -33.8]),
+    PROPILENOGLICOL: np.array([0.0, -3.3, -7.1, -12.7, -21.1, -33.5]),
+}
+
+_AGUA_RHO = [999.8, 999.7, 998.2, 995.7, 992.2, 988.0, 983.2, 971.8]
+_AGUA_CP = [4217, 4192, 4182, 4178, 4179, 4181, 4185, 4197]
+_AGUA_MU = [1.792, 1.307, 1.002, 0.798, 0.653, 0.547, 0.467, 0.355]
+
+# [concentração, temperatura]: kg/m³, J/(kg·K), mPa·s
+_TABELAS = {
+    ETILENOGLICOL: (
+        [_AGUA_RHO,
+         [1014.3, 1013.3, 1011.4, 1008.6, 1005.1, 1001.0, 996.3, 985.6],
+         [1028.5, 1026.8, 1024.4, 1021.2, 1017.4, 1012.9, 1007.9, 996.5],
+         [1043.3, 1040.8, 1037.8, 1034.2, 1030.0, 1025.2, 1019.9, 1007.9],
+         [1058.0, 1054.8, 1051.3, 1047.3, 1042.8, 1037.7, 1032.1, 1019.6],
+         [1072.4, 1068.6, 1064.6, 1060.2, 1055.3, 1050.0, 1044.2, 1031.2]],
+        [_AGUA_CP,
+         [3937, 3956, 3975, 3994, 4013, 4032, 4051, 4089],
+         [3793, 3818, 3843, 3868, 3893, 3918, 3943, 3993],
+         [3640, 3670, 3700, 3730, 3760, 3790, 3820, 3880],
+         [3471, 3506, 3541, 3576, 3611, 3646, 3681, 3751],
+         [3303, 3342, 3381, 3420, 3459, 3498, 3537, 3615]],
+        [_AGUA_MU,
+         [2.23, 1.65, 1.26, 0.99, 0.81, 0.67, 0.57, 0.43],
+         [2.86, 2.08, 1.57, 1.23, 0.99, 0.82, 0.69, 0.52],
+         [3.87, 2.77, 2.06, 1.59, 1.27, 1.04, 0.87, 0.64],
+         [5.22, 3.64, 2.64, 2.00, 1.57, 1.27, 1.05, 0.76],
+         [7.20, 4.85, 3.45, 2.56, 1.99, 1.59, 1.30, 0.92]],
+    ),
+    PROPILENOGLICOL: (
+        [_AGUA_RHO,
+         [1010.6, 1009.9, 1008.2, 1005.6, 1002.1, 997.9, 993.0, 981.6],
+         [1021.8, 1020.4, 1017.9, 1014.6, 1010.5, 1005.7, 1000.2, 987.8],
+         [1033.5, 1031.3, 1028.0, 1024.0, 1019.2, 1013.7, 1007.6, 993.8],
+         [1044.1, 1040.8, 1036.9, 1032.2, 1026.8, 1020.8, 1014.1, 999.2],
+         [1053.3, 1049.1, 1044.6, 1039.4, 1033.5, 1027.0, 1019.9, 1003.9]],
+        [_AGUA_CP,
+         [4089, 4099, 4109, 4119, 4129, 4139, 4149, 4169],
+         [3977, 3995, 4013, 4031, 4049, 4067, 4085, 4121],
+         [3830, 3856, 3882, 3908, 3934, 3960, 3986, 4038],
+         [3669, 3703, 3737, 3771, 3805, 3839, 3873, 3941],
+         [3489, 3529, 3569, 3609, 3649, 3689, 3729, 3809]],
+        [_AGUA_MU,
+         [2.54, 1.81, 1.34, 1.03, 0.82, 0.67, 0.56, 0.41],
+         [3.89, 2.67, 1.91, 1.43, 1.11, 0.89, 0.73, 0.53],
+         [6.17, 4.00, 2.76, 2.01, 1.52, 1.19, 0.96, 0.67],
+         [10.6, 6.48, 4.25, 2.96, 2.16, 1.64, 1.29, 0.87],
+         [18.9, 10.9, 6.72, 4.46, 3.14, 2.32, 1.78, 1.14]],
+    ),
+}
+# Água: a mesma linha repetida em todas as concentrações
+_TABELAS[AGUA] = tuple([linha] * len(CONCENTRACOES) for linha in (_AGUA_RHO, _AGUA_CP, _AGUA_MU))
+
+# (fluido) -> array (3, concentrações, temperaturas); viscosidade em Pa·s
+_GRADES = {
+    fluido: np.array(tabelas, dtype=float) * np.array([1.0, 1.0, 1e-3])[:, None, None]
+    for fluido, tabelas in _TABELAS.items()
+}
+for _grade in _GRADES.values():
+    _grade.flags.writeable = False
+
+
+class Propriedades(NamedTuple):
+    rho: np.ndarray   # kg/m³
+    cp: np.ndarray    # J/(kg·K)
+    mu: np.ndarray    # Pa·s
+
+
+def _pesos(eixo: np.ndarray, valores) -> tuple[np.ndarray, np.ndarray]:
+    # Índice do intervalo à esquerda e fração dentro dele (limitado às bordas)
+    x = np.clip(np.asarray(valores, dtype=float), eixo[0], eixo[-1])
+    i = np.clip(np.searchsorted(eixo, x, side="right") - 1, 0, len(eixo) - 2)
+    return i, (x - eixo[i]) / (eixo[i + 1] - eixo[i])
+
+
+def _interpolar(fluido: str, temperatura_c, concentracao) -> np.ndarray:
+    if fluido not in _GRADES:
+        raise ValueError(f"Fluido desconhecido: {fluido!r}. Opções: {', '.join(_GRADES)}")
+    grade = _GRADES[fluido]
+    temperatura_c, concentracao = np.broadcast_arrays(np.asarray(temperatura_c, dtype=float),
+                                                      np.asarray(concentracao, dtype=float))
+    it, ft = _pesos(TEMPERATURAS_C, temperatura_c)
+    ic, fc = _pesos(CONCENTRACOES, concentracao)
+    # Bilinear nas quatro células vizinhas, as três propriedades juntas
+    return ((1 - fc) * (1 - ft) * grade[:, ic, it] + (1 - fc) * ft * grade[:, ic, it + 1]
+            + fc * (1 - ft) * grade[:, ic + 1, it] + fc * ft * grade[:, ic + 1, it + 1])
+
+
+@lru_cache(maxsize=1024)
+def _propriedades_escalar(fluido: str, temperatura_c: float, concentracao: float) -> Propriedades:
+    return Propriedades(*(float(v) for v in _interpolar(fluido, temperatura_c, concentracao)))
+
+
+def propriedades(fluido: str = AGUA, temperatura_c=20.0, concentracao=0.0) -> Propriedades:
+    """ρ, cp e μ do fluido na temperatura (°C) e concentração (% em massa).
+
+    Escalares devolvem floats (memorizados); arrays devolvem arrays.
+    """
+    if np.ndim(temperatura_c) == 0 and np.ndim(concentracao) == 0:
+        return _propriedades_escalar(fluido, float(temperatura_c), float(concentracao))
+    return Propriedades(*_interpolar(fluido, temperatura_c, concentracao))
+
+
+def ponto_congelamento(fluido: str, concentracao: float) -> float:
+    """Ponto de congelamento aproximado (°C) da mistura."""
+    pontos = CONGELAMENTO_C[fluido]
+    return float(np.interp(concentracao, CONCENTRACOES[:len(pontos)], pontos))
+
+
+def vazao_por_capacidade_fluido(btu_h, fluido: str = AGUA, temperatura_c=10.0, concentracao=0.0,
+                                delta_T=None, faixa=None) -> fluxo.VazaoMaquina:
+    """vazao_por_capacidade com ρ e cp do fluido na temperatura média do circuito."""
+    props = propriedades(fluido, temperatura_c, concentracao)
+    return fluxo.vazao_por_capacidade(
+        btu_h, cp=props.cp, rho=props.rho,
+        delta_T=fluxo.delta_T if delta_T is None else delta_T,
+        faixa=fluxo.faixa if faixa is None else faixa,
+    )
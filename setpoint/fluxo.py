@@ -0,0 +1,98 @@
+# ----------------------------
+# Cálculos de vazão (capacidade da máquina e tubo manual)
+# ----------------------------
+# Funções puras, só com NumPy: aceitam escalares ou arrays (com broadcast)
+# e são usadas por pages/Flow.py, main.py e pelos jobs em lote.
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+# --- Constantes ---
+btu_to_kw = 0.000293
+cp = 4186          # J/(kg·K), água
+delta_T = 5.5      # K
+rho = 1000         # kg/m³, água
+faixa = 0.2        # ±20% em torno da vazão de projeto
+
+STATUS_INDEFINIDO = "⚪"
+STATUS_ABAIXO = "🔴"
+STATUS_DENTRO = "🟢"
+STATUS_ACIMA = "🟠"
+# Ordem dos códigos de codigo_faixa (0..3)
+STATUS = (STATUS_INDEFINIDO, STATUS_ABAIXO, STATUS_DENTRO, STATUS_ACIMA)
+
+
+class VazaoMaquina(NamedTuple):
+    p_kw: np.ndarray
+    m_dot: np.ndarray          # kg/s
+    q_m3_s: np.ndarray
+    q_m3_h: np.ndarray
+    q_l_h: np.ndarray
+    limite_min_lh: np.ndarray
+    limite_max_lh: np.ndarray
+
+
+class VazaoTubo(NamedTuple):
+    area: np.ndarray           # m²
+    vazao_m3s: np.ndarray
+    vazao_m3h: np.ndarray
+    vazao_lh: np.ndarray
+    massa_kg_s: np.ndarray
+    massa_kg_h: np.ndarray
+
+
+def vazao_por_capacidade(btu_h, cp=cp, delta_T=delta_T, rho=rho, faixa=faixa) -> VazaoMaquina:
+    """Vazão de água para retirar a carga térmica (Q = ṁ·cp·ΔT)."""
+    p_kw = np.multiply(btu_h, btu_to_kw)
+    m_dot = (p_kw * 1000) / (np.multiply(cp, delta_T))
+    q_m3_s = m_dot / rho
+    q_m3_h = q_m3_s * 3600
+    q_l_h = q_m3_h * 1000
+    return VazaoMaquina(p_kw, m_dot, q_m3_s, q_m3_h, q_l_h, q_l_h * (1 - faixa), q_l_h * (1 + faixa))
+
+
+def vazao_tubo(diametro_mm, velocidade, densidade=rho) -> VazaoTubo:
+    """Vazão num tubo de diâmetro interno (mm) com velocidade média (m/s)."""
+    area = np.pi * (np.divide(diametro_mm, 1000) / 2) ** 2
+    vazao_m3s = area * velocidade
+    vazao_m3h = vazao_m3s * 3600
+    vazao_lh = vazao_m3h * 1000
+    massa_kg_s = vazao_m3s * densidade
+    massa_kg_h = massa_kg_s * 3600
+    return VazaoTubo(area, vazao_m3s, vazao_m3h, vazao_lh, massa_kg_s, massa_kg_h)
+
+
+def diametro_sugerido_mm(q_m3_s, velocidade):
+    """Diâmetro interno que leva a vazão q na velocidade informada."""
+    area_necessaria = np.divide(q_m3_s, velocidade)
+    return 2 * np.sqrt(area_necessaria / np.pi) * 1000
+
+
+def codigo_faixa(valor, minimo, maximo) -> np.ndarray:
+    """Índice em STATUS (int8): 0 NaN, 1 abaixo, 2 dentro, 3 acima da faixa.
+
+    Mesma regra de classificar_faixa, sem montar strings; para grades
+    grandes (ex.: pd.Categorical.from_codes(codigos, STATUS)).
+    """
+    valor, minimo, maximo = (np.asarray(x, dtype=float) for x in (valor, minimo, maximo))
+    return np.select(
+        [np.isnan(valor), valor < minimo, valor > maximo],
+        [np.int8(0), np.int8(1), np.int8(3)],
+        default=np.int8(2),
+    ).astype(np.int8, copy=False)
+
+
+def classificar_faixa(valor, minimo, maximo, indefinido=STATUS_INDEFINIDO):
+    """🔴 abaixo / 🟢 dentro / 🟠 acima da faixa; `indefinido` para NaN.
+
+    Com escalares devolve str; com arrays, um array de str.
+    """
+    valor, minimo, maximo = (np.asarray(x, dtype=float) for x in (valor, minimo, maximo))
+    status = np.select(
+        [np.isnan(valor), valor < minimo, valor > maximo],
+        [indefinido, STATUS_ABAIXO, STATUS_ACIMA],
+        default=STATUS_DENTRO,
+    )
+    return status.item() if status.ndim == 0 else status
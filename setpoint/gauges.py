@@ -0,0 +1,57 @@
+# ----------------------------
+# Gauges do Flow Dashboard (plotly), memorizados pelos valores
+# ----------------------------
+# Cada gauge são dois go.Indicator (ponteiro + linha do mínimo) e montar a
+# figura custa ~6 ms por causa da validação do plotly. A figura depende só
+# dos números e textos de entrada, então fica em cache por processo: reruns
+# com os mesmos valores (e outras sessões) reaproveitam o objeto, e o JSON
+# enviado ao navegador sai idêntico (ver global.minCachedMessageSize em
+# .streamlit/config.toml). A figura devolvida é compartilhada: não modificar.
+from __future__ import annotations
+
+from functools import lru_cache
+
+from setpoint.fluxo import classificar_faixa
+from setpoint.rastreio import rastrear
+
+CORES_GAUGE = {"⚪": "grey", "🔴": "red", "🟠": "orange", "🟢": "green"}
+
+
+def faixa_gauge(valor, minimo, maximo) -> str:
+    return CORES_GAUGE[classificar_faixa(valor, minimo, maximo)]
+
+
+@lru_cache(maxsize=256)
+@rastrear()
+def gauge_with_refs(valor: float, minimo: float, maximo: float, unidade: str, cor_numero: str, titulo: str):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=valor,
+        number={'suffix':f' {unidade}','font':{'color':cor_numero,'size':24}},
+        delta={'reference':maximo,'increasing':{'color':'#ff3333'}},
+        title={'text': f"{titulo}<br><span style='font-size:0.8em;color:#aaaaaa'>Faixa: {minimo:.2f} – {maximo:.2f} {unidade}</span>",
+               'font':{'size':20,'color':'#ffffff'}},
+        gauge={
+            'axis': {'range':[0, valor*1.5], 'tickcolor':'#ffffff', 'tickwidth':2},
+            'bar': {'color':faixa_gauge(valor,minimo,maximo)},
+            'steps': [
+                {'range':[0,minimo],'color':'#ff1a1a'},
+                {'range':[minimo,maximo],'color':'#33ff33'},
+                {'range':[maximo,valor*1.5],'color':'#ffcc33'}
+            ],
+            'threshold': {'line':{'color':'#00ffff','width':4}, 'thickness':0.75,'value':maximo}
+        }
+    ))
+    # Linha mínima neon
+    fig.add_trace(go.Indicator(
+        mode="gauge",
+        value=valor,
+        gauge={'axis':{'range':[0,valor*1.5],'visible':False},
+               'threshold':{'line':{'color':'#ff00ff','width':4}, 'thickness':0.75,'value':minimo},
+               'bar':{'color':'rgba(0,0,0,0)'}},
+        domain={'x':[0,1],'y':[0,1]}
+    ))
+    fig.update_layout(paper_bgcolor="#1e1e2f", font={'color':'#ffffff'}, margin=dict(t=30,b=20,l=20,r=20))
+    return fig
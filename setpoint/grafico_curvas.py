@@ -0,0 +1,129 @@
+# ----------------------------
+# Gráfico das curvas de ajuste (main.py), memorizado e com redução de pontos
+# ----------------------------
+# A figura do expander "Visualizar curvas" saía de um px.line montado a cada
+# rerun, com uma cópia de df_valvulas[['Setting (%)', dn]] por DN comparado.
+# Aqui os traços saem direto dos arrays NumPy da tabela (somente leitura, sem
+# cópia), curvas com mais de `max_pontos` pontos são reduzidas por LTTB
+# (Largest-Triangle-Three-Buckets, que preserva picos e a forma da curva) e a
+# figura fica em cache por (versão da tabela, DNs, ponto recomendado, cor,
+# WebGL, max_pontos). A figura devolvida é compartilhada: não modificar.
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from setpoint.dados import COLUNA_SETTING
+from setpoint.rastreio import rastrear
+
+MAX_PONTOS = 500
+
+_cache: OrderedDict[tuple, object] = OrderedDict()
+_lock = threading.Lock()
+_MAX_CACHE = 64
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Índices de `n` pontos de (x, y) escolhidos por LTTB; x crescente.
+
+    Primeiro e último pontos ficam; os demais são divididos em n - 2 baldes
+    e de cada balde fica o ponto que forma o maior triângulo com o ponto
+    escolhido no balde anterior e a média do balde seguinte. Como no
+    MinMaxLTTB, os candidatos de cada balde são só o de menor e o de maior
+    vazão (pré-seleção vetorizada): o laço em Python fica com dois pontos por
+    balde em vez de um np.argmax por balde.
+    """
+    total = len(x)
+    if n >= total or n < 3:
+        return np.arange(total)
+    bordas = np.linspace(1, total - 1, n - 1).astype(np.intp)
+    contagens = np.diff(bordas)
+    balde = np.repeat(np.arange(n - 2), contagens)
+    ordem = np.lexsort((y[1:-1], balde)) + 1     # por balde, vazão crescente
+    minimos = ordem[bordas[:-1] - 1]
+    maximos = ordem[bordas[1:] - 2]
+    # Média de cada balde; o "seguinte" do último é o ponto final
+    mx = np.append(np.add.reduceat(x[1:-1], bordas[:-1] - 1)[1:] / contagens[1:], x[-1])
+    my = np.append(np.add.reduceat(y[1:-1], bordas[:-1] - 1)[1:] / contagens[1:], y[-1])
+
+    xl, yl = x.tolist(), y.tolist()
+    indices = [0]
+    ax, ay = xl[0], yl[0]
+    for a, b, mxi, myi in zip(minimos.tolist(), maximos.tolist(), mx.tolist(), my.tolist()):
+        area_a = abs((ax - mxi) * (yl[a] - ay) - (ax - xl[a]) * (myi - ay))
+        area_b = abs((ax - mxi) * (yl[b] - ay) - (ax - xl[b]) * (myi - ay))
+        escolhido = a if area_a >= area_b else b
+        indices.append(escolhido)
+        ax, ay = xl[escolhido], yl[escolhido]
+    indices.append(total - 1)
+    return np.asarray(indices, dtype=np.intp)
+
+
+def pontos_curva(tabela, dn: str, max_pontos: int = MAX_PONTOS) -> tuple[np.ndarray, np.ndarray]:
+    """(settings, vazões) de um DN para o gráfico, reduzidos a `max_pontos`."""
+    x = tabela.df[COLUNA_SETTING].to_numpy()
+    y = tabela.df[dn].to_numpy(dtype=float)
+    if len(x) <= max_pontos:
+        return x, y    # tabela pequena: os mesmos pontos (e lacunas NaN) do px.line
+    validos = ~np.isnan(y)
+    x, y = x[validos], y[validos]
+    if np.any(np.diff(x) < 0):
+        ordem = np.argsort(x, kind="stable")
+        x, y = x[ordem], y[ordem]
+    indices = lttb(x.astype(float), y, max_pontos)
+    return x[indices], y[indices]
+
+
+@rastrear("grafico_curvas")
+def figura_curvas(tabela, dn_choice: str, dn_comparar=(), ajuste=None, vazao_lh=None, cor_titulo: str = "#ff0000",
+                  webgl: bool = False, max_pontos: int = MAX_PONTOS):
+    """Figura plotly da curva de `dn_choice` + ponto recomendado + DNs comparados (em cache)."""
+    dn_comparar = tuple(dn for dn in dn_comparar if dn in tabela.df.columns)
+    ponto = (float(ajuste), float(vazao_lh)) if ajuste and vazao_lh else None
+    chave = (tabela.versao, dn_choice, dn_comparar, ponto, cor_titulo, webgl, max_pontos)
+    with _lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    fig = _montar(tabela, dn_choice, dn_comparar, ponto, cor_titulo, webgl, max_pontos)
+    with _lock:
+        _cache[chave] = fig
+        while len(_cache) > _MAX_CACHE:
+            _cache.popitem(last=False)
+    return fig
+
+
+def _montar(tabela, dn_choice, dn_comparar, ponto, cor_titulo, webgl, max_pontos):
+    import plotly.graph_objects as go
+
+    Traco = go.Scattergl if webgl else go.Scatter
+    dica = "Setting (%)=%{x}<br>Vazão (L/h)=%{y}<extra></extra>"
+    x, y = pontos_curva(tabela, dn_choice, max_pontos)
+    tracos = [Traco(x=x, y=y, mode="lines+markers", name=dn_choice, hovertemplate=dica)]
+    if ponto is not None:
+        # Ponto recomendado (texto não existe no scattergl: fica sempre em SVG)
+        tracos.append(go.Scatter(
+            x=[ponto[0]],
+            y=[ponto[1]],
+            mode='markers+text',
+            marker=dict(color='red', size=14, symbol='star'),
+            text=[f"💧 {ponto[1]:.0f} L/h"],
+            textposition='top center',
+            name='Ponto recomendado'
+        ))
+    for dn in dn_comparar:
+        x, y = pontos_curva(tabela, dn, max_pontos)
+        tracos.append(Traco(x=x, y=y, mode='lines+markers', name=f"DN {dn}", hovertemplate=dica))
+
+    fig = go.Figure(tracos)
+    fig.update_layout(template='plotly_dark', title=dict(text=f"Curva de ajuste {dn_choice}"),
+                      title_font=dict(family='Orbitron, monospace', size=22, color=cor_titulo),
+                      showlegend=len(tracos) > 1,
+                      legend=dict(title='Legenda', font=dict(family='Orbitron, monospace', size=12)),
+                      xaxis=dict(title='Setting (%)', showgrid=True, gridcolor='#333'),
+                      yaxis=dict(title='Vazão (L/h)', showgrid=True, gridcolor='#333'),
+                      plot_bgcolor='#111111', paper_bgcolor='#111111')
+    return fig
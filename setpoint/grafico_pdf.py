@@ -0,0 +1,118 @@
+# ----------------------------
+# Gráfico vetorial das curvas para o PDF (reportlab.graphics)
+# ----------------------------
+# Desenha as mesmas curvas DN e estrelas de ponto recomendado do gráfico
+# plotly, mas direto como vetor no PDF: sem Kaleido/Chromium, sem PNG
+# intermediário e com arquivo menor.
+from __future__ import annotations
+
+import math
+
+from setpoint.dados import COLUNA_SETTING
+
+# Paleta padrão do plotly, para manter as cores do app
+CORES_CURVAS = ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A',
+                '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52']
+
+
+def _teto_redondo(valor: float) -> float:
+    if valor <= 0:
+        return 1.0
+    passo = 10 ** math.floor(math.log10(valor))
+    return math.ceil(valor / passo) * passo
+
+
+def curvas_drawing(dn_list, df_valvulas, indice, ajuste=None, vazao_lh=None,
+                   largura: float = 453.5, altura: float = 283.5):
+    """Drawing (flowable reportlab) com as curvas e os pontos recomendados."""
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.shapes import Drawing, Group, Rect, String
+    from reportlab.graphics.widgets.markers import makeMarker
+    from reportlab.lib import colors
+
+    dns = [dn for dn in dn_list if dn in df_valvulas.columns]
+    settings = df_valvulas[COLUNA_SETTING].to_numpy(dtype=float)
+
+    d = Drawing(largura, altura)
+    d.add(Rect(0, 0, largura, altura, fillColor=colors.HexColor('#111111'), strokeColor=None))
+
+    series = []
+    for dn in dns:
+        vazoes = df_valvulas[dn].to_numpy(dtype=float)
+        series.append([(x, y) for x, y in zip(settings, vazoes) if not math.isnan(y)])
+    if not any(series):
+        return d
+
+    # Escalas fixas: as estrelas e rótulos são posicionados com a mesma conta
+    x_min, x_max = float(settings.min()), float(settings.max())
+    y_max = _teto_redondo(max(y for s in series for _, y in s))
+
+    lp = LinePlot()
+    lp.x, lp.y = 55, 60
+    lp.width, lp.height = largura - 75, altura - 100
+    lp.data = series
+    lp.joinedLines = 1
+    lp.xValueAxis.valueMin, lp.xValueAxis.valueMax = x_min, x_max
+    lp.yValueAxis.valueMin, lp.yValueAxis.valueMax = 0, y_max
+    for eixo in (lp.xValueAxis, lp.yValueAxis):
+        eixo.strokeColor = colors.HexColor('#888888')
+        eixo.labels.fillColor = colors.white
+        eixo.labels.fontName = 'Helvetica'
+        eixo.labels.fontSize = 7
+        eixo.visibleGrid = 1
+        eixo.gridStrokeColor = colors.HexColor('#333333')
+        eixo.gridStrokeWidth = 0.5
+    lp.yValueAxis.labelTextFormat = '%d'
+    for i in range(len(series)):
+        cor = colors.HexColor(CORES_CURVAS[i % len(CORES_CURVAS)])
+        lp.lines[i].strokeColor = cor
+        lp.lines[i].strokeWidth = 1.5
+        lp.lines[i].symbol = makeMarker('FilledCircle', size=3, fillColor=cor, strokeColor=cor)
+    d.add(lp)
+
+    # Títulos dos eixos
+    d.add(String(lp.x + lp.width / 2, 22, 'Setting (%)', fontName='Helvetica', fontSize=8,
+                 fillColor=colors.white, textAnchor='middle'))
+    titulo_y = String(0, 0, 'Vazão (L/h)', fontName='Helvetica', fontSize=8,
+                      fillColor=colors.white, textAnchor='middle')
+    grupo_y = Group(titulo_y)
+    grupo_y.translate(14, lp.y + lp.height / 2)
+    grupo_y.rotate(90)
+    d.add(grupo_y)
+
+    # Ponto recomendado
+    nomes = [f"DN {dn}" for dn in dns]
+    if ajuste and vazao_lh:
+        def px(v):
+            return lp.x + (v - x_min) / (x_max - x_min or 1) * lp.width
+
+        def py(v):
+            return lp.y + v / y_max * lp.height
+
+        for dn in dns:
+            ajuste_dn, vazao_dn = indice.nearest(dn, vazao_lh)
+            estrela = makeMarker('StarFive', size=12, fillColor=colors.red, strokeColor=colors.red)
+            estrela.x, estrela.y = px(float(ajuste_dn)), py(float(vazao_dn))
+            d.add(estrela)
+            d.add(String(estrela.x, estrela.y + 9, f"{vazao_lh:.0f} L/h", fontName='Helvetica-Bold',
+                         fontSize=7, fillColor=colors.white, textAnchor='middle'))
+        nomes.append('Ponto recomendado')
+
+    # Legenda
+    legenda = Legend()
+    legenda.x, legenda.y = lp.x, altura - 8
+    legenda.alignment = 'right'
+    legenda.columnMaximum = 2
+    legenda.fontName = 'Helvetica'
+    legenda.fontSize = 7
+    legenda.fillColor = colors.white
+    legenda.dxTextSpace = 4
+    legenda.deltax = 85
+    legenda.boxAnchor = 'nw'
+    legenda.colorNamePairs = [
+        (colors.HexColor(CORES_CURVAS[i % len(CORES_CURVAS)]) if i < len(dns) else colors.red, nome)
+        for i, nome in enumerate(nomes)
+    ]
+    d.add(legenda)
+    return d
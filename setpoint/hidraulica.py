@@ -0,0 +1,175 @@
+# ----------------------------
+# Verificação hidráulica de tubos (Reynolds, atrito, perda de carga)
+# ----------------------------
+# Continua o cálculo manual do Flow Dashboard (diâmetro + velocidade): número
+# de Reynolds, fator de atrito de Darcy (Colebrook, resolvido por iteração
+# de ponto fixo a partir de Swamee-Jain), perda de carga por metro e a bitola
+# comercial que atende o diâmetro. Tudo em arrays: uma prumada inteira
+# (centenas de trechos) é calculada numa chamada só.
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from setpoint.fluxo import STATUS, codigo_faixa, diametro_sugerido_mm
+from setpoint.rastreio import rastrear
+
+# Diâmetro interno (mm) de tubo de aço carbono Schedule 40, por bitola
+CATALOGO_TUBOS = {
+    '1/2"': 15.8,
+    '3/4"': 20.9,
+    '1"': 26.6,
+    '1.1/4"': 35.1,
+    '1.1/2"': 40.9,
+    '2"': 52.5,
+    '2.1/2"': 62.7,
+    '3"': 77.9,
+    '4"': 102.3,
+}
+# Bitola sugerida quando nem o maior tubo do catálogo tem o diâmetro pedido
+ACIMA_DO_CATALOGO = "acima do catálogo"
+
+# Rugosidade absoluta (mm)
+RUGOSIDADE_MM = {
+    "Aço carbono": 0.045,
+    "Aço galvanizado": 0.15,
+    "Cobre": 0.0015,
+    "PPR": 0.007,
+}
+
+RE_LAMINAR = 2300
+# Faixa usual de velocidade em água gelada (m/s) e limite de perda de carga
+VELOCIDADE_MIN = 0.5
+VELOCIDADE_MAX = 1.5
+PERDA_MAX_PA_M = 400.0
+
+COLUNA_TRECHO = "Trecho"
+COLUNA_VAZAO_M3H = "Vazão (m³/h)"
+COLUNA_DIAMETRO = "Diâmetro interno (mm)"
+COLUNA_COMPRIMENTO = "Comprimento (m)"
+
+# Prumada de exemplo do Flow Dashboard. Um único frame por processo,
+# compartilhado por todas as sessões (o data_editor guarda só as edições de
+# cada uma no session_state); somente leitura para ninguém alterá-lo.
+_valores_exemplo = np.array([
+    [0.55, 20.9, 6.0],
+    [0.55, 20.9, 8.0],
+    [1.10, 26.6, 3.0],
+    [2.20, 35.1, 3.0],
+])
+_valores_exemplo.flags.writeable = False
+TRECHOS_EXEMPLO = pd.DataFrame(_valores_exemplo, columns=[COLUNA_VAZAO_M3H, COLUNA_DIAMETRO, COLUNA_COMPRIMENTO],
+                               copy=False)
+TRECHOS_EXEMPLO.insert(0, COLUNA_TRECHO, ["Ramal 1", "Ramal 2", "Prumada 1-2", "Prumada 2-3"])
+
+
+class Hidraulica(NamedTuple):
+    velocidade: np.ndarray      # m/s
+    reynolds: np.ndarray
+    fator_atrito: np.ndarray    # Darcy
+    perda_pa_m: np.ndarray      # Pa/m
+
+
+def reynolds(velocidade, diametro_mm, rho, mu):
+    """Re = ρ·v·D/μ (D em mm, μ em Pa·s)."""
+    return np.multiply(rho, velocidade) * np.divide(diametro_mm, 1000) / mu
+
+
+def fator_atrito(re, rugosidade_relativa, tol: float = 1e-10, max_iter: int = 50):
+    """Fator de atrito de Darcy; 64/Re no laminar, Colebrook no turbulento.
+
+    Colebrook em x = 1/√f: x = -2·log10(ε/3.7 + 2.51·x/Re), iterado em todos
+    os elementos de uma vez até a maior variação ficar abaixo de `tol`.
+    Re <= 0 dá NaN.
+    """
+    re, eps = np.broadcast_arrays(np.asarray(re, dtype=float), np.asarray(rugosidade_relativa, dtype=float))
+    f = np.full(re.shape, np.nan)
+    laminar = (re > 0) & (re < RE_LAMINAR)
+    f[laminar] = 64 / re[laminar]
+
+    turb = re >= RE_LAMINAR
+    if turb.any():
+        re_t, eps_t = re[turb], eps[turb]
+        # Swamee-Jain como chute inicial: costuma convergir em 3-4 iterações
+        x = -2 * np.log10(eps_t / 3.7 + 5.74 / re_t ** 0.9)
+        for _ in range(max_iter):
+            novo = -2 * np.log10(eps_t / 3.7 + 2.51 * x / re_t)
+            convergiu = np.all((np.abs(novo - x) < tol) | np.isnan(novo))
+            x = novo
+            if convergiu:
+                break
+        f[turb] = 1 / x ** 2
+    return f if f.ndim else f.item()
+
+
+def perda_carga_pa_m(fator, velocidade, diametro_mm, rho):
+    """Darcy-Weisbach por metro: f/D · ρ·v²/2."""
+    return np.multiply(fator, rho) * np.square(velocidade) / 2 / np.divide(diametro_mm, 1000)
+
+
+def verificar(velocidade, diametro_mm, rho, mu, rugosidade_mm=RUGOSIDADE_MM["Aço carbono"]) -> Hidraulica:
+    """Re, atrito e perda de carga para velocidade(s) e diâmetro(s) internos."""
+    velocidade = np.asarray(velocidade, dtype=float)
+    re = reynolds(velocidade, diametro_mm, rho, mu)
+    f = fator_atrito(re, np.divide(rugosidade_mm, diametro_mm))
+    return Hidraulica(velocidade, re, f, perda_carga_pa_m(f, velocidade, diametro_mm, rho))
+
+
+def velocidade_no_tubo(vazao_m3h, diametro_mm):
+    area = np.pi * (np.divide(diametro_mm, 1000) / 2) ** 2
+    return np.divide(vazao_m3h, 3600) / area
+
+
+def tubo_nominal(diametro_mm, catalogo: dict = CATALOGO_TUBOS):
+    """Menor bitola do catálogo com diâmetro interno >= `diametro_mm`.
+
+    Acima do maior tubo devolve ACIMA_DO_CATALOGO (a maior bitola ficaria
+    subdimensionada); NaN dá None. Escalar -> str; array -> array.
+    """
+    nomes = np.array(list(catalogo), dtype=object)
+    internos = np.fromiter(catalogo.values(), dtype=float)
+    ordem = np.argsort(internos)
+    diametro_mm = np.asarray(diametro_mm, dtype=float)
+    i = np.searchsorted(internos[ordem], diametro_mm, side="left")
+    escolhido = np.where(i < len(internos), nomes[ordem][np.minimum(i, len(internos) - 1)], ACIMA_DO_CATALOGO)
+    escolhido = np.where(np.isnan(diametro_mm), None, escolhido)
+    return escolhido if np.ndim(escolhido) else escolhido.item()
+
+
+def regime(re):
+    re = np.asarray(re, dtype=float)
+    return np.select([~(re > 0), re < RE_LAMINAR, re < 4000], ["-", "Laminar", "Transição"], default="Turbulento")
+
+
+@rastrear()
+def calcular_prumada(trechos: pd.DataFrame, rho, mu, rugosidade_mm=RUGOSIDADE_MM["Aço carbono"],
+                     velocidade_alvo: float = 1.0) -> pd.DataFrame:
+    """Verificação de todos os trechos (Trecho, Vazão m³/h, Diâmetro, Comprimento).
+
+    Acrescenta velocidade, Re, atrito, perda por metro e no trecho, status da
+    velocidade (🔴/🟢/🟠 em VELOCIDADE_MIN..MAX), da perda (🟠 acima de
+    PERDA_MAX_PA_M) e a bitola que leva a vazão
+    com `velocidade_alvo`.
+    """
+    vazao = trechos[COLUNA_VAZAO_M3H].to_numpy(dtype=float)
+    diametro = trechos[COLUNA_DIAMETRO].to_numpy(dtype=float)
+    comprimento = trechos[COLUNA_COMPRIMENTO].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = verificar(velocidade_no_tubo(vazao, diametro), diametro, rho, mu, rugosidade_mm)
+        diametro_alvo = diametro_sugerido_mm(vazao / 3600, velocidade_alvo)
+
+    resultado = trechos.copy()
+    resultado["Velocidade (m/s)"] = h.velocidade
+    resultado["Reynolds"] = h.reynolds
+    resultado["Regime"] = regime(h.reynolds)
+    resultado["Fator de atrito"] = h.fator_atrito
+    resultado["Perda (Pa/m)"] = h.perda_pa_m
+    resultado["Perda no trecho (kPa)"] = h.perda_pa_m * comprimento / 1000
+    resultado["Status velocidade"] = pd.Categorical.from_codes(
+        codigo_faixa(h.velocidade, VELOCIDADE_MIN, VELOCIDADE_MAX), STATUS)
+    resultado["Status perda"] = pd.Categorical.from_codes(codigo_faixa(h.perda_pa_m, 0, PERDA_MAX_PA_M), STATUS)
+    resultado["Bitola sugerida"] = tubo_nominal(diametro_alvo)
+    return resultado
@@ -0,0 +1,110 @@
+# ----------------------------
+# Índice das curvas de válvulas (busca binária)
+# ----------------------------
+# Cada coluna DN é guardada ordenada por vazão, junto com a linha original da
+# tabela. A linha mais próxima de uma vazão sai de um np.searchsorted
+# (O(log n)) em vez de criar uma Series temporária e ordená-la inteira a cada
+# consulta. Em empate de distância vale a primeira linha da tabela, como no
+# argsort()[0] / idxmin() usados antes.
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from setpoint.dados import COLUNA_SETTING
+
+
+class _Curva:
+    __slots__ = ("coluna", "vazoes", "linhas", "primeira")
+
+    def __init__(self, coluna: np.ndarray):
+        self.coluna = coluna
+        validas = np.flatnonzero(~np.isnan(coluna))
+        ordem = np.argsort(coluna[validas], kind="stable")
+        self.vazoes = coluna[validas][ordem]
+        self.linhas = validas[ordem]
+        # Para vazões repetidas, aponta para a primeira ocorrência do bloco
+        self.primeira = np.searchsorted(self.vazoes, self.vazoes, side="left")
+
+
+class ValveCurveIndex:
+    def __init__(self, settings: np.ndarray, curvas: dict[str, np.ndarray]):
+        self.settings = np.asarray(settings)
+        self._curvas = {dn: _Curva(np.asarray(col, dtype=float)) for dn, col in curvas.items()}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dn_options: list[str] | None = None) -> "ValveCurveIndex":
+        if dn_options is None:
+            dn_options = [col for col in df.columns if col != COLUNA_SETTING]
+        return cls(
+            df[COLUNA_SETTING].to_numpy(),
+            {dn: df[dn].to_numpy(dtype=float) for dn in dn_options},
+        )
+
+    def __contains__(self, dn) -> bool:
+        return dn in self._curvas
+
+    @property
+    def dn_options(self) -> list[str]:
+        return list(self._curvas)
+
+    def curva(self, dn: str) -> tuple[np.ndarray, np.ndarray]:
+        """Vazões ordenadas e settings correspondentes de um DN."""
+        c = self._curvas[dn]
+        return c.vazoes, self.settings[c.linhas]
+
+    def nearest_rows(self, dn: str, vazoes) -> np.ndarray:
+        """Linha (posição na tabela) mais próxima de cada vazão, vetorizado."""
+        c = self._curvas[dn]
+        q = np.asarray(vazoes, dtype=float)
+        n = len(c.vazoes)
+        if n == 0:
+            raise ValueError(f"A coluna {dn!r} não possui vazões numéricas.")
+
+        pos = np.searchsorted(c.vazoes, q, side="left")
+        lo = c.primeira[np.clip(pos - 1, 0, n - 1)]
+        hi = np.clip(pos, 0, n - 1)
+        d_lo = np.abs(c.vazoes[lo] - q)
+        d_hi = np.abs(c.vazoes[hi] - q)
+        usa_hi = (d_hi < d_lo) | ((d_hi == d_lo) & (c.linhas[hi] < c.linhas[lo]))
+        return np.where(usa_hi, c.linhas[hi], c.linhas[lo])
+
+    def nearest_row(self, dn: str, vazao: float) -> int:
+        return int(self.nearest_rows(dn, [vazao])[0])
+
+    def nearest(self, dn: str, vazao: float) -> tuple[int, float]:
+        """(Setting %, vazão da tabela) da linha mais próxima."""
+        linha = self.nearest_row(dn, vazao)
+        return self.settings[linha], self._vazao_linha(dn, linha)
+
+    def bracket_rows(self, dn: str, vazoes) -> tuple[np.ndarray, np.ndarray]:
+        """Linhas imediatamente abaixo e acima de cada vazão.
+
+        Fora da faixa da curva, as duas pontas apontam para o extremo mais
+        próximo; em acerto exato, as duas apontam para a mesma linha.
+        """
+        c = self._curvas[dn]
+        q = np.asarray(vazoes, dtype=float)
+        n = len(c.vazoes)
+        hi = np.clip(np.searchsorted(c.vazoes, q, side="left"), 0, n - 1)
+        exato = c.vazoes[hi] == q
+        lo = np.where(exato | (c.vazoes[hi] < q), hi, np.clip(hi - 1, 0, n - 1))
+        lo = c.primeira[lo]
+        hi = np.where(c.vazoes[hi] < q, lo, hi)
+        return c.linhas[lo], c.linhas[hi]
+
+    def bracket(self, dn: str, vazao: float) -> tuple[tuple[int, float], tuple[int, float]]:
+        """((setting, vazão) abaixo, (setting, vazão) acima) de uma vazão."""
+        lo, hi = self.bracket_rows(dn, [vazao])
+        lo, hi = int(lo[0]), int(hi[0])
+        return (
+            (self.settings[lo], self._vazao_linha(dn, lo)),
+            (self.settings[hi], self._vazao_linha(dn, hi)),
+        )
+
+    def flows_at_rows(self, dn: str, linhas) -> np.ndarray:
+        """Vazões da tabela do DN nas linhas indicadas."""
+        return self._curvas[dn].coluna[linhas]
+
+    def _vazao_linha(self, dn: str, linha: int) -> float:
+        return self._curvas[dn].coluna[linha]
@@ -0,0 +1,156 @@
+# ----------------------------
+# Dimensionamento em lote (planilha de unidades terminais)
+# ----------------------------
+# Recebe uma tabela (unidade, capacidade Btu/h, vazão de projeto) e devolve a
+# planilha de ajustes. O DN de cada capacidade é resolvido uma vez por valor
+# distinto; os ajustes saem de uma chamada vetorizada do SettingSolver por DN.
+from __future__ import annotations
+
+import hashlib
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from setpoint.dados import COLUNA_CAPACIDADE, TabelaValvulas
+from setpoint.rastreio import rastrear
+from setpoint.selecao import RESOLVEDOR_PADRAO, ResolvedorDN, dn_do_rotulo, normalize_label
+
+COLUNA_UNIDADE = "Unidade"
+COLUNA_VAZAO_M3H = "Vazão projeto (m³/h)"
+
+COLUNAS_RESULTADO = [
+    COLUNA_UNIDADE,
+    COLUNA_CAPACIDADE,
+    "DN",
+    "Vazão projeto (L/h)",
+    "Ajuste (%)",
+    "Vazão ajustada (L/h)",
+    "Desvio (%)",
+]
+
+# Rótulos normalizados aceitos para cada coluna da planilha de entrada
+_ALIASES = {
+    COLUNA_UNIDADE: ("unidade", "unit", "unitid", "id", "tag"),
+    COLUNA_CAPACIDADE: ("capacidade", "capacidadebtuh", "capacity", "btuh", "btu"),
+    COLUNA_VAZAO_M3H: ("vazao", "vazaom3h", "vazaoprojeto", "vazaoprojetom3h", "flow", "designflow", "m3h"),
+}
+
+
+def _normalizar_cabecalho(col) -> str:
+    # normalize_label descarta acentos inteiros ("Vazão" -> "vazo"); aqui
+    # eles são decompostos antes ("Vazão" -> "vazao", "m³" -> "m3").
+    return normalize_label(unicodedata.normalize("NFKD", str(col)).encode("ascii", "ignore").decode())
+
+
+def _identificar_colunas(colunas) -> dict:
+    encontradas = {}
+    normalizadas = {col: _normalizar_cabecalho(col) for col in colunas}
+    for destino, aliases in _ALIASES.items():
+        for col, norm in normalizadas.items():
+            if col in encontradas:
+                continue
+            if norm in aliases or any(norm.startswith(a) for a in aliases):
+                encontradas[col] = destino
+                break
+    faltando = set(_ALIASES) - set(encontradas.values())
+    if faltando:
+        raise ValueError(f"Colunas não encontradas na planilha: {', '.join(sorted(faltando))}")
+    return encontradas
+
+
+def ler_planilha_unidades(arquivo, nome: str | None = None) -> pd.DataFrame:
+    """Lê um CSV/XLSX de unidades e padroniza os nomes das colunas.
+
+    Levanta ValueError se faltar coluna ou se houver unidade vazia ou repetida.
+    """
+    nome = nome or getattr(arquivo, "name", str(arquivo))
+    if os.path.splitext(nome)[1].lower() == ".csv":
+        bruto = pd.read_csv(arquivo, sep=None, engine="python")
+    else:
+        bruto = pd.read_excel(arquivo)
+
+    df = bruto.rename(columns=_identificar_colunas(bruto.columns))
+    # Frame próprio (não uma fatia de `bruto`) antes de converter as colunas
+    return df.loc[:, list(_ALIASES)].assign(**{
+        COLUNA_UNIDADE: _validar_unidades(df[COLUNA_UNIDADE]),
+        COLUNA_CAPACIDADE: pd.to_numeric(df[COLUNA_CAPACIDADE], errors="coerce"),
+        COLUNA_VAZAO_M3H: pd.to_numeric(df[COLUNA_VAZAO_M3H], errors="coerce"),
+    })
+
+
+def _validar_unidades(unidades: pd.Series) -> pd.Series:
+    # A unidade identifica a válvula no projeto salvo (setpoint.resultados):
+    # precisa existir e ser única na planilha
+    ids = unidades.astype(str).str.strip().where(unidades.notna(), "")
+    vazias = np.flatnonzero(ids.to_numpy() == "")
+    if len(vazias):
+        raise ValueError(f"Unidade vazia em {len(vazias)} linha(s) da planilha: {_linhas(vazias)}.")
+    repetidas = np.flatnonzero(ids.duplicated(keep=False).to_numpy())
+    if len(repetidas):
+        nomes = pd.unique(ids.iloc[repetidas])
+        raise ValueError(f"Unidades repetidas na planilha: {', '.join(map(repr, nomes[:5]))}"
+                         f"{' ...' if len(nomes) > 5 else ''} (linhas {_linhas(repetidas)}).")
+    return ids
+
+
+def _linhas(posicoes: np.ndarray) -> str:
+    # Linhas como o usuário vê na planilha (cabeçalho na linha 1)
+    texto = ", ".join(str(p + 2) for p in posicoes[:10])
+    return texto + (" ..." if len(posicoes) > 10 else "")
+
+
+def assinatura_lote(df_lote: pd.DataFrame) -> str:
+    """Hash do conteúdo da planilha, sensível à ordem das linhas e às colunas."""
+    h = hashlib.sha256(repr(list(df_lote.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df_lote, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def resolver_dns(capacidades, dn_options, resolvedor: ResolvedorDN | None = None) -> np.ndarray:
+    """Coluna DN de cada capacidade (None quando não há DN automático)."""
+    # Só NumPy: chamado também pelo setpoint.servidor com poucos itens por vez
+    capacidades = np.asarray(capacidades, dtype=float)
+    validas = ~np.isnan(capacidades)
+    distintas, posicao = np.unique(capacidades[validas], return_inverse=True)
+    rotulos = (resolvedor or RESOLVEDOR_PADRAO).rotulos_de(distintas)
+    dns = np.empty(len(distintas), dtype=object)
+    dns[:] = [dn_do_rotulo(rotulo, dn_options) for rotulo in rotulos]
+    saida = np.full(len(capacidades), None, dtype=object)
+    saida[validas] = dns[posicao]
+    return saida
+
+
+@rastrear()
+def dimensionar_lote(unidades: pd.DataFrame, tabela: TabelaValvulas, modo: str = "nearest",
+                     resolvedor_dn: ResolvedorDN | None = None) -> pd.DataFrame:
+    """Planilha de ajustes para todas as unidades de uma vez.
+
+    `modo` segue o SettingSolver: "nearest" (linha da tabela), "linear" ou
+    "pchip" (ajuste interpolado). `resolvedor_dn` é o da tabela de máquinas
+    (TabelaMaquinas.resolvedor_dn); sem ele vale o mapa padrão.
+    """
+    solver = tabela.solver
+    vazao_lh = unidades[COLUNA_VAZAO_M3H].to_numpy(dtype=float) * 1000
+    dns = resolver_dns(unidades[COLUNA_CAPACIDADE], tabela.dn_options, resolvedor_dn)
+
+    ajuste = np.full(len(unidades), np.nan)
+    vazao_ajustada = np.full(len(unidades), np.nan)
+    validos = pd.notna(dns) & (vazao_lh > 0)
+    for dn in pd.unique(dns[validos]):
+        sel = np.flatnonzero(validos & (dns == dn))
+        ajuste[sel], vazao_ajustada[sel], _ = solver.resolver(dn, vazao_lh[sel], modo)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        desvio = (vazao_ajustada - vazao_lh) / vazao_lh * 100
+
+    return pd.DataFrame({
+        COLUNA_UNIDADE: unidades[COLUNA_UNIDADE].to_numpy(),
+        COLUNA_CAPACIDADE: unidades[COLUNA_CAPACIDADE].to_numpy(),
+        "DN": dns,
+        "Vazão projeto (L/h)": vazao_lh,
+        "Ajuste (%)": ajuste,
+        "Vazão ajustada (L/h)": vazao_ajustada,
+        "Desvio (%)": desvio,
+    }, columns=COLUNAS_RESULTADO)
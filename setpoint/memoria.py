@@ -0,0 +1,111 @@
+# ----------------------------
+# Contabilidade de memória (processo e caches compartilhados)
+# ----------------------------
+# Usado pela página de instrumentação (pages/Memoria.py) para dimensionar
+# réplicas: memória do processo, quanto ocupam os caches por processo do
+# pacote (tabelas, estilos, imagens, relatórios) e uma medida aproximada de
+# objetos arbitrários (session_state, por exemplo). Sem Streamlit aqui; a
+# enumeração de sessões fica na página.
+from __future__ import annotations
+
+import os
+import resource
+import sys
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class UsoCache(NamedTuple):
+    nome: str
+    itens: int
+    bytes_memoria: int
+    bytes_disco: int = 0
+
+
+def tamanho(obj, _vistos: set | None = None) -> int:
+    """Tamanho aproximado (bytes) de `obj` e do que ele referencia.
+
+    DataFrames/arrays contam os dados (memory_usage/nbytes); objetos já
+    contados na mesma chamada não são somados de novo.
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = obj.memory_usage(deep=True)
+        return int(uso.sum() if hasattr(uso, "sum") else uso)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if obj.base is None else sys.getsizeof(obj)
+    total = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return total
+    if isinstance(obj, dict):
+        return total + sum(tamanho(k, vistos) + tamanho(v, vistos) for k, v in list(obj.items()))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return total + sum(tamanho(v, vistos) for v in list(obj))
+    if hasattr(obj, "__dict__"):
+        total += tamanho(vars(obj), vistos)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            total += tamanho(getattr(obj, slot), vistos)
+    return total
+
+
+def rss_bytes() -> int:
+    """Memória residente atual do processo (Linux; pico como alternativa)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return rss_pico_bytes()
+
+
+def rss_pico_bytes() -> int:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def caches_compartilhados() -> list[UsoCache]:
+    """Uso dos caches por processo do pacote (compartilhados por todas as sessões)."""
+    from setpoint import assets, dados, estilo, fluidos, gauges, grafico_curvas, relatorio
+    from setpoint.tarefas import fila_relatorios
+
+    with dados._lock:
+        tabelas = [entrada[2] for entrada in dados._cache.values()]
+    with estilo._lock:
+        estilos = list(estilo._cache.values())
+    with assets._lock:
+        imagens = list(assets._cache.values())
+    with grafico_curvas._lock:
+        curvas = len(grafico_curvas._cache)
+
+    resultados_memoria, resultados_disco, tarefas = 0, 0, 0
+    concluidas = []
+    fila = fila_relatorios(criar=False)    # olhar a página não sobe o pool de relatórios
+    if fila is not None:
+        with fila._lock:
+            concluidas = [t for t in fila._tarefas.values() if t.concluida]
+            tarefas = len(fila._tarefas)
+    for t in concluidas:
+        if t.future.exception() is not None:
+            continue
+        resultado = t.future.result()
+        if isinstance(resultado, str):
+            resultados_disco += os.path.getsize(resultado) if os.path.exists(resultado) else 0
+        else:
+            resultados_memoria += tamanho(resultado)
+
+    return [
+        UsoCache("Tabelas (dados)", len(tabelas), tamanho(tabelas)),
+        UsoCache("Estilos da tabela neon", len(estilos), tamanho(estilos)),
+        UsoCache("Imagens reduzidas", len(imagens), tamanho(imagens)),
+        UsoCache("Relatórios (fila)", tarefas, resultados_memoria, resultados_disco),
+        UsoCache("Recursos do PDF", relatorio._recursos_cache.cache_info().currsize, 0),
+        UsoCache("Gauges (figuras)", gauges.gauge_with_refs.cache_info().currsize, 0),
+        UsoCache("Gráficos de curvas", curvas, 0),
+        UsoCache("Propriedades de fluido", fluidos._propriedades_escalar.cache_info().currsize, 0),
+    ]
@@ -0,0 +1,156 @@
+# ----------------------------
+# Tempos das etapas do rerun (carga, busca, estilo, gráficos, exportações)
+# ----------------------------
+# Cronômetros por etapa com janela móvel das últimas JANELA execuções, para
+# os percentis, mais contagem e soma acumuladas. Desligado por padrão:
+# `rastrear` só testa uma variável global antes de chamar a função
+# original. Liga com SETPOINT_RASTREIO=1 ou pelo painel de administração
+# (setpoint.admin). Exporta em JSON e no formato texto do Prometheus (summary).
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+import numpy as np
+
+JANELA = 1024
+QUANTIS = (0.5, 0.9, 0.99)
+
+_ativo = os.environ.get("SETPOINT_RASTREIO", "") not in ("", "0")
+
+
+class _Etapa:
+    __slots__ = ("duracoes", "chamadas", "soma", "maximo")
+
+    def __init__(self):
+        self.duracoes: deque[float] = deque(maxlen=JANELA)
+        self.chamadas = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+
+_etapas: dict[str, _Etapa] = {}
+_lock = threading.Lock()
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def ativar(ligado: bool = True) -> None:
+    global _ativo
+    _ativo = ligado
+
+
+def registrar(etapa: str, segundos: float) -> None:
+    with _lock:
+        registro = _etapas.get(etapa)
+        if registro is None:
+            registro = _etapas[etapa] = _Etapa()
+        registro.duracoes.append(segundos)
+        registro.chamadas += 1
+        registro.soma += segundos
+        registro.maximo = max(registro.maximo, segundos)
+
+
+class _Medicao:
+    __slots__ = ("etapa", "inicio")
+
+    def __init__(self, etapa: str):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.etapa, perf_counter() - self.inicio)
+        return False
+
+
+class _Nulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _Nulo()
+
+
+def medir(etapa: str):
+    """Context manager que cronometra o bloco (não faz nada se desligado)."""
+    return _Medicao(etapa) if _ativo else _NULO
+
+
+def rastrear(etapa: str | None = None):
+    """Decorador que cronometra cada chamada; `etapa` padrão é o nome qualificado."""
+    def decorar(func):
+        nome = etapa or func.__qualname__
+
+        @wraps(func)
+        def cronometrada(*args, **kwargs):
+            if not _ativo:
+                return func(*args, **kwargs)
+            inicio = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registrar(nome, perf_counter() - inicio)
+        return cronometrada
+    return decorar
+
+
+def limpar() -> None:
+    with _lock:
+        _etapas.clear()
+
+
+def resumo() -> list[dict]:
+    """Uma linha por etapa: chamadas, total, média e percentis da janela (ms)."""
+    with _lock:
+        copias = [(nome, np.fromiter(r.duracoes, dtype=float), r.chamadas, r.soma, r.maximo)
+                  for nome, r in _etapas.items()]
+    linhas = []
+    for nome, janela, chamadas, soma, maximo in copias:
+        percentis = np.quantile(janela, QUANTIS) if len(janela) else np.full(len(QUANTIS), np.nan)
+        linha = {"etapa": nome, "chamadas": chamadas, "total_s": soma, "media_ms": soma / chamadas * 1000}
+        for q, valor in zip(QUANTIS, percentis):
+            linha[f"p{q * 100:g}_ms"] = valor * 1000
+        linha["max_ms"] = maximo * 1000
+        linhas.append(linha)
+    return sorted(linhas, key=lambda linha: -linha["total_s"])
+
+
+def json_metricas() -> str:
+    return json.dumps({"janela": JANELA, "etapas": resumo()}, ensure_ascii=False, indent=2)
+
+
+def _rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus(prefixo: str = "setpoint_etapa_segundos") -> str:
+    """Texto no formato de exposição do Prometheus (um summary por etapa)."""
+    with _lock:
+        copias = [(nome, np.fromiter(r.duracoes, dtype=float), r.chamadas, r.soma)
+                  for nome, r in _etapas.items()]
+    linhas = [
+        f"# HELP {prefixo} Duração das etapas do Setpoint Tools (quantis das últimas {JANELA} chamadas)",
+        f"# TYPE {prefixo} summary",
+    ]
+    for nome, janela, chamadas, soma in sorted(copias):
+        etapa = _rotulo(nome)
+        if len(janela):
+            for q, valor in zip(QUANTIS, np.quantile(janela, QUANTIS)):
+                linhas.append(f'{prefixo}{{etapa="{etapa}",quantile="{q:g}"}} {valor:.9g}')
+        linhas.append(f'{prefixo}_sum{{etapa="{etapa}"}} {soma:.9g}')
+        linhas.append(f'{prefixo}_count{{etapa="{etapa}"}} {chamadas}')
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,297 @@
+# ----------------------------
+# Relatório PDF premium
+# ----------------------------
+# plotly e reportlab são importados dentro da função: quem só calcula não
+# paga o custo desses imports.
+from __future__ import annotations
+
+import os
+import re
+import zipfile
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import NamedTuple
+
+from setpoint.assets import reduzir_png
+from setpoint.grafico_pdf import curvas_drawing
+from setpoint.indice import ValveCurveIndex
+from setpoint.rastreio import rastrear
+
+
+# 6 x 3 cm a 300 dpi
+LOGO_PX = (709, 354)
+
+# Acima disso o documento único fica pesado demais (o reportlab só grava no
+# fim do build, ~25 ms e a story inteira em memória por válvula); use o zip
+MAX_ITENS_DOCUMENTO = 100
+
+
+def _sem_progresso(fracao: float, etapa: str) -> None:
+    pass
+
+
+def grafico_nativo(dn_list, df_valvulas, indice, ajuste=None, vazao_lh=None):
+    from reportlab.lib.units import cm
+    return curvas_drawing(dn_list, df_valvulas, indice, ajuste, vazao_lh, largura=16*cm, altura=10*cm)
+
+
+def grafico_plotly(dn_list, df_valvulas, indice, ajuste=None, vazao_lh=None):
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image
+
+    fig = go.Figure()
+    for dn_choice in dn_list:
+        if dn_choice in df_valvulas.columns:
+            fig.add_trace(go.Scatter(
+                x=df_valvulas["Setting (%)"], y=df_valvulas[dn_choice],
+                mode='lines+markers', name=f"DN {dn_choice}"
+            ))
+    # Ponto recomendado
+    if ajuste and vazao_lh:
+        for dn_choice in dn_list:
+            if dn_choice in df_valvulas.columns:
+                ajuste_dn, vazao_dn = indice.nearest(dn_choice, vazao_lh)
+                fig.add_scatter(
+                    x=[ajuste_dn],
+                    y=[vazao_dn],
+                    mode='markers+text',
+                    marker=dict(color='red', size=14, symbol='star'),
+                    text=[f"💧 {vazao_lh:.0f} L/h"],
+                    textposition='top center',
+                    name='Ponto recomendado'
+                )
+    fig.update_layout(template="plotly_dark", width=800, height=400,
+                      xaxis_title="Setting (%)", yaxis_title="Vazão (L/h)")
+    img_bytes = pio.to_image(fig, format="png")
+    return Image(BytesIO(img_bytes), width=16*cm, height=10*cm)
+
+
+RENDERIZADORES = {"nativo": grafico_nativo, "plotly": grafico_plotly}
+
+
+class _Recursos:
+    """Estilos, logo e rodapé montados uma vez e reaproveitados por página."""
+
+    def __init__(self, logo_path: str):
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+        styles = getSampleStyleSheet()
+        self.titulo_style = ParagraphStyle('Titulo', parent=styles['Heading1'], textColor=colors.white,
+                                           alignment=1, fontSize=18, spaceAfter=12)
+        self.texto_style = ParagraphStyle('Texto', parent=styles['Normal'], textColor=colors.white, fontSize=10)
+        self.estilo_tabela = [
+            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#222222')),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.gray),
+            ('BACKGROUND', (0,1), (-1,-1), colors.HexColor('#111111')),
+            ('TEXTCOLOR', (0,1), (-1,-1), colors.white)
+        ]
+        # A logo é reduzida uma vez para 300 dpi no tamanho impresso (6 x 3 cm);
+        # o reportlab grava a imagem uma única vez por documento, mesmo
+        # repetida em várias páginas
+        try:
+            self.logo_bytes = reduzir_png(logo_path, LOGO_PX[0], LOGO_PX[1])
+        except OSError:
+            self.logo_bytes = None
+
+    def rodape(self):
+        from reportlab.lib import colors
+        from reportlab.lib.units import cm
+
+        data_hora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+        def add_footer(canvas, doc):
+            canvas.setFillColor(colors.black)
+            canvas.rect(0,0,doc.pagesize[0],doc.pagesize[1], stroke=0, fill=1)
+            canvas.setFillColor(colors.white)
+            canvas.setFont("Helvetica", 8)
+            canvas.drawRightString(doc.pagesize[0]-1*cm, 1*cm, f"Gerado em: {data_hora}")
+        return add_footer
+
+
+@lru_cache(maxsize=8)
+def _recursos_cache(logo_path: str, mtime_ns: int) -> _Recursos:
+    return _Recursos(logo_path)
+
+
+def _recursos(logo_path: str) -> _Recursos:
+    try:
+        mtime_ns = os.stat(logo_path).st_mtime_ns
+    except OSError:
+        mtime_ns = 0
+    return _recursos_cache(os.path.abspath(logo_path), mtime_ns)
+
+
+def _documento(destino):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(destino, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
+
+
+def _story_relatorio(recursos: _Recursos, dn_list, df_valvulas, observacao, ajuste, vazao_lh, indice,
+                     desenhar, progresso=_sem_progresso, titulo="Relatório de Válvulas AB-QM") -> list:
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, Paragraph, Spacer, Table, TableStyle
+
+    story = []
+    texto_style = recursos.texto_style
+
+    # Logo no topo
+    if recursos.logo_bytes is not None:
+        story.append(Image(BytesIO(recursos.logo_bytes), width=6*cm, height=3*cm))
+        story.append(Spacer(1,12))
+    else:
+        story.append(Paragraph("⚠️ Logo não encontrada", texto_style))
+        story.append(Spacer(1,12))
+
+    # Título
+    story.append(Paragraph(titulo, recursos.titulo_style))
+    story.append(Spacer(1,12))
+
+    # Gráfico
+    if dn_list:
+        progresso(0.15, "Gerando gráfico")
+        try:
+            story.append(desenhar(dn_list, df_valvulas, indice, ajuste, vazao_lh))
+            story.append(Spacer(1,12))
+        except Exception:
+            story.append(Paragraph("⚠️ Gráfico não pôde ser gerado", texto_style))
+            story.append(Spacer(1,12))
+
+    # Tabela de DNs
+    if dn_list:
+        progresso(0.7, "Montando tabela")
+        colunas = ['Setting (%)'] + [dn for dn in dn_list if dn in df_valvulas.columns]
+        data_table = [colunas] + df_valvulas[colunas].values.tolist()
+        table = Table(data_table, repeatRows=1)
+        styles_table = TableStyle(recursos.estilo_tabela)
+        # Destaque do ponto recomendado
+        if ajuste and vazao_lh:
+            for dn_choice in dn_list:
+                if dn_choice in colunas:
+                    col_idx = colunas.index(dn_choice)
+                    row_idx = indice.nearest_row(dn_choice, vazao_lh) + 1
+                    styles_table.add('BACKGROUND', (col_idx, row_idx), (col_idx, row_idx), colors.HexColor('#00ffea'))
+                    styles_table.add('TEXTCOLOR', (col_idx, row_idx), (col_idx, row_idx), colors.black)
+        table.setStyle(styles_table)
+        story.append(table)
+        story.append(Spacer(1,12))
+
+    # Observações
+    if observacao:
+        story.append(Paragraph(f"Observações: {observacao}", texto_style))
+        story.append(Spacer(1,12))
+    return story
+
+
+def _renderizador(renderizador):
+    return renderizador if callable(renderizador) else RENDERIZADORES[renderizador]
+
+
+@rastrear()
+def gerar_pdf_premium(dn_list, df_valvulas, observacao, ajuste=None, vazao_lh=None, logo_path="logo_fabricante.png",
+                      indice=None, progresso=_sem_progresso, renderizador="nativo"):
+    # `progresso(fração, etapa)` é chamado entre as etapas (usado pela fila
+    # de relatórios para mostrar a barra de progresso).
+    # `renderizador`: "nativo" (vetorial, reportlab.graphics), "plotly"
+    # (PNG via Kaleido) ou uma função com a mesma assinatura de grafico_nativo.
+    progresso(0.05, "Preparando relatório")
+    if indice is None:
+        indice = ValveCurveIndex.from_frame(df_valvulas)
+    recursos = _recursos(logo_path)
+    buffer = BytesIO()
+    doc = _documento(buffer)
+    story = _story_relatorio(recursos, dn_list, df_valvulas, observacao, ajuste, vazao_lh, indice,
+                             _renderizador(renderizador), progresso)
+
+    progresso(0.85, "Gerando PDF")
+    add_footer = recursos.rodape()
+    doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
+    progresso(1.0, "Concluído")
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+# ----------------------------
+# Exportação em lote (projeto inteiro)
+# ----------------------------
+class ItemRelatorio(NamedTuple):
+    titulo: str
+    dn_list: list
+    ajuste: float | None
+    vazao_lh: float | None
+    observacao: str = ""
+
+
+def itens_do_lote(df_lote, observacao: str = "") -> list[ItemRelatorio]:
+    """Um item por unidade dimensionada (planilha de setpoint.lote)."""
+    itens = []
+    for unidade, dn, ajuste, vazao in zip(df_lote["Unidade"], df_lote["DN"], df_lote["Ajuste (%)"],
+                                          df_lote["Vazão ajustada (L/h)"]):
+        if dn is None or dn != dn:
+            continue
+        itens.append(ItemRelatorio(f"Válvula AB-QM — {unidade}", [dn],
+                                   None if ajuste != ajuste else float(ajuste),
+                                   None if vazao != vazao else float(vazao), observacao))
+    return itens
+
+
+@rastrear()
+def gerar_pdf_lote(itens, df_valvulas, destino, formato: str = "pdf", logo_path="logo_fabricante.png",
+                   indice=None, progresso=_sem_progresso, renderizador="nativo"):
+    """Relatórios de vários itens gravados direto em `destino` (caminho).
+
+    formato="pdf": um único documento, montado num só build, com estilos,
+    logo e rodapé compartilhados (o reportlab mantém o documento em memória
+    até gravar); limitado a MAX_ITENS_DOCUMENTO itens.
+    formato="zip": um PDF por item, cada um gravado no zip assim que fica
+    pronto; a memória não cresce com o tamanho do projeto.
+    """
+    from reportlab.platypus import PageBreak
+
+    if formato not in ("pdf", "zip"):
+        raise ValueError(f"Formato inválido: {formato!r}. Use 'pdf' ou 'zip'.")
+    itens = list(itens)
+    if formato == "pdf" and len(itens) > MAX_ITENS_DOCUMENTO:
+        raise ValueError(f"{len(itens)} válvulas num documento só: o limite é {MAX_ITENS_DOCUMENTO}. "
+                         "Use o formato zip (um PDF por válvula).")
+    if indice is None:
+        indice = ValveCurveIndex.from_frame(df_valvulas)
+    recursos = _recursos(logo_path)
+    desenhar = _renderizador(renderizador)
+    add_footer = recursos.rodape()
+    total = max(len(itens), 1)
+
+    if formato == "pdf":
+        story = []
+        for i, item in enumerate(itens):
+            progresso(0.8 * i / total, f"Montando {i + 1}/{total}")
+            if i:
+                story.append(PageBreak())
+            story.extend(_story_relatorio(recursos, item.dn_list, df_valvulas, item.observacao, item.ajuste,
+                                          item.vazao_lh, indice, desenhar, titulo=item.titulo))
+        progresso(0.85, "Gerando PDF")
+        _documento(destino).build(story, onFirstPage=add_footer, onLaterPages=add_footer)
+    else:
+        with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, item in enumerate(itens):
+                progresso(i / total, f"Gerando {i + 1}/{total}")
+                with zf.open(_nome_arquivo(i, item.titulo), "w") as saida:
+                    story = _story_relatorio(recursos, item.dn_list, df_valvulas, item.observacao, item.ajuste,
+                                             item.vazao_lh, indice, desenhar, titulo=item.titulo)
+                    _documento(saida).build(story, onFirstPage=add_footer, onLaterPages=add_footer)
+    progresso(1.0, "Concluído")
+    return destino
+
+
+def _nome_arquivo(i: int, titulo: str) -> str:
+    base = re.sub(r"[^A-Za-z0-9_.-]+", "_", titulo.split("—")[-1].strip()).strip("_") or "valvula"
+    return f"{i + 1:05d}_{base}.pdf"
@@ -0,0 +1,467 @@
+# ----------------------------
+# Histórico de dimensionamentos (SQLite) e redimensionamento incremental
+# ----------------------------
+# Cada projeto salvo guarda uma linha por válvula (capacidade, vazão, modo,
+# DN, ajuste) e a versão da tabela de válvulas com que foi validado; as
+# colunas de cada versão da tabela também ficam no banco, com um hash por
+# coluna DN. Quando o fabricante atualiza tabela_valvulas.xlsx, revalidar()
+# compara a versão do projeto com a atual (hash por coluna, depois linha a
+# linha só nas colunas diferentes) e redimensiona só as válvulas cuja vazão
+# de projeto cai entre os vizinhos das linhas alteradas (as únicas que podem
+# mudar de linha mais próxima ou de trecho de interpolação), pelo índice
+# (projeto, dn, vazao_lh): o custo acompanha o tamanho da mudança, não o do
+# projeto nem o de cada DN. As válvulas cujo ajuste, DN ou vazão esperada mudaram
+# vão para o relatório de alterações (e para a tabela `alteracoes`).
+#
+#   python -m setpoint.resultados [projeto ...]    revalida com a tabela atual
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from setpoint.dados import (
+    ARQUIVO_MAQUINAS,
+    ARQUIVO_VALVULAS,
+    COLUNA_CAPACIDADE,
+    COLUNA_SETTING,
+    TabelaValvulas,
+    carregar_tabela_maquinas,
+    carregar_tabela_valvulas,
+)
+from setpoint.lote import COLUNA_UNIDADE, COLUNAS_RESULTADO, resolver_dns
+from setpoint.rastreio import rastrear
+from setpoint.selecao import ResolvedorDN
+
+ARQUIVO_RESULTADOS = os.environ.get("SETPOINT_RESULTADOS", "setpoint_resultados.sqlite")
+
+COLUNAS_ALTERACAO = [
+    COLUNA_UNIDADE,
+    "DN anterior",
+    "DN",
+    "Ajuste anterior (%)",
+    "Ajuste (%)",
+    "Δ ajuste (p.p.)",
+    "Vazão ajustada anterior (L/h)",
+    "Vazão ajustada (L/h)",
+]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tabelas (
+    versao TEXT PRIMARY KEY,
+    settings BLOB NOT NULL,
+    dn_options TEXT NOT NULL,
+    criada_em REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS colunas (
+    versao TEXT NOT NULL,
+    dn TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    valores BLOB NOT NULL,
+    PRIMARY KEY (versao, dn)
+);
+CREATE TABLE IF NOT EXISTS projetos (
+    nome TEXT PRIMARY KEY,
+    versao TEXT NOT NULL,
+    valvulas INTEGER NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dimensionamentos (
+    projeto TEXT NOT NULL,
+    unidade TEXT NOT NULL,
+    capacidade REAL,
+    vazao_lh REAL,
+    modo TEXT NOT NULL,
+    automatico INTEGER NOT NULL,
+    dn TEXT,
+    ajuste REAL,
+    vazao_ajustada REAL,
+    versao TEXT NOT NULL,          -- versão da tabela que calculou o resultado gravado
+    PRIMARY KEY (projeto, unidade)
+);
+DROP INDEX IF EXISTS dimensionamentos_dn;
+CREATE INDEX IF NOT EXISTS dimensionamentos_dn_vazao ON dimensionamentos (projeto, dn, modo, vazao_lh);
+CREATE INDEX IF NOT EXISTS dimensionamentos_capacidade ON dimensionamentos (projeto, automatico, capacidade);
+CREATE TABLE IF NOT EXISTS alteracoes (
+    id INTEGER PRIMARY KEY,
+    projeto TEXT NOT NULL,
+    unidade TEXT NOT NULL,
+    versao_anterior TEXT NOT NULL,
+    versao_nova TEXT NOT NULL,
+    dn_anterior TEXT,
+    dn_novo TEXT,
+    ajuste_anterior REAL,
+    ajuste_novo REAL,
+    vazao_anterior REAL,
+    vazao_nova REAL,
+    em REAL NOT NULL
+);
+"""
+
+
+class DiferencaTabela(NamedTuple):
+    versao_anterior: str
+    versao_nova: str
+    linhas_alteradas: dict[str, np.ndarray]   # DN -> posições das linhas diferentes
+    dns_novos: list[str]
+    dns_removidos: list[str]
+    settings_alterados: bool
+
+    @property
+    def vazia(self) -> bool:
+        return not (self.linhas_alteradas or self.dns_novos or self.dns_removidos or self.settings_alterados)
+
+
+class Revalidacao(NamedTuple):
+    projeto: str
+    diferenca: DiferencaTabela | None        # None: projeto já estava na versão atual
+    reavaliadas: int
+    alteracoes: pd.DataFrame                  # COLUNAS_ALTERACAO
+    segundos: float
+
+
+# Pontos vizinhos (de cada lado, na curva ordenada) que uma linha alterada
+# alcança em cada modo: a linha mais próxima e o trecho linear dependem só dos
+# vizinhos imediatos; a derivada do PCHIP num ponto depende também dos
+# vizinhos dele (e a das pontas, dos três primeiros/últimos pontos)
+_VIZINHOS = {"nearest": 1, "linear": 1, "pchip": 2}
+
+
+def _faixas_afetadas(antigos: np.ndarray, novos: np.ndarray, linhas: np.ndarray,
+                     vizinhos: int) -> list[tuple[float, float]]:
+    """Faixas de vazão (fechadas, unidas) em que o resultado pode ter mudado.
+
+    Para cada linha alterada, vai do `vizinhos`-ésimo ponto abaixo ao
+    `vizinhos`-ésimo acima dela, na curva antiga e na nova; sem vizinho, a
+    faixa segue até ±inf (vazões fora da curva ficam presas na ponta).
+    """
+    if np.isnan(antigos).all() or np.isnan(novos).all():
+        return [(-np.inf, np.inf)]      # curva inteira surgiu ou sumiu
+    faixas = []
+    for curva in (antigos, novos):
+        valores = curva[linhas]
+        valores = valores[~np.isnan(valores)]
+        ordenada = np.sort(curva[~np.isnan(curva)])
+        n = len(ordenada)
+        abaixo = np.searchsorted(ordenada, valores, side="left") - vizinhos
+        acima = np.searchsorted(ordenada, valores, side="right") - 1 + vizinhos
+        faixas += zip(np.where(abaixo >= 0, ordenada[np.clip(abaixo, 0, n - 1)], -np.inf).tolist(),
+                      np.where(acima < n, ordenada[np.clip(acima, 0, n - 1)], np.inf).tolist())
+    unidas: list[list[float]] = []
+    for inicio, fim in sorted(faixas):
+        if unidas and inicio <= unidas[-1][1]:
+            unidas[-1][1] = max(unidas[-1][1], fim)
+        else:
+            unidas.append([inicio, fim])
+    return [(inicio, fim) for inicio, fim in unidas]
+
+
+def _hash_coluna(valores: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(valores, dtype=float).tobytes()).hexdigest()
+
+
+def _diferentes(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # NaN == NaN conta como igual (células vazias da planilha)
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+
+class ArmazemResultados:
+    """Projetos dimensionados e as versões da tabela com que foram validados."""
+
+    def __init__(self, caminho: str = ARQUIVO_RESULTADOS):
+        self.caminho = caminho
+        with self._conectar() as con:
+            con.executescript(_ESQUEMA)
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexão por operação: o armazém é usado por várias sessões/threads
+        con = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # ----------------------------
+    # Versões da tabela de válvulas
+    # ----------------------------
+    def registrar_tabela(self, tabela: TabelaValvulas, con=None) -> None:
+        """Guarda as colunas da versão `tabela.versao` (uma vez por versão)."""
+        if con is None:
+            with self._conectar() as con:
+                return self.registrar_tabela(tabela, con)
+        if con.execute("SELECT 1 FROM tabelas WHERE versao = ?", (tabela.versao,)).fetchone():
+            return
+        settings = tabela.df[COLUNA_SETTING].to_numpy(dtype=float)
+        con.execute("INSERT INTO tabelas VALUES (?, ?, ?, ?)",
+                    (tabela.versao, settings.tobytes(), json.dumps(tabela.dn_options, ensure_ascii=False),
+                     time.time()))
+        con.executemany("INSERT INTO colunas VALUES (?, ?, ?, ?)", (
+            (tabela.versao, dn, _hash_coluna(valores), valores.tobytes())
+            for dn in tabela.dn_options
+            for valores in [tabela.df[dn].to_numpy(dtype=float)]
+        ))
+
+    def diferenca(self, versao_anterior: str, tabela: TabelaValvulas, con=None) -> DiferencaTabela:
+        """DNs e linhas que mudaram de `versao_anterior` (já registrada) para `tabela`."""
+        if con is None:
+            with self._conectar() as con:
+                return self.diferenca(versao_anterior, tabela, con)
+        linha = con.execute("SELECT settings, dn_options FROM tabelas WHERE versao = ?",
+                            (versao_anterior,)).fetchone()
+        if linha is None:
+            raise KeyError(f"Versão da tabela não registrada: {versao_anterior}")
+        settings_antigos = np.frombuffer(linha[0], dtype=float)
+        dns_antigos = json.loads(linha[1])
+        hashes = dict(con.execute("SELECT dn, hash FROM colunas WHERE versao = ?", (versao_anterior,)))
+
+        settings = tabela.df[COLUNA_SETTING].to_numpy(dtype=float)
+        settings_alterados = len(settings) != len(settings_antigos) or bool(
+            np.any(_diferentes(settings, settings_antigos)))
+        comuns = [dn for dn in tabela.dn_options if dn in hashes]
+        alteradas = {}
+        for dn in comuns:
+            valores = tabela.df[dn].to_numpy(dtype=float)
+            if not settings_alterados and _hash_coluna(valores) == hashes[dn]:
+                continue
+            if settings_alterados:
+                # Linhas não se correspondem mais: a curva inteira conta como nova
+                alteradas[dn] = np.arange(len(valores))
+                continue
+            antigos = np.frombuffer(con.execute("SELECT valores FROM colunas WHERE versao = ? AND dn = ?",
+                                                (versao_anterior, dn)).fetchone()[0], dtype=float)
+            alteradas[dn] = np.flatnonzero(_diferentes(valores, antigos))
+        return DiferencaTabela(
+            versao_anterior=versao_anterior,
+            versao_nova=tabela.versao,
+            linhas_alteradas=alteradas,
+            dns_novos=[dn for dn in tabela.dn_options if dn not in hashes],
+            dns_removidos=[dn for dn in dns_antigos if dn not in tabela.dn_options],
+            settings_alterados=settings_alterados,
+        )
+
+    # ----------------------------
+    # Projetos
+    # ----------------------------
+    def salvar_lote(self, projeto: str, df_lote: pd.DataFrame, tabela: TabelaValvulas, modo: str = "nearest",
+                    automatico: bool = True) -> None:
+        """Grava (substitui) o projeto a partir da planilha de dimensionar_lote.
+
+        `automatico`: o DN veio da capacidade (é reavaliado se a tabela ganhar
+        ou perder colunas DN); com False o DN gravado é mantido.
+        """
+        linhas = list(zip(
+            [projeto] * len(df_lote),
+            df_lote[COLUNA_UNIDADE].astype(str),
+            pd.to_numeric(df_lote[COLUNA_CAPACIDADE], errors="coerce").astype(float).map(_sql),
+            df_lote["Vazão projeto (L/h)"].astype(float).map(_sql),
+            [modo] * len(df_lote),
+            [int(automatico)] * len(df_lote),
+            df_lote["DN"].map(lambda dn: dn if isinstance(dn, str) else None),
+            df_lote["Ajuste (%)"].astype(float).map(_sql),
+            df_lote["Vazão ajustada (L/h)"].astype(float).map(_sql),
+            [tabela.versao] * len(df_lote),
+        ))
+        with self._conectar() as con:
+            self.registrar_tabela(tabela, con)
+            con.execute("DELETE FROM dimensionamentos WHERE projeto = ?", (projeto,))
+            con.executemany("INSERT INTO dimensionamentos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas)
+            con.execute("INSERT OR REPLACE INTO projetos VALUES (?, ?, ?, ?)",
+                        (projeto, tabela.versao, len(linhas), time.time()))
+
+    def projetos(self) -> pd.DataFrame:
+        """Nome, versão da tabela e data de cada projeto salvo."""
+        with self._conectar() as con:
+            # Lido a cada rerun da página: sem varrer os dimensionamentos
+            return pd.read_sql_query("SELECT nome AS projeto, versao, valvulas, atualizado_em FROM projetos "
+                                     "ORDER BY nome", con)
+
+    def carregar(self, projeto: str) -> pd.DataFrame:
+        """Planilha do projeto no formato de dimensionar_lote."""
+        with self._conectar() as con:
+            df = pd.read_sql_query(
+                "SELECT unidade, capacidade, dn, vazao_lh, ajuste, vazao_ajustada FROM dimensionamentos "
+                "WHERE projeto = ? ORDER BY rowid", con, params=(projeto,))
+        df.columns = COLUNAS_RESULTADO[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["Desvio (%)"] = (df["Vazão ajustada (L/h)"] - df["Vazão projeto (L/h)"]) / df["Vazão projeto (L/h)"] * 100
+        return df
+
+    @rastrear()
+    def revalidar(self, projeto: str, tabela: TabelaValvulas, resolvedor_dn: ResolvedorDN | None = None
+                  ) -> Revalidacao:
+        """Leva o projeto para `tabela.versao` redimensionando só as válvulas afetadas."""
+        inicio = time.perf_counter()
+        with self._conectar() as con:
+            linha = con.execute("SELECT versao FROM projetos WHERE nome = ?", (projeto,)).fetchone()
+            if linha is None:
+                raise KeyError(f"Projeto não encontrado: {projeto!r}")
+            versao_anterior = linha[0]
+            if versao_anterior == tabela.versao:
+                return Revalidacao(projeto, None, 0, pd.DataFrame(columns=COLUNAS_ALTERACAO),
+                                   time.perf_counter() - inicio)
+
+            self.registrar_tabela(tabela, con)
+            diferenca = self.diferenca(versao_anterior, tabela, con)
+            afetadas = self._afetadas(con, projeto, diferenca, tabela, resolvedor_dn)
+            alteracoes = self._redimensionar(con, projeto, afetadas, tabela, versao_anterior)
+            con.execute("UPDATE projetos SET versao = ?, atualizado_em = ? WHERE nome = ?",
+                        (tabela.versao, time.time(), projeto))
+        return Revalidacao(projeto, diferenca, len(afetadas), alteracoes, time.perf_counter() - inicio)
+
+    def _afetadas(self, con, projeto: str, diferenca: DiferencaTabela, tabela: TabelaValvulas,
+                  resolvedor_dn: ResolvedorDN | None) -> pd.DataFrame:
+        colunas = "rowid, unidade, capacidade, vazao_lh, modo, automatico, dn, ajuste, vazao_ajustada"
+        partes = []
+
+        # DNs com curva alterada: só as válvulas com vazão perto das linhas
+        # alteradas (índice (projeto, dn, modo, vazao_lh))
+        for dn, linhas in diferenca.linhas_alteradas.items():
+            novos = tabela.df[dn].to_numpy(dtype=float)
+            if diferenca.settings_alterados:
+                antigos = novos     # todas as linhas alteradas: a faixa já é (-inf, inf)
+            else:
+                antigos = np.frombuffer(con.execute("SELECT valores FROM colunas WHERE versao = ? AND dn = ?",
+                                                    (diferenca.versao_anterior, dn)).fetchone()[0], dtype=float)
+            for modo, vizinhos in _VIZINHOS.items():
+                for inicio, fim in _faixas_afetadas(antigos, novos, linhas, vizinhos):
+                    partes.append(pd.read_sql_query(
+                        f"SELECT {colunas} FROM dimensionamentos WHERE projeto = ? AND dn = ? AND modo = ? "
+                        f"AND vazao_lh BETWEEN ? AND ?", con, params=[projeto, dn, modo, inicio, fim]))
+
+        # DNs removidos: todas as válvulas deles
+        dns = diferenca.dns_removidos
+        for inicio in range(0, len(dns), 500):
+            bloco = dns[inicio:inicio + 500]
+            partes.append(pd.read_sql_query(
+                f"SELECT {colunas} FROM dimensionamentos WHERE projeto = ? AND dn IN ({','.join('?' * len(bloco))})",
+                con, params=[projeto, *bloco]))
+
+        # Colunas DN novas ou removidas mudam a escolha automática por capacidade:
+        # reavalia por capacidade distinta e pega só as que trocariam de DN
+        if diferenca.dns_novos or diferenca.dns_removidos:
+            capacidades = [c for (c,) in con.execute(
+                "SELECT DISTINCT capacidade FROM dimensionamentos WHERE projeto = ? AND automatico = 1",
+                (projeto,))]
+            novos = dict(zip(capacidades, resolver_dns(capacidades, tabela.dn_options, resolvedor_dn)))
+            for capacidade, dn in novos.items():
+                partes.append(pd.read_sql_query(
+                    f"SELECT {colunas} FROM dimensionamentos WHERE projeto = ? AND automatico = 1 AND "
+                    f"capacidade IS ? AND dn IS NOT ?", con, params=[projeto, capacidade, dn]))
+
+        afetadas = pd.concat([p for p in partes if len(p)] or [pd.DataFrame(columns=colunas.split(", "))],
+                             ignore_index=True).drop_duplicates("rowid")
+        afetadas["dn_novo"] = afetadas["dn"]
+        if len(afetadas):
+            automaticas = afetadas["automatico"].to_numpy(dtype=bool)
+            afetadas.loc[automaticas, "dn_novo"] = resolver_dns(
+                afetadas.loc[automaticas, "capacidade"], tabela.dn_options, resolvedor_dn)
+            removido = afetadas["dn_novo"].isin(diferenca.dns_removidos)
+            afetadas.loc[removido, "dn_novo"] = None
+        return afetadas
+
+    def _redimensionar(self, con, projeto: str, afetadas: pd.DataFrame, tabela: TabelaValvulas,
+                       versao_anterior: str) -> pd.DataFrame:
+        ajuste = np.full(len(afetadas), np.nan)
+        vazao = np.full(len(afetadas), np.nan)
+        dns = afetadas["dn_novo"].to_numpy(dtype=object)
+        modos = afetadas["modo"].to_numpy(dtype=object)
+        vazoes_projeto = afetadas["vazao_lh"].to_numpy(dtype=float)
+        # Posições de cada (DN, modo) de uma vez, sem comparar o array inteiro por grupo.
+        # O grupo sem DN entra também: essas válvulas ficam sem ajuste (e, se
+        # tinham um, vão para o relatório de alterações)
+        grupos = pd.DataFrame({"dn": dns, "modo": modos}).groupby(["dn", "modo"], sort=False, dropna=False).indices
+        for (dn, modo), sel in grupos.items():
+            sel = sel[vazoes_projeto[sel] > 0]    # como em dimensionar_lote
+            if dn is None or dn != dn or not len(sel):
+                continue
+            ajuste[sel], vazao[sel], _ = tabela.solver.resolver(dn, vazoes_projeto[sel], modo)
+
+        ajuste_anterior = afetadas["ajuste"].to_numpy(dtype=float)
+        vazao_anterior = afetadas["vazao_ajustada"].to_numpy(dtype=float)
+        dns_anteriores = afetadas["dn"].to_numpy(dtype=object)
+        mudou = (_diferentes(ajuste, ajuste_anterior) | _diferentes(vazao, vazao_anterior)
+                 | (pd.Series(dns).fillna("") != pd.Series(dns_anteriores).fillna("")).to_numpy())
+        idx = np.flatnonzero(mudou)
+
+        # Só as linhas com resultado diferente são regravadas
+        rowids = afetadas["rowid"].to_numpy()
+        con.executemany(
+            "UPDATE dimensionamentos SET dn = ?, ajuste = ?, vazao_ajustada = ?, versao = ? WHERE rowid = ?",
+            ((dns[i], _sql(ajuste[i]), _sql(vazao[i]), tabela.versao, int(rowids[i])) for i in idx))
+        unidades = afetadas["unidade"].to_numpy()
+        agora = time.time()
+        con.executemany("INSERT INTO alteracoes (projeto, unidade, versao_anterior, versao_nova, dn_anterior, "
+                        "dn_novo, ajuste_anterior, ajuste_novo, vazao_anterior, vazao_nova, em) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                            (projeto, unidades[i], versao_anterior, tabela.versao,
+                             dns_anteriores[i], dns[i], _sql(ajuste_anterior[i]), _sql(ajuste[i]),
+                             _sql(vazao_anterior[i]), _sql(vazao[i]), agora)
+                            for i in idx))
+        return pd.DataFrame({
+            COLUNA_UNIDADE: unidades[idx],
+            "DN anterior": dns_anteriores[idx],
+            "DN": dns[idx],
+            "Ajuste anterior (%)": ajuste_anterior[idx],
+            "Ajuste (%)": ajuste[idx],
+            "Δ ajuste (p.p.)": ajuste[idx] - ajuste_anterior[idx],
+            "Vazão ajustada anterior (L/h)": vazao_anterior[idx],
+            "Vazão ajustada (L/h)": vazao[idx],
+        }, columns=COLUNAS_ALTERACAO)
+
+
+def _sql(valor):
+    # NaN vira NULL no SQLite
+    return None if valor is None or valor != valor else float(valor)
+
+
+_armazem: ArmazemResultados | None = None
+_armazem_lock = threading.Lock()
+
+
+def armazem_resultados(criar: bool = True) -> ArmazemResultados | None:
+    """Armazém único por processo (arquivo ARQUIVO_RESULTADOS).
+
+    Com `criar=False` devolve None enquanto o arquivo não existir (nenhum
+    projeto salvo), sem criar o banco. Banco inacessível levanta sqlite3.Error.
+    """
+    global _armazem
+    with _armazem_lock:
+        if _armazem is None:
+            if not criar and not os.path.exists(ARQUIVO_RESULTADOS):
+                return None
+            _armazem = ArmazemResultados(ARQUIVO_RESULTADOS)
+        return _armazem
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    armazem = armazem_resultados()
+    tabela = carregar_tabela_valvulas(ARQUIVO_VALVULAS)
+    resolvedor = carregar_tabela_maquinas(ARQUIVO_MAQUINAS).resolvedor_dn
+    for projeto in argv or armazem.projetos()["projeto"].tolist():
+        r = armazem.revalidar(projeto, tabela, resolvedor)
+        if r.diferenca is None:
+            print(f"{projeto}: já na versão atual da tabela")
+            continue
+        d = r.diferenca
+        print(f"{projeto}: {len(d.linhas_alteradas)} DN(s) com curva alterada, {len(d.dns_novos)} novo(s), "
+              f"{len(d.dns_removidos)} removido(s); {r.reavaliadas} válvula(s) redimensionada(s), "
+              f"{len(r.alteracoes)} alterada(s) em {r.segundos * 1000:.0f} ms")
+        if len(r.alteracoes):
+            print(r.alteracoes.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
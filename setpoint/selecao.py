@@ -0,0 +1,125 @@
+# ----------------------------
+# Seleção de DN a partir da capacidade da máquina
+# ----------------------------
+# O mapa capacidade -> DN vem da planilha de máquinas (coluna "DN"); sem essa
+# coluna vale o capacidade_to_dn abaixo. As capacidades da tabela são pontos
+# de quebra ordenados: uma capacidade usa o DN da menor máquina que a cobre
+# (bisect), então modelos novos e capacidades intermediárias não exigem mudar
+# o código. Acima da maior máquina não há DN automático.
+# Os rótulos ("DN 15 HF") casam com a primeira coluna da tabela de válvulas
+# que contém o rótulo normalizado; o índice com todos os trechos de cada
+# coluna é montado uma vez por lista de colunas.
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+import numpy as np
+
+from setpoint.rastreio import rastrear
+
+# Usado quando a planilha de máquinas não tem a coluna "DN"
+capacidade_to_dn = {
+    10000: "DN 15 L/h",
+    12000: "DN 15 HF",
+    16000: "DN 15 HF",
+    20000: "DN 15 HF",
+    24000: "DN 15 HF",
+    25000: "DN 15 HF",
+    32000: "DN 20 HF",
+    36000: "DN 20 HF",
+    42000: "DN 32",
+    44000: "DN 32",
+    55000: "DN 32"
+}
+
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]')
+
+
+def normalize_label(label):
+    return _NAO_ALFANUMERICO.sub('', str(label).lower())
+
+
+# Rótulos de DN normalizados são curtos ("dn15hf"); trechos maiores que isso
+# não entram no índice e caem na busca linear (já sem regex por coluna)
+_MAX_TRECHO = 16
+
+
+@lru_cache(maxsize=32)
+def _indice_rotulos(dn_options: tuple) -> tuple[dict[str, str], list[tuple[str, str]]]:
+    # Cada trecho de cada coluna normalizada -> primeira coluna que o contém
+    # (mesmo resultado da busca linear "rótulo in coluna", na ordem das colunas)
+    normalizadas = [(normalize_label(col), col) for col in dn_options]
+    indice: dict[str, str] = {}
+    for norm, col in normalizadas:
+        for i in range(len(norm) + 1):
+            for j in range(i, min(i + _MAX_TRECHO, len(norm)) + 1):
+                indice.setdefault(norm[i:j], col)
+    return indice, normalizadas
+
+
+@rastrear()
+def find_matching_dn_column(dn_label, dn_options):
+    if dn_label is None: return None
+    dn_norm = normalize_label(dn_label)
+    indice, normalizadas = _indice_rotulos(tuple(dn_options))
+    if len(dn_norm) <= _MAX_TRECHO:
+        return indice.get(dn_norm)
+    return next((col for norm, col in normalizadas if dn_norm in norm), None)
+
+
+class ResolvedorDN:
+    """Capacidade (Btu/h) -> rótulo de DN por faixas (pontos de quebra ordenados)."""
+
+    def __init__(self, mapa: dict):
+        pares = sorted((float(cap), str(dn)) for cap, dn in mapa.items())
+        self.capacidades = np.array([cap for cap, _ in pares])
+        self.rotulos = [dn for _, dn in pares]
+
+    @classmethod
+    def da_tabela(cls, df, coluna_capacidade: str, coluna_dn: str) -> "ResolvedorDN":
+        """Mapa de uma tabela de máquinas; capacidades repetidas ficam com a primeira linha."""
+        mapa = {}
+        for cap, dn in zip(df[coluna_capacidade], df[coluna_dn]):
+            if cap == cap and isinstance(dn, str) and dn.strip():
+                mapa.setdefault(int(cap), dn.strip())
+        return cls(mapa)
+
+    def __len__(self) -> int:
+        return len(self.rotulos)
+
+    def rotulo(self, capacidade) -> str | None:
+        if capacidade is None or capacidade != capacidade:
+            return None
+        i = bisect_left(self.capacidades, float(capacidade))
+        return self.rotulos[i] if i < len(self.rotulos) else None
+
+    def rotulos_de(self, capacidades) -> np.ndarray:
+        """rotulo() vetorizado (np.searchsorted); NaN e capacidades acima da maior viram None."""
+        caps = np.asarray(capacidades, dtype=float)
+        i = np.searchsorted(self.capacidades, caps, side="left")
+        validos = ~np.isnan(caps) & (i < len(self.rotulos))
+        saida = np.full(caps.shape, None, dtype=object)
+        saida[validos] = np.array(self.rotulos + [None], dtype=object)[i[validos]]
+        return saida
+
+
+RESOLVEDOR_PADRAO = ResolvedorDN(capacidade_to_dn)
+
+
+def dn_do_rotulo(rotulo, dn_options):
+    # DNs "LF" são ignorados, como na seleção automática do main.py
+    if rotulo and "LF" not in rotulo:
+        return find_matching_dn_column(rotulo, dn_options)
+    return None
+
+
+def dn_automatico(capacidade, dn_options, resolvedor: ResolvedorDN | None = None):
+    """Coluna DN sugerida para uma capacidade (Btu/h), ou None.
+
+    `resolvedor` normalmente é TabelaMaquinas.resolvedor_dn; sem ele vale
+    o capacidade_to_dn.
+    """
+    return dn_do_rotulo((resolvedor or RESOLVEDOR_PADRAO).rotulo(capacidade), dn_options)
@@ -0,0 +1,428 @@
+# ----------------------------
+# Serviço HTTP/JSON local com os cálculos de vazão e ajuste
+# ----------------------------
+# Para as ferramentas de comissionamento do BMS e scripts: os mesmos cálculos
+# de main.py e pages/Flow.py, sem Streamlit. Só asyncio da biblioteca padrão;
+# as tabelas ficam residentes no processo (cache de setpoint.dados, relido se
+# a planilha mudar).
+#
+#   python -m setpoint.servidor [--host 127.0.0.1] [--porta 8600] [--janela-ms 0]
+#
+# Rotas POST com corpo JSON. A versão /lote recebe {"itens": [...]} e
+# responde {"itens": [...]}, com {"erro": ...} no lugar de cada item inválido:
+#   /vazao[/lote]   capacidade (Btu/h) e fluido -> vazão de projeto e faixa
+#   /ajuste[/lote]  vazão (L/h ou m³/h) e DN ou capacidade -> ajuste da válvula
+#   /faixa[/lote]   verificação do Flow.py: vazão medida ou do tubo x faixa
+#   GET /saude, GET /metrics (setpoint.rastreio, formato Prometheus)
+# Pedidos avulsos que chegam juntos são agrupados e calculados numa chamada
+# vetorizada só (um SettingSolver.resolver por DN): por padrão os que chegam
+# na mesma volta do loop; com --janela-ms, os que chegam dentro da janela.
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import traceback
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Callable
+
+import numpy as np
+
+from setpoint import rastreio
+from setpoint.dados import (
+    ARQUIVO_MAQUINAS,
+    ARQUIVO_VALVULAS,
+    carregar_tabela_maquinas,
+    carregar_tabela_valvulas,
+)
+from setpoint.fluidos import AGUA, NOMES_FLUIDOS, vazao_por_capacidade_fluido
+from setpoint.fluxo import STATUS, codigo_faixa, delta_T, faixa, vazao_tubo
+from setpoint.lote import resolver_dns
+from setpoint.selecao import find_matching_dn_column
+from setpoint.solver import MODOS
+
+PORTA = 8600
+MAX_CORPO = 8 * 1024 * 1024
+MAX_ITENS = 100_000
+FAIXAS = ("indefinido", "abaixo", "dentro", "acima")   # ordem de codigo_faixa
+
+
+class ErroRequisicao(ValueError):
+    """Item ou corpo inválido; vira 400 (ou {"erro": ...} dentro de um lote)."""
+
+
+# ----------------------------
+# Leitura dos itens
+# ----------------------------
+def _numero(item: dict, chave: str, padrao=None, positivo: bool = False) -> float:
+    valor = item.get(chave, padrao)
+    if valor is None:
+        raise ErroRequisicao(f"Campo obrigatório ausente: {chave!r}.")
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ErroRequisicao(f"Campo {chave!r} deve ser um número.")
+    try:
+        valor = float(valor)    # inteiros JSON não têm limite
+    except OverflowError:
+        raise ErroRequisicao(f"Campo {chave!r} fora da faixa numérica.") from None
+    if not math.isfinite(valor):
+        raise ErroRequisicao(f"Campo {chave!r} deve ser um número.")
+    if positivo and valor <= 0:
+        raise ErroRequisicao(f"Campo {chave!r} deve ser maior que zero.")
+    return valor
+
+
+def _circuito(item: dict) -> tuple[str, float, float, float, float]:
+    # (fluido, temperatura, concentração, ΔT, faixa): chave de agrupamento
+    fluido = item.get("fluido", AGUA)
+    if not isinstance(fluido, str) or fluido not in NOMES_FLUIDOS:
+        raise ErroRequisicao(f"Fluido inválido: {fluido!r}. Use um de {list(NOMES_FLUIDOS)}.")
+    concentracao = 0.0 if fluido == AGUA else _numero(item, "concentracao", 0.0)
+    return (fluido, _numero(item, "temperatura_c", 10.0), concentracao,
+            _numero(item, "delta_t", delta_T, positivo=True), _numero(item, "faixa", faixa))
+
+
+def _vazao_lh(item: dict) -> float:
+    if "vazao_lh" in item:
+        return _numero(item, "vazao_lh", positivo=True)
+    if "vazao_m3h" in item:
+        return _numero(item, "vazao_m3h", positivo=True) * 1000
+    raise ErroRequisicao("Informe 'vazao_lh' ou 'vazao_m3h'.")
+
+
+def _num(x) -> float | None:
+    # JSON não tem NaN
+    x = float(x)
+    return x if math.isfinite(x) else None
+
+
+def _por_grupo(itens: list, ler: Callable) -> tuple[list, dict]:
+    """Resultados com os erros já preenchidos e {chave: [(posição, valores)]}.
+
+    Qualquer falha ao ler um item fica só nele: os itens vêm de clientes
+    diferentes agrupados pelo Agrupador, e um corpo estranho não pode
+    derrubar os pedidos válidos do mesmo lote.
+    """
+    resultados: list = [None] * len(itens)
+    grupos = defaultdict(list)
+    for i, item in enumerate(itens):
+        try:
+            if not isinstance(item, dict):
+                raise ErroRequisicao("Cada item deve ser um objeto JSON.")
+            chave, valores = ler(item)
+        except ErroRequisicao as erro:
+            resultados[i] = {"erro": str(erro)}
+        except Exception as erro:
+            resultados[i] = {"erro": f"Item inválido ({type(erro).__name__})."}
+        else:
+            grupos[chave].append((i, valores))
+    return resultados, grupos
+
+
+# ----------------------------
+# Cálculos em lote (funções puras, usadas pelas rotas avulsas e /lote)
+# ----------------------------
+def calcular_vazoes(itens: list) -> list[dict]:
+    """Vazão de projeto de cada capacidade (mesmos campos de VazaoMaquina)."""
+    resultados, grupos = _por_grupo(
+        itens, lambda item: (_circuito(item), _numero(item, "capacidade_btuh", positivo=True)))
+    for (fluido, temperatura, concentracao, dt, fx), membros in grupos.items():
+        capacidades = np.array([v for _, v in membros])
+        vazao = vazao_por_capacidade_fluido(capacidades, fluido, temperatura, concentracao, dt, fx)
+        for k, (i, _) in enumerate(membros):
+            resultados[i] = {campo: _num(valores[k]) for campo, valores in vazao._asdict().items()}
+    return resultados
+
+
+def verificar_faixas(itens: list) -> list[dict]:
+    """Vazão medida (ou do tubo: diâmetro e velocidade) contra a faixa de projeto."""
+    def ler(item):
+        if "diametro_mm" in item or "velocidade_m_s" in item:
+            vazao = float(vazao_tubo(_numero(item, "diametro_mm", positivo=True),
+                                     _numero(item, "velocidade_m_s", positivo=True)).vazao_lh)
+        else:
+            vazao = _vazao_lh(item)
+        return _circuito(item), (_numero(item, "capacidade_btuh", positivo=True), vazao)
+
+    resultados, grupos = _por_grupo(itens, ler)
+    for (fluido, temperatura, concentracao, dt, fx), membros in grupos.items():
+        capacidades, vazoes = np.array([v for _, v in membros]).T
+        projeto = vazao_por_capacidade_fluido(capacidades, fluido, temperatura, concentracao, dt, fx)
+        codigos = codigo_faixa(vazoes, projeto.limite_min_lh, projeto.limite_max_lh)
+        for k, (i, _) in enumerate(membros):
+            resultados[i] = {
+                "vazao_lh": _num(vazoes[k]),
+                "vazao_projeto_lh": _num(projeto.q_l_h[k]),
+                "limite_min_lh": _num(projeto.limite_min_lh[k]),
+                "limite_max_lh": _num(projeto.limite_max_lh[k]),
+                "status": FAIXAS[codigos[k]],
+                "simbolo": STATUS[codigos[k]],
+            }
+    return resultados
+
+
+def calcular_ajustes(itens: list, tabela, maquinas=None) -> list[dict]:
+    """Ajuste de cada vazão pelo DN informado ou pelo DN automático da capacidade."""
+    dn_options = tabela.dn_options
+    resolvedor = maquinas.resolvedor_dn if maquinas is not None else None
+
+    def ler(item):
+        modo = item.get("modo", "nearest")
+        if modo not in MODOS:
+            raise ErroRequisicao(f"Modo de ajuste inválido: {modo!r}. Use um de {MODOS}.")
+        if "dn" in item:
+            dn = item["dn"] if item["dn"] in dn_options else find_matching_dn_column(str(item["dn"]), dn_options)
+            if dn is None:
+                raise ErroRequisicao(f"DN não encontrado na tabela: {item['dn']!r}.")
+            capacidade = None
+        else:
+            dn, capacidade = None, _numero(item, "capacidade_btuh", positivo=True)
+        return modo, (dn, capacidade, _vazao_lh(item))
+
+    resultados, grupos = _por_grupo(itens, ler)
+    for modo, membros in grupos.items():
+        # DN automático de todas as capacidades do grupo de uma vez
+        sem_dn = [k for k, (_, (dn, _, _)) in enumerate(membros) if dn is None]
+        dns = [dn for _, (dn, _, _) in membros]
+        if sem_dn:
+            automaticos = resolver_dns([membros[k][1][1] for k in sem_dn], dn_options, resolvedor)
+            for k, dn in zip(sem_dn, automaticos):
+                dns[k] = dn
+        vazoes = np.array([v for _, (_, _, v) in membros])
+        for k, dn in enumerate(dns):
+            if dn is None:
+                resultados[membros[k][0]] = {
+                    "erro": f"Sem DN automático para a capacidade {membros[k][1][1]:g} Btu/h."}
+        dns = np.array(dns, dtype=object)
+        for dn in {dn for dn in dns if dn is not None}:
+            sel = np.flatnonzero(dns == dn)
+            ajuste, vazao, erro = tabela.solver.resolver(dn, vazoes[sel], modo)
+            for j, k in enumerate(sel):
+                resultados[membros[k][0]] = {
+                    "dn": dn,
+                    "modo": modo,
+                    "vazao_projeto_lh": _num(vazoes[k]),
+                    "ajuste": _num(ajuste[j]),
+                    "vazao_lh": _num(vazao[j]),
+                    "erro_lh": _num(erro[j]),
+                    "desvio_pct": _num(erro[j] / vazoes[k] * 100),
+                }
+    return resultados
+
+
+# ----------------------------
+# Agrupamento de pedidos avulsos
+# ----------------------------
+class Agrupador:
+    """Junta os itens que chegam dentro de `janela_s` numa chamada de `processar`.
+
+    `processar` roda na thread do loop: os cálculos são vetorizados e levam
+    microssegundos por item, então não vale o custo de um executor.
+    """
+
+    def __init__(self, processar: Callable[[list], list], janela_s: float, max_itens: int = 1024):
+        self._processar = processar
+        self._janela_s = janela_s
+        self._max_itens = max_itens
+        self._pendentes: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.Handle | None = None
+        self.lotes = 0
+        self.itens = 0
+
+    async def enviar(self, item: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendentes.append((item, futuro))
+        if len(self._pendentes) >= self._max_itens:
+            self._despachar()
+        elif self._timer is None:
+            # Janela zero: agrupa o que chegou na mesma volta do loop, sem esperar
+            self._timer = (loop.call_later(self._janela_s, self._despachar) if self._janela_s > 0
+                           else loop.call_soon(self._despachar))
+        return await futuro
+
+    def _despachar(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pendentes, self._pendentes = self._pendentes, []
+        if not pendentes:
+            return
+        self.lotes += 1
+        self.itens += len(pendentes)
+        try:
+            resultados = self._processar([item for item, _ in pendentes])
+        except Exception as erro:
+            for _, futuro in pendentes:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+        for (_, futuro), resultado in zip(pendentes, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+
+# ----------------------------
+# Servidor HTTP
+# ----------------------------
+class Servidor:
+    def __init__(self, caminho_valvulas: str = ARQUIVO_VALVULAS, caminho_maquinas: str = ARQUIVO_MAQUINAS,
+                 janela_s: float = 0.0, max_lote: int = 1024):
+        self.caminho_valvulas = caminho_valvulas
+        self.caminho_maquinas = caminho_maquinas
+        calculos = {
+            "/vazao": calcular_vazoes,
+            "/faixa": verificar_faixas,
+            "/ajuste": lambda itens: calcular_ajustes(itens, *self.tabelas()),
+        }
+        self._processadores = {rota: self._medido(rota, calculo) for rota, calculo in calculos.items()}
+        self.agrupadores = {rota: Agrupador(processar, janela_s, max_lote)
+                            for rota, processar in self._processadores.items()}
+
+    def tabelas(self):
+        # Cache por processo de setpoint.dados: só um stat por chamada
+        return carregar_tabela_valvulas(self.caminho_valvulas), carregar_tabela_maquinas(self.caminho_maquinas)
+
+    @staticmethod
+    def _medido(rota: str, calculo: Callable[[list], list]) -> Callable[[list], list]:
+        def processar(itens: list) -> list:
+            with rastreio.medir(f"servidor {rota}"):
+                return calculo(itens)
+        return processar
+
+    def aquecer(self) -> None:
+        """Carrega as tabelas e monta índice e solver antes do primeiro pedido."""
+        valvulas, maquinas = self.tabelas()
+        valvulas.solver
+        maquinas.resolvedor_dn
+
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = PORTA) -> asyncio.Server:
+        self.aquecer()
+        return await asyncio.start_server(self._conexao, host, porta)
+
+    async def _conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                try:
+                    metodo, alvo, versao = linhas[0].split(" ", 2)
+                except ValueError:
+                    await self._responder(writer, 400, {"erro": "Linha de requisição inválida."}, False)
+                    return
+                campos = {}
+                for linha in linhas[1:]:
+                    nome, _, valor = linha.partition(":")
+                    campos[nome.strip().lower()] = valor.strip()
+                manter = (campos.get("connection", "").lower() != "close"
+                          if versao == "HTTP/1.1" else campos.get("connection", "").lower() == "keep-alive")
+
+                try:
+                    tamanho = int(campos.get("content-length", "0") or 0)
+                except ValueError:
+                    tamanho = -1
+                if not 0 <= tamanho <= MAX_CORPO:
+                    await self._responder(writer, 413, {"erro": "Content-Length inválido ou corpo grande demais."}, False)
+                    return
+                corpo = await reader.readexactly(tamanho) if tamanho else b""
+
+                try:
+                    status, resposta = await self._atender(metodo, alvo.split("?", 1)[0], corpo)
+                except Exception as erro:
+                    # Falha inesperada num cálculo: o cliente recebe 500 em vez de perder a conexão
+                    traceback.print_exc()
+                    status, resposta = 500, {"erro": f"Erro interno: {type(erro).__name__}."}
+                await self._responder(writer, status, resposta, manter)
+                if not manter:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _atender(self, metodo: str, caminho: str, corpo: bytes) -> tuple[int, object]:
+        caminho = caminho.rstrip("/") or "/"
+        if caminho == "/saude" and metodo == "GET":
+            valvulas, maquinas = self.tabelas()
+            return 200, {
+                "status": "ok",
+                "versao_valvulas": valvulas.versao,
+                "versao_maquinas": maquinas.versao,
+                "dns": len(valvulas.dn_options),
+                "agrupamento": {rota: {"lotes": a.lotes, "itens": a.itens} for rota, a in self.agrupadores.items()},
+            }
+        if caminho == "/metrics" and metodo == "GET":
+            return 200, rastreio.prometheus()
+
+        rota, lote = (caminho[:-len("/lote")], True) if caminho.endswith("/lote") else (caminho, False)
+        if rota not in self._processadores:
+            return 404, {"erro": f"Rota desconhecida: {caminho}."}
+        if metodo != "POST":
+            return 405, {"erro": "Use POST com corpo JSON."}
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            return 400, {"erro": "Corpo não é JSON válido."}
+        if not isinstance(dados, dict):
+            return 400, {"erro": "O corpo deve ser um objeto JSON."}
+
+        if lote:
+            itens = dados.get("itens")
+            if not isinstance(itens, list):
+                return 400, {"erro": "Informe 'itens' com a lista de pedidos."}
+            if len(itens) > MAX_ITENS:
+                return 413, {"erro": f"No máximo {MAX_ITENS} itens por lote."}
+            # Lote explícito já é vetorizado: não passa pelo agrupador
+            return 200, {"itens": self._processadores[rota](itens)}
+
+        resultado = await self.agrupadores[rota].enviar(dados)
+        return (400 if "erro" in resultado else 200), resultado
+
+    @staticmethod
+    async def _responder(writer: asyncio.StreamWriter, status: int, resposta, manter: bool) -> None:
+        if isinstance(resposta, str):
+            conteudo, tipo = resposta.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            conteudo = json.dumps(resposta, ensure_ascii=False, allow_nan=False).encode("utf-8")
+            tipo = "application/json; charset=utf-8"
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {tipo}\r\nContent-Length: {len(conteudo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode("latin-1") + conteudo
+        )
+        await writer.drain()
+
+
+async def servir(host: str = "127.0.0.1", porta: int = PORTA, **opcoes) -> None:
+    servidor = await Servidor(**opcoes).iniciar(host, porta)
+    enderecos = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+    print(f"setpoint.servidor em http://{enderecos}", flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON de vazão e ajuste de válvulas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--valvulas", default=ARQUIVO_VALVULAS, help="planilha da tabela de válvulas")
+    parser.add_argument("--maquinas", default=ARQUIVO_MAQUINAS, help="planilha de capacidade das máquinas")
+    parser.add_argument("--janela-ms", type=float, default=0.0,
+                        help="espera para agrupar pedidos avulsos (0: só os da mesma volta do loop)")
+    parser.add_argument("--rastreio", action="store_true", help="mede os tempos para /metrics")
+    args = parser.parse_args(argv)
+    if args.rastreio:
+        rastreio.ativar(True)
+    try:
+        asyncio.run(servir(args.host, args.porta, caminho_valvulas=args.valvulas, caminho_maquinas=args.maquinas,
+                           janela_s=args.janela_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
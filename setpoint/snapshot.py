@@ -0,0 +1,212 @@
+# ----------------------------
+# Snapshot binário das tabelas (NumPy .npy + manifesto)
+# ----------------------------
+# As planilhas .xlsx continuam sendo a fonte; `python -m setpoint.snapshot`
+# compila cada uma numa pasta ao lado (tabela_valvulas.snapshot/) com um
+# .npy por bloco de colunas de mesmo dtype e um manifest.json com o formato,
+# o SHA-256 da planilha de origem (a mesma `versao` das tabelas), o
+# (mtime, tamanho) dela e o hash de cada bloco. setpoint.dados abre o
+# snapshot com np.load(mmap_mode="r"): o DataFrame aponta direto para as
+# páginas do arquivo (somente leitura, sem cópia, sem read_excel), e o tempo
+# de carga não cresce com a tabela. Colunas de texto são gravadas como
+# strings de tamanho fixo, com um .npy de máscara para as células vazias
+# (voltam como NaN, como no read_excel). Snapshot ausente, de outro formato
+# ou de outra versão da planilha é ignorado e a leitura volta ao Excel.
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from setpoint.dados import (
+    ARQUIVO_MAQUINAS,
+    ARQUIVO_VALVULAS,
+    TabelaMaquinas,
+    TabelaValvulas,
+)
+
+FORMATO = 2
+SUFIXO = ".snapshot"
+MANIFESTO = "manifest.json"
+
+# tipo -> (classe da tabela, campo guardado no manifesto além do DataFrame)
+_TIPOS = {
+    "valvulas": (TabelaValvulas, "dn_options"),
+    "maquinas": (TabelaMaquinas, "capacidades"),
+}
+
+
+def pasta_snapshot(caminho: str) -> str:
+    return os.path.splitext(os.path.abspath(caminho))[0] + SUFIXO
+
+
+def _hash_arquivo(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _blocos(df: pd.DataFrame) -> list[tuple[list[str], np.ndarray, np.ndarray | None]]:
+    # Colunas consecutivas de mesmo dtype viram um array 2D (linhas x colunas),
+    # o mesmo agrupamento de dados._frame_somente_leitura
+    blocos = []
+    inicio = 0
+    colunas = list(df.columns)
+    while inicio < len(colunas):
+        dtype = df[colunas[inicio]].dtype
+        fim = inicio
+        while fim < len(colunas) and df[colunas[fim]].dtype == dtype:
+            fim += 1
+        valores = df[colunas[inicio:fim]].to_numpy()
+        ausentes = None
+        if valores.dtype == object:
+            # .npy de objetos exige pickle e não abre por mmap; células vazias
+            # iriam como "nan" e ficam numa máscara à parte
+            ausentes = pd.isna(valores)
+            valores = np.where(ausentes, "", valores).astype(str)
+            if not ausentes.any():
+                ausentes = None
+        blocos.append((colunas[inicio:fim], np.ascontiguousarray(valores), ausentes))
+        inicio = fim
+    return blocos
+
+
+def salvar(tabela, tipo: str, caminho_origem: str, chave_stat: tuple[int, int] | None = None) -> str:
+    """Grava o snapshot de `tabela` (já carregada de `caminho_origem`); devolve a pasta."""
+    _, campo = _TIPOS[tipo]
+    if chave_stat is None:
+        stat = os.stat(caminho_origem)
+        chave_stat = (stat.st_mtime_ns, stat.st_size)
+    destino = pasta_snapshot(caminho_origem)
+    temporaria = f"{destino}.tmp-{os.getpid()}"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    blocos = []
+    for i, (colunas, valores, ausentes) in enumerate(_blocos(tabela.df)):
+        arquivo = f"bloco{i}.npy"
+        np.save(os.path.join(temporaria, arquivo), valores, allow_pickle=False)
+        bloco = {
+            "arquivo": arquivo,
+            "colunas": colunas,
+            "dtype": valores.dtype.str,
+            "sha256": _hash_arquivo(os.path.join(temporaria, arquivo)),
+        }
+        if ausentes is not None:
+            bloco["ausentes"] = f"bloco{i}_ausentes.npy"
+            np.save(os.path.join(temporaria, bloco["ausentes"]), ausentes, allow_pickle=False)
+        blocos.append(bloco)
+    manifesto = {
+        "formato": FORMATO,
+        "tipo": tipo,
+        "versao": tabela.versao,
+        "origem": {"nome": os.path.basename(caminho_origem), "mtime_ns": chave_stat[0], "tamanho": chave_stat[1]},
+        "linhas": len(tabela.df),
+        "blocos": blocos,
+        campo: list(getattr(tabela, campo)),
+    }
+    with open(os.path.join(temporaria, MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+
+    # Troca a pasta inteira de uma vez; quem já tem os .npy antigos em mmap
+    # continua lendo os arquivos removidos até soltá-los
+    antiga = f"{destino}.old-{os.getpid()}"
+    if os.path.isdir(destino):
+        os.replace(destino, antiga)
+    os.replace(temporaria, destino)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return destino
+
+
+def _ler_manifesto(pasta: str) -> dict | None:
+    try:
+        with open(os.path.join(pasta, MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def abrir(caminho: str, tipo: str, chave_stat: tuple[int, int]) -> tuple[str, object] | None:
+    """(versao, tabela) do snapshot de `caminho`, ou None se ausente/desatualizado.
+
+    Se (mtime, tamanho) da planilha bate com o manifesto, o snapshot vale sem
+    ler a planilha; senão vale só se o SHA-256 dela ainda for o do manifesto.
+    """
+    pasta = pasta_snapshot(caminho)
+    manifesto = _ler_manifesto(pasta)
+    if manifesto is None or manifesto.get("formato") != FORMATO or manifesto.get("tipo") != tipo:
+        return None
+    origem = manifesto["origem"]
+    if (origem["mtime_ns"], origem["tamanho"]) != tuple(chave_stat):
+        if origem["tamanho"] != chave_stat[1] or _hash_arquivo(caminho) != manifesto["versao"]:
+            return None
+
+    partes = []
+    try:
+        for bloco in manifesto["blocos"]:
+            valores = np.load(os.path.join(pasta, bloco["arquivo"]), mmap_mode="r", allow_pickle=False)
+            if valores.shape != (manifesto["linhas"], len(bloco["colunas"])):
+                return None
+            if valores.dtype.kind == "U":
+                valores = valores.astype(object)
+                if bloco.get("ausentes"):
+                    ausentes = np.load(os.path.join(pasta, bloco["ausentes"]), allow_pickle=False)
+                    if ausentes.shape != valores.shape:
+                        return None
+                    valores[ausentes] = np.nan
+            partes.append(pd.DataFrame(valores, columns=bloco["colunas"], copy=False))
+    except (OSError, ValueError):
+        return None
+    df = partes[0] if len(partes) == 1 else pd.concat(partes, axis=1, copy=False)
+
+    classe, campo = _TIPOS[tipo]
+    return manifesto["versao"], classe(df=df, versao=manifesto["versao"], **{campo: manifesto[campo]})
+
+
+def verificar(caminho: str) -> bool:
+    """Confere o hash de todos os blocos do snapshot (lê os arquivos inteiros)."""
+    pasta = pasta_snapshot(caminho)
+    manifesto = _ler_manifesto(pasta)
+    if manifesto is None:
+        return False
+    return all(
+        os.path.exists(os.path.join(pasta, b["arquivo"]))
+        and _hash_arquivo(os.path.join(pasta, b["arquivo"])) == b["sha256"]
+        and (not b.get("ausentes") or os.path.exists(os.path.join(pasta, b["ausentes"])))
+        for b in manifesto["blocos"]
+    )
+
+
+def compilar(caminho: str, tipo: str) -> str:
+    """Lê a planilha pelo caminho normal (Excel) e grava o snapshot dela."""
+    from setpoint import dados
+
+    caminho = os.path.abspath(caminho)
+    stat = os.stat(caminho)
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    tabela = dados._PARSERS[tipo](conteudo, hashlib.sha256(conteudo).hexdigest())
+    return salvar(tabela, tipo, caminho, (stat.st_mtime_ns, stat.st_size))
+
+
+def main(argv=None):
+    # Uso: python -m setpoint.snapshot [tabela_valvulas.xlsx] [maquinas.xlsx]
+    argv = sys.argv[1:] if argv is None else argv
+    valvulas = argv[0] if len(argv) > 0 else ARQUIVO_VALVULAS
+    maquinas = argv[1] if len(argv) > 1 else ARQUIVO_MAQUINAS
+    for caminho, tipo in ((valvulas, "valvulas"), (maquinas, "maquinas")):
+        t0 = time.perf_counter()
+        pasta = compilar(caminho, tipo)
+        print(f"{caminho} -> {pasta} ({time.perf_counter() - t0:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
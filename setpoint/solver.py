@@ -0,0 +1,131 @@
+# ----------------------------
+# Solver de ajuste interpolado (vazão -> Setting %)
+# ----------------------------
+# A curva Setting (%) x vazão de cada DN é invertida (setting em função da
+# vazão) e interpolada por partes. Os coeficientes de cada trecho são
+# calculados uma vez por tabela, no formato
+#     setting = y_k + c1_k*t + c2_k*t² + c3_k*t³,   t = vazão - x_k
+# e a consulta custa um np.searchsorted + um polinômio, vetorizado.
+#
+# Modos:
+#   "nearest" -> linha mais próxima da tabela (comportamento original)
+#   "linear"  -> interpolação linear
+#   "pchip"   -> cúbica monotônica de Fritsch-Carlson (não cria oscilações
+#                entre os pontos do fabricante)
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+from setpoint.rastreio import rastrear
+
+MODOS = ("nearest", "linear", "pchip")
+
+
+class SolucaoAjuste(NamedTuple):
+    ajuste: np.ndarray      # Setting (%)
+    vazao_lh: np.ndarray    # vazão esperada com esse ajuste
+    erro_lh: np.ndarray     # vazão esperada - vazão de projeto
+
+
+def _derivadas_pchip(h: np.ndarray, delta: np.ndarray) -> np.ndarray:
+    n = len(delta) + 1
+    d = np.zeros(n)
+    if n == 2:
+        d[:] = delta[0]
+        return d
+
+    # Pontos internos: média harmônica ponderada (zero em extremos locais)
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    mesmo_sinal = (delta[:-1] * delta[1:]) > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    d[1:-1] = np.where(mesmo_sinal, media, 0.0)
+
+    # Extremidades: fórmula de três pontos com preservação de forma
+    def borda(h0, h1, m0, m1):
+        dk = ((2 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+        if np.sign(dk) != np.sign(m0):
+            return 0.0
+        if np.sign(m0) != np.sign(m1) and abs(dk) > abs(3 * m0):
+            return 3 * m0
+        return dk
+
+    d[0] = borda(h[0], h[1], delta[0], delta[1])
+    d[-1] = borda(h[-1], h[-2], delta[-1], delta[-2])
+    return d
+
+
+class _Trechos:
+    __slots__ = ("x", "y", "c1", "c2", "c3")
+
+    def __init__(self, vazoes: np.ndarray, settings: np.ndarray, modo: str):
+        # Vazões repetidas não definem um setting único: fica a primeira
+        x, primeiro = np.unique(vazoes, return_index=True)
+        y = np.asarray(settings, dtype=float)[primeiro]
+        self.x = x
+        self.y = y
+        if len(x) < 2:
+            self.c1 = self.c2 = self.c3 = np.zeros(max(len(x) - 1, 0))
+            return
+
+        h = np.diff(x)
+        delta = np.diff(y) / h
+        if modo == "linear":
+            self.c1 = delta
+            self.c2 = np.zeros_like(delta)
+            self.c3 = np.zeros_like(delta)
+        else:
+            d = _derivadas_pchip(h, delta)
+            self.c1 = d[:-1]
+            self.c2 = (3 * delta - 2 * d[:-1] - d[1:]) / h
+            self.c3 = (d[:-1] + d[1:] - 2 * delta) / h ** 2
+
+    def avaliar(self, q: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Vazões fora da curva ficam presas na primeira/última linha
+        qc = np.clip(q, self.x[0], self.x[-1])
+        if len(self.x) < 2:
+            return np.full_like(qc, self.y[0]), qc
+        k = np.clip(np.searchsorted(self.x, qc, side="right") - 1, 0, len(self.x) - 2)
+        t = qc - self.x[k]
+        ajuste = self.y[k] + t * (self.c1[k] + t * (self.c2[k] + t * self.c3[k]))
+        return ajuste, qc
+
+
+class SettingSolver:
+    def __init__(self, indice):
+        self.indice = indice
+        self._trechos: dict[tuple[str, str], _Trechos] = {}
+        for dn in indice.dn_options:
+            vazoes, settings = indice.curva(dn)
+            if len(vazoes) == 0:
+                continue
+            for modo in ("linear", "pchip"):
+                self._trechos[(dn, modo)] = _Trechos(vazoes, settings, modo)
+
+    @rastrear()
+    def resolver(self, dn: str, vazoes_lh, modo: str = "nearest") -> SolucaoAjuste:
+        """Ajuste, vazão esperada e erro para cada vazão de projeto (L/h)."""
+        if modo not in MODOS:
+            raise ValueError(f"Modo de ajuste inválido: {modo!r}. Use um de {MODOS}.")
+        if dn not in self.indice:
+            raise ValueError(f"DN não encontrado na tabela de válvulas: {dn!r}")
+        q = np.asarray(vazoes_lh, dtype=float)
+
+        if modo == "nearest":
+            linhas = self.indice.nearest_rows(dn, q)
+            ajuste = self.indice.settings[linhas].astype(float)
+            vazao = self.indice.flows_at_rows(dn, linhas)
+        else:
+            trechos = self._trechos.get((dn, modo))
+            if trechos is None:
+                # Mesmo erro do índice no modo "nearest"
+                raise ValueError(f"A coluna {dn!r} não possui vazões numéricas.")
+            ajuste, vazao = trechos.avaliar(q)
+        return SolucaoAjuste(ajuste, vazao, vazao - q)
+
+    def resolver_um(self, dn: str, vazao_lh: float, modo: str = "nearest") -> tuple[float, float, float]:
+        ajuste, vazao, erro = self.resolver(dn, [vazao_lh], modo)
+        return float(ajuste[0]), float(vazao[0]), float(erro[0])
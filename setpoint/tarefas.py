@@ -0,0 +1,246 @@
+# ----------------------------
+# Fila de relatórios em segundo plano com cache de resultados
+# ----------------------------
+# A geração do PDF (gráfico + layout reportlab) leva segundos. Aqui ela roda
+# num pool de threads do processo, fora da thread da sessão, e o resultado
+# fica num cache LRU compartilhado entre sessões: pedidos idênticos (mesma
+# chave) de usuários diferentes reaproveitam o mesmo PDF ou a mesma tarefa
+# em andamento.
+# Com SETPOINT_MODO_TAREFAS=processos a geração roda num ProcessPoolExecutor:
+# PDF/Excel de um usuário deixam de disputar o GIL com as sessões. As funções
+# precisam ser picklable (ver setpoint.trabalhos, que passa as tabelas por
+# referência) e o progresso volta por uma fila multiprocessing. Pedidos além
+# de SETPOINT_FILA_MAX tarefas pendentes são recusados com FilaCheia.
+from __future__ import annotations
+
+import hashlib
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Hashable
+
+MODO_THREADS = "threads"
+MODO_PROCESSOS = "processos"
+
+
+class FilaCheia(RuntimeError):
+    """Pendências demais na fila; o pedido deve ser refeito mais tarde."""
+
+
+class Tarefa:
+    """Uma geração em andamento ou concluída, com progresso observável."""
+
+    def __init__(self, chave: Hashable):
+        self.chave = chave
+        self.future: Future = Future()
+        self.fracao = 0.0
+        self.etapa = "Na fila"
+
+    def atualizar(self, fracao: float, etapa: str) -> None:
+        self.fracao = fracao
+        self.etapa = etapa
+
+    @property
+    def concluida(self) -> bool:
+        return self.future.done()
+
+    def resultado(self, timeout: float | None = None):
+        return self.future.result(timeout)
+
+
+# ----------------------------
+# Lado do processo de trabalho
+# ----------------------------
+_fila_progresso = None
+
+
+def _iniciar_processo(fila_progresso) -> None:
+    global _fila_progresso
+    _fila_progresso = fila_progresso
+
+
+def em_processo_de_trabalho() -> bool:
+    return _fila_progresso is not None
+
+
+def _enviar_progresso(id_tarefa: int, fracao: float, etapa: str) -> None:
+    _fila_progresso.put((id_tarefa, fracao, etapa))
+
+
+def _executar_no_processo(id_tarefa: int, funcao: Callable, args: tuple, kwargs: dict):
+    return funcao(*args, progresso=partial(_enviar_progresso, id_tarefa), **kwargs)
+
+
+class FilaTarefas:
+    def __init__(self, max_workers: int = 2, max_resultados: int = 64, modo: str = MODO_THREADS,
+                 max_pendentes: int | None = None):
+        self.modo = modo
+        self.max_workers = max_workers
+        self._max_resultados = max_resultados
+        self._max_pendentes = max_pendentes
+        self._tarefas: OrderedDict[Hashable, Tarefa] = OrderedDict()
+        self._lock = threading.Lock()
+        if modo == MODO_PROCESSOS:
+            # forkserver: não herda as threads do servidor (fork de processo
+            # com threads pode travar); spawn onde não houver
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+            self._progresso = contexto.Queue()
+            self._por_id: dict[int, Tarefa] = {}
+            self._ids = itertools.count()
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto,
+                                             initializer=_iniciar_processo, initargs=(self._progresso,))
+            threading.Thread(target=self._receber_progresso, name="setpoint-progresso", daemon=True).start()
+        elif modo == MODO_THREADS:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="setpoint-tarefas")
+        else:
+            raise ValueError(f"Modo de tarefas inválido: {modo!r}. Use {MODO_THREADS!r} ou {MODO_PROCESSOS!r}.")
+
+    def pendentes(self) -> int:
+        with self._lock:
+            return sum(not t.concluida for t in self._tarefas.values())
+
+    def solicitar(self, chave: Hashable, funcao: Callable, *args, **kwargs) -> Tarefa:
+        """Tarefa para `chave`; só agenda `funcao` se ainda não houver uma.
+
+        `funcao` recebe `progresso=tarefa.atualizar` além dos argumentos.
+        Levanta FilaCheia se já houver `max_pendentes` tarefas em andamento.
+        """
+        with self._lock:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is not None and not self._falhou(tarefa):
+                self._tarefas.move_to_end(chave)
+                return tarefa
+            if self._max_pendentes is not None:
+                if sum(not t.concluida for t in self._tarefas.values()) >= self._max_pendentes:
+                    raise FilaCheia(f"{self._max_pendentes} tarefas na fila; tente novamente em instantes.")
+
+            tarefa = Tarefa(chave)
+            self._tarefas[chave] = tarefa
+            self._descartar_antigas()
+
+        if self.modo == MODO_PROCESSOS:
+            self._agendar_em_processo(tarefa, funcao, args, kwargs)
+            return tarefa
+
+        def executar():
+            if not tarefa.future.set_running_or_notify_cancel():
+                return
+            try:
+                tarefa.future.set_result(funcao(*args, progresso=tarefa.atualizar, **kwargs))
+            except BaseException as erro:
+                tarefa.atualizar(tarefa.fracao, "Falhou")
+                tarefa.future.set_exception(erro)
+
+        self._pool.submit(executar)
+        return tarefa
+
+    def _agendar_em_processo(self, tarefa: Tarefa, funcao: Callable, args: tuple, kwargs: dict) -> None:
+        id_tarefa = next(self._ids)
+        with self._lock:
+            self._por_id[id_tarefa] = tarefa
+        tarefa.future.set_running_or_notify_cancel()
+
+        def concluir(future: Future):
+            with self._lock:
+                self._por_id.pop(id_tarefa, None)
+            erro = future.exception()
+            if erro is None:
+                tarefa.future.set_result(future.result())
+            else:
+                tarefa.atualizar(tarefa.fracao, "Falhou")
+                tarefa.future.set_exception(erro)
+
+        try:
+            future = self._pool.submit(_executar_no_processo, id_tarefa, funcao, args, kwargs)
+        except Exception as erro:   # pool quebrado, argumentos não picklable...
+            with self._lock:
+                self._por_id.pop(id_tarefa, None)
+            tarefa.atualizar(0.0, "Falhou")
+            tarefa.future.set_exception(erro)
+            return
+        future.add_done_callback(concluir)
+
+    def _receber_progresso(self) -> None:
+        while True:
+            try:
+                id_tarefa, fracao, etapa = self._progresso.get()
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                tarefa = self._por_id.get(id_tarefa)
+            if tarefa is not None and not tarefa.concluida:
+                tarefa.atualizar(fracao, etapa)
+
+    def obter(self, chave: Hashable) -> Tarefa | None:
+        with self._lock:
+            return self._tarefas.get(chave)
+
+    @staticmethod
+    def _falhou(tarefa: Tarefa) -> bool:
+        return tarefa.concluida and tarefa.future.exception() is not None
+
+    def _descartar_antigas(self) -> None:
+        # Só resultados concluídos saem do cache; tarefas em andamento ficam.
+        # Resultado em disco (caminho str, exportações em lote) sai junto.
+        excesso = len(self._tarefas) - self._max_resultados
+        for chave in [c for c, t in self._tarefas.items() if t.concluida][:max(excesso, 0)]:
+            tarefa = self._tarefas.pop(chave)
+            if not self._falhou(tarefa) and isinstance(tarefa.resultado(), str):
+                try:
+                    os.remove(tarefa.resultado())
+                except OSError:
+                    pass
+
+
+_fila_relatorios: FilaTarefas | None = None
+_fila_lock = threading.Lock()
+
+
+def configuracao_ambiente() -> dict:
+    """Parâmetros da fila pelas variáveis de ambiente (modo, trabalhadores, limite)."""
+    modo = os.environ.get("SETPOINT_MODO_TAREFAS", MODO_THREADS).strip().lower()
+    padrao_workers = (os.cpu_count() or 2) if modo == MODO_PROCESSOS else 2
+    max_workers = int(os.environ.get("SETPOINT_TRABALHADORES", padrao_workers))
+    max_pendentes = int(os.environ.get("SETPOINT_FILA_MAX", 4 * max_workers))
+    return {"modo": modo, "max_workers": max_workers, "max_pendentes": max_pendentes or None}
+
+
+def fila_relatorios(criar: bool = True) -> FilaTarefas | None:
+    """Fila única por processo, compartilhada por todas as sessões.
+
+    Com `criar=False` devolve None enquanto ninguém tiver usado a fila, sem
+    criar o pool (no modo processos, sem subir trabalhadores).
+    """
+    global _fila_relatorios
+    with _fila_lock:
+        if _fila_relatorios is None:
+            if not criar:
+                return None
+            _fila_relatorios = FilaTarefas(**configuracao_ambiente())
+        return _fila_relatorios
+
+
+def chave_relatorio(dn_list, ajuste, vazao_lh, observacao, versao_tabela) -> tuple:
+    return (
+        tuple(dn_list),
+        None if ajuste is None else float(ajuste),
+        None if vazao_lh is None else float(vazao_lh),
+        observacao or "",
+        versao_tabela,
+    )
+
+
+def arquivo_resultado(chave: Hashable, extensao: str, pasta: str | None = None) -> str:
+    """Caminho do arquivo de uma tarefa, derivado da chave inteira.
+
+    Chaves diferentes nunca gravam no mesmo arquivo; a mesma chave cai sempre
+    no mesmo (e a fila devolve a tarefa já existente).
+    """
+    digest = hashlib.sha256(repr(chave).encode("utf-8")).hexdigest()[:24]
+    return os.path.join(pasta or tempfile.gettempdir(), f"setpoint_{digest}.{extensao}")
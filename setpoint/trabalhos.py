@@ -0,0 +1,60 @@
+# ----------------------------
+# Trabalhos da fila de relatórios (PDF/Excel) com a tabela por referência
+# ----------------------------
+# Funções de módulo (picklable) para FilaTarefas, nos dois modos. A tabela de
+# válvulas não vai junto da tarefa: vai só o caminho (RefTabela) e quem
+# executa abre a tabela pelo cache de setpoint.dados. Numa thread isso é o
+# mesmo objeto já carregado; num processo de trabalho é o snapshot .npy em
+# mmap (compilado na primeira vez se não existir), então as páginas da
+# tabela são compartilhadas pelo cache do sistema entre todos os processos.
+from __future__ import annotations
+
+import os
+from typing import NamedTuple
+
+from setpoint import snapshot
+from setpoint.dados import carregar_tabela_valvulas
+from setpoint.tarefas import em_processo_de_trabalho
+
+
+class RefTabela(NamedTuple):
+    caminho: str    # quem executa abre a versão atual do arquivo
+
+
+def _sem_progresso(fracao: float, etapa: str) -> None:
+    pass
+
+
+def ref_tabela(caminho: str) -> RefTabela:
+    # Mesmo caminho que a página usou: no modo threads cai na mesma entrada do cache
+    return RefTabela(caminho)
+
+
+def _abrir(ref: RefTabela):
+    if em_processo_de_trabalho() and not os.path.isdir(snapshot.pasta_snapshot(ref.caminho)):
+        try:
+            snapshot.compilar(ref.caminho, "valvulas")
+        except OSError:
+            pass    # sem permissão de escrita: este processo lê o Excel uma vez
+    return carregar_tabela_valvulas(ref.caminho)
+
+
+def pdf_premium(ref: RefTabela, dn_list, observacao, ajuste=None, vazao_lh=None, progresso=_sem_progresso):
+    from setpoint.relatorio import gerar_pdf_premium
+
+    tabela = _abrir(ref)
+    return gerar_pdf_premium(dn_list, tabela.df, observacao, ajuste, vazao_lh, indice=tabela.indice,
+                             progresso=progresso)
+
+
+def pdf_lote(ref: RefTabela, itens, destino: str, formato: str = "pdf", progresso=_sem_progresso):
+    from setpoint.relatorio import gerar_pdf_lote
+
+    tabela = _abrir(ref)
+    return gerar_pdf_lote(itens, tabela.df, destino, formato, indice=tabela.indice, progresso=progresso)
+
+
+def excel_lote(ref: RefTabela, df_lote, destino: str, modo: str = "nearest", progresso=_sem_progresso):
+    from setpoint.exportacao import gerar_excel_lote
+
+    return gerar_excel_lote(df_lote, _abrir(ref).df, destino, modo, progresso=progresso)
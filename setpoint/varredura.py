@@ -0,0 +1,72 @@
+# ----------------------------
+# Varredura capacidade × ΔT × diâmetro interno (NumPy broadcast)
+# ----------------------------
+# O Flow Dashboard calcula um cenário por rerun. Para revisões de projeto a
+# grade inteira (todas as capacidades, vários ΔT, catálogo de tubos) é
+# avaliada de uma vez: cada eixo vira uma dimensão do array e as funções de
+# setpoint.fluxo, que já aceitam arrays, fazem o broadcast. O status
+# 🔴/🟢/🟠 sai de codigo_faixa, sem laço em Python.
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from setpoint.dados import COLUNA_CAPACIDADE
+from setpoint.fluxo import STATUS, codigo_faixa, cp, faixa, rho, vazao_por_capacidade, vazao_tubo
+from setpoint.hidraulica import CATALOGO_TUBOS
+from setpoint.rastreio import rastrear
+
+DELTAS_T = (4.0, 5.0, 5.5, 6.0, 7.0)
+
+COLUNA_DELTA_T = "ΔT (K)"
+COLUNA_DIAMETRO = "Diâmetro interno (mm)"
+COLUNA_VAZAO_MAQUINA = "Vazão máquina (L/h)"
+COLUNA_MIN = "Mín (L/h)"
+COLUNA_MAX = "Máx (L/h)"
+COLUNA_VAZAO_TUBO = "Vazão no tubo (L/h)"
+COLUNA_VELOCIDADE = "Velocidade necessária (m/s)"
+COLUNA_STATUS = "Status"
+
+
+@rastrear()
+def varrer(capacidades_btu, deltas_T=DELTAS_T, diametros_mm=tuple(CATALOGO_TUBOS.values()),
+           velocidade: float = 1.0, cp=cp, rho=rho, faixa=faixa) -> pd.DataFrame:
+    """Tabela "tidy" com um cenário por linha (capacidade, ΔT, diâmetro).
+
+    Vazão no tubo = diâmetro × `velocidade`, comparada com a faixa da
+    máquina (🔴 abaixo / 🟢 dentro / 🟠 acima); velocidade necessária é a
+    que o tubo precisaria para levar a vazão de projeto.
+    """
+    caps = np.asarray(capacidades_btu, dtype=float)[:, None, None]
+    dts = np.asarray(deltas_T, dtype=float)[None, :, None]
+    diams = np.asarray(diametros_mm, dtype=float)[None, None, :]
+    forma = (caps.shape[0], dts.shape[1], diams.shape[2])
+
+    maquina = vazao_por_capacidade(caps, cp=cp, delta_T=dts, rho=rho, faixa=faixa)   # (c, t, 1)
+    tubo = vazao_tubo(diams, velocidade)                                              # (1, 1, d)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocidade_necessaria = maquina.q_m3_s / tubo.area                             # (c, t, d)
+    codigos = codigo_faixa(tubo.vazao_lh, maquina.limite_min_lh, maquina.limite_max_lh)
+
+    def coluna(a):
+        return np.broadcast_to(a, forma).ravel()
+
+    return pd.DataFrame({
+        COLUNA_CAPACIDADE: coluna(caps),
+        COLUNA_DELTA_T: coluna(dts),
+        COLUNA_DIAMETRO: coluna(diams),
+        COLUNA_VAZAO_MAQUINA: coluna(maquina.q_l_h),
+        COLUNA_MIN: coluna(maquina.limite_min_lh),
+        COLUNA_MAX: coluna(maquina.limite_max_lh),
+        COLUNA_VAZAO_TUBO: coluna(tubo.vazao_lh),
+        COLUNA_VELOCIDADE: coluna(velocidade_necessaria),
+        COLUNA_STATUS: pd.Categorical.from_codes(coluna(codigos), STATUS),
+    })
+
+
+def matriz_heatmap(df: pd.DataFrame, delta_T: float, valor: str = COLUNA_VELOCIDADE) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(valores, status) de um ΔT, com capacidades nas linhas e diâmetros nas colunas."""
+    fatia = df[df[COLUNA_DELTA_T] == delta_T]
+    valores = fatia.pivot(index=COLUNA_CAPACIDADE, columns=COLUNA_DIAMETRO, values=valor)
+    status = fatia.pivot(index=COLUNA_CAPACIDADE, columns=COLUNA_DIAMETRO, values=COLUNA_STATUS)
+    return valores, status.astype(str)
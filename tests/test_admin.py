@@ -0,0 +1,27 @@
+from setpoint import admin
+
+
+def test_sem_configuracao_fica_desligado(monkeypatch):
+    monkeypatch.delenv(admin.VARIAVEL_SENHA, raising=False)
+    monkeypatch.delenv(admin.VARIAVEL_LIVRE, raising=False)
+    assert not admin.liberado_para_todos()
+    assert not admin.senha_configurada()
+    assert not admin.senha_confere("")
+    assert not admin.senha_confere("1")
+
+
+def test_senha_configurada(monkeypatch):
+    monkeypatch.setenv(admin.VARIAVEL_SENHA, "s3gr3d0")
+    monkeypatch.delenv(admin.VARIAVEL_LIVRE, raising=False)
+    assert admin.senha_configurada()
+    assert admin.senha_confere("s3gr3d0")
+    assert not admin.senha_confere("s3gr3d")
+    assert not admin.senha_confere(None)
+    assert not admin.liberado_para_todos()
+
+
+def test_liberado_para_todos(monkeypatch):
+    monkeypatch.setenv(admin.VARIAVEL_LIVRE, "1")
+    assert admin.liberado_para_todos()
+    monkeypatch.setenv(admin.VARIAVEL_LIVRE, "0")
+    assert not admin.liberado_para_todos()
@@ -0,0 +1,41 @@
+import base64
+import os
+
+import pytest
+
+from setpoint import assets
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGO = os.path.join(RAIZ, "maquina.png")
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    assets._cache.clear()
+    yield
+    assets._cache.clear()
+
+
+def test_url_estatica_grava_em_static(tmp_path):
+    url = assets.url_asset(LOGO, largura=40, pasta=str(tmp_path))
+    assert url.startswith(f"{assets.URL_STATIC}/maquina_w40_")
+    assert os.listdir(tmp_path) == [url.rsplit("/", 1)[1]]
+
+
+def test_pasta_impossivel_cai_para_data_uri(tmp_path):
+    arquivo = tmp_path / "nao_e_pasta"
+    arquivo.write_bytes(b"")
+    url = assets.url_asset(LOGO, largura=40, pasta=str(arquivo / "static"))
+    assert url.startswith("data:image/png;base64,")
+    assert base64.b64decode(url.split(",", 1)[1]).startswith(b"\x89PNG")
+    assert assets.data_uri_asset(LOGO, largura=40, pasta=str(arquivo / "static")) == url
+
+
+def test_falha_na_gravacao_remove_temporario(tmp_path, monkeypatch):
+    def replace_falha(origem, destino):
+        raise PermissionError(13, "Read-only file system")
+
+    monkeypatch.setattr(assets.os, "replace", replace_falha)
+    url = assets.url_asset(LOGO, altura=30, pasta=str(tmp_path))
+    assert url.startswith("data:image/png;base64,")
+    assert os.listdir(tmp_path) == []
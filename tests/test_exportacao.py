@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from setpoint.dados import COLUNA_SETTING, TabelaValvulas
+from setpoint.exportacao import excel_resultado
+
+DN = "DN20 (L/h)"
+
+
+def _tabela():
+    settings = np.arange(10, 101, 10)
+    df = pd.DataFrame({COLUNA_SETTING: settings, "DN15 (L/h)": settings * 2.0, DN: settings * 6.0})
+    return TabelaValvulas(df=df, dn_options=["DN15 (L/h)", DN], versao="teste")
+
+
+def _celulas_destacadas(conteudo: bytes) -> list[tuple[int, int]]:
+    ws = load_workbook(BytesIO(conteudo))["Tabela"]
+    return [(c.row, c.column) for linha in ws.iter_rows() for c in linha
+            if c.fill.fgColor.rgb not in (None, "00000000") and c.row > 1]
+
+
+def test_modo_interpolado_destaca_a_linha_mais_proxima():
+    tabela = _tabela()
+    ajuste, vazao, _ = tabela.solver.resolver_um(DN, 250.0, "linear")
+    ajuste = round(ajuste, 1)
+    assert ajuste not in tabela.df[COLUNA_SETTING].tolist()    # 41.7: nenhum Setting da tabela
+
+    linha = tabela.indice.nearest_row(DN, vazao)
+    conteudo = excel_resultado(tabela.df, DN, 250.0, ajuste, vazao, "linear", linha)
+
+    assert linha == 3                                            # 240 L/h, Setting 40
+    assert _celulas_destacadas(conteudo) == [(linha + 2, 3)]    # cabeçalho na linha 1, DN na coluna C
+
+
+def test_sem_linha_nao_destaca():
+    tabela = _tabela()
+    conteudo = excel_resultado(tabela.df, DN, 240.0, 40, 240.0, "nearest")
+    assert _celulas_destacadas(conteudo) == []
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from setpoint.hidraulica import (
+    ACIMA_DO_CATALOGO,
+    COLUNA_COMPRIMENTO,
+    COLUNA_DIAMETRO,
+    COLUNA_TRECHO,
+    COLUNA_VAZAO_M3H,
+    calcular_prumada,
+    tubo_nominal,
+)
+
+
+def test_tubo_nominal_menor_bitola_que_atende():
+    assert tubo_nominal(15.8) == '1/2"'
+    assert tubo_nominal(15.9) == '3/4"'
+    assert tubo_nominal(102.3) == '4"'
+    assert tubo_nominal(1.0) == '1/2"'
+
+
+def test_tubo_nominal_acima_do_catalogo():
+    assert tubo_nominal(102.4) == ACIMA_DO_CATALOGO
+    assert tubo_nominal(float("nan")) is None
+    assert tubo_nominal(np.array([50.0, 150.0, np.nan])).tolist() == ['2"', ACIMA_DO_CATALOGO, None]
+
+
+def test_prumada_marca_trecho_acima_do_catalogo():
+    trechos = pd.DataFrame({
+        COLUNA_TRECHO: ["T1", "T2"],
+        COLUNA_VAZAO_M3H: [1.1, 60.0],     # 60 m³/h a 1 m/s pedem ~146 mm
+        COLUNA_DIAMETRO: [26.6, 102.3],
+        COLUNA_COMPRIMENTO: [3.0, 3.0],
+    })
+    resultado = calcular_prumada(trechos, rho=1000.0, mu=1.3e-3)
+    assert resultado["Bitola sugerida"].tolist() == ['3/4"', ACIMA_DO_CATALOGO]
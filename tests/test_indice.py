@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from setpoint.dados import COLUNA_SETTING
+from setpoint.indice import ValveCurveIndex
+
+
+def _linha_idxmin(df, dn, vazao):
+    # Busca usada antes do índice: primeira linha de menor distância
+    return (df[dn] - vazao).abs().idxmin()
+
+
+@pytest.fixture
+def df_empates():
+    return pd.DataFrame({
+        COLUNA_SETTING: [10, 20, 30, 40, 50, 60, 70],
+        # vazões repetidas fora de ordem e vizinhos equidistantes
+        "DN15": [300.0, 100.0, 200.0, 100.0, 300.0, np.nan, 200.0],
+        "DN20": [400.0, 200.0, 600.0, 800.0, 200.0, 1000.0, 600.0],
+    })
+
+
+def test_empates_mantem_primeira_linha_como_idxmin(df_empates):
+    indice = ValveCurveIndex.from_frame(df_empates)
+    consultas = np.arange(0.0, 1201.0, 25.0)
+    for dn in ("DN15", "DN20"):
+        esperadas = [_linha_idxmin(df_empates, dn, q) for q in consultas]
+        np.testing.assert_array_equal(indice.nearest_rows(dn, consultas), esperadas)
+
+
+def test_vizinhos_equidistantes(df_empates):
+    indice = ValveCurveIndex.from_frame(df_empates)
+    # 150 fica a 50 de 100 (linhas 1 e 3) e de 200 (linhas 2 e 6): vale a linha 1
+    assert indice.nearest_row("DN15", 150.0) == _linha_idxmin(df_empates, "DN15", 150.0) == 1
+    # 500 fica a 100 de 400 (linha 0) e de 600 (linhas 2 e 6): vale a linha 0
+    assert indice.nearest_row("DN20", 500.0) == _linha_idxmin(df_empates, "DN20", 500.0) == 0
+    assert indice.nearest("DN20", 500.0) == (10, 400.0)
+
+
+def test_tabela_aleatoria_com_repeticoes():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        COLUNA_SETTING: np.arange(100),
+        "DN25": rng.integers(0, 30, 100).astype(float) * 10,
+    })
+    indice = ValveCurveIndex.from_frame(df)
+    consultas = rng.integers(-10, 320, 500).astype(float)
+    esperadas = [_linha_idxmin(df, "DN25", q) for q in consultas]
+    np.testing.assert_array_equal(indice.nearest_rows("DN25", consultas), esperadas)
@@ -0,0 +1,42 @@
+import io
+import re
+import warnings
+
+import pandas as pd
+import pytest
+
+from setpoint.dados import COLUNA_CAPACIDADE
+from setpoint.lote import COLUNA_UNIDADE, COLUNA_VAZAO_M3H, assinatura_lote, ler_planilha_unidades
+
+
+def test_ler_planilha_sem_settingwithcopy():
+    csv = io.StringIO("Tag;Capacidade (Btu/h);Vazão projeto (m³/h);Obs\nA;9000;0,5;x\nB;12000;abc;y\n")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        df = ler_planilha_unidades(csv, "unidades.csv")
+    assert list(df.columns) == [COLUNA_UNIDADE, COLUNA_CAPACIDADE, COLUNA_VAZAO_M3H]
+    assert df[COLUNA_CAPACIDADE].tolist() == [9000, 12000]
+    assert df[COLUNA_VAZAO_M3H].isna().all()   # "0,5" e "abc" não são números
+
+
+def test_assinatura_lote_depende_da_ordem_das_linhas():
+    df = pd.DataFrame({COLUNA_UNIDADE: ["A", "B"], "Ajuste (%)": [40.0, 60.0]})
+    assert assinatura_lote(df) == assinatura_lote(df.copy())
+    assert assinatura_lote(df) != assinatura_lote(df.iloc[::-1].reset_index(drop=True))
+    trocado = df.assign(**{"Ajuste (%)": [60.0, 40.0]})
+    assert assinatura_lote(df) != assinatura_lote(trocado)
+
+
+@pytest.mark.parametrize("conteudo, mensagem", [
+    ("Unidade;Capacidade;Vazão\nA;9000;0.5\n;12000;0.7\n", "vazia em 1 linha(s) da planilha: 3"),
+    ("Unidade;Capacidade;Vazão\nA;9000;0.5\n  ;12000;0.7\n", "vazia"),
+    ("Unidade;Capacidade;Vazão\nA;9000;0.5\nB;12000;0.7\nA ;16000;0.9\n", "repetidas na planilha: 'A' (linhas 2, 4)"),
+])
+def test_unidades_vazias_ou_repetidas(conteudo, mensagem):
+    with pytest.raises(ValueError, match=re.escape(mensagem)):
+        ler_planilha_unidades(io.StringIO(conteudo), "unidades.csv")
+
+
+def test_unidades_numericas_viram_texto():
+    df = ler_planilha_unidades(io.StringIO("Unidade;Capacidade;Vazão\n101;9000;0.5\n102;12000;0.7\n"), "u.csv")
+    assert df[COLUNA_UNIDADE].tolist() == ["101", "102"]
@@ -0,0 +1,18 @@
+from setpoint import tarefas
+from setpoint.memoria import caches_compartilhados
+
+
+def test_caches_nao_criam_a_fila_de_relatorios(monkeypatch):
+    monkeypatch.setattr(tarefas, "_fila_relatorios", None)
+    uso = {c.nome: c for c in caches_compartilhados()}
+    assert tarefas._fila_relatorios is None
+    assert uso["Relatórios (fila)"].itens == 0
+
+
+def test_caches_contam_a_fila_existente(monkeypatch):
+    fila = tarefas.FilaTarefas(max_workers=1)
+    monkeypatch.setattr(tarefas, "_fila_relatorios", fila)
+    fila.solicitar("a", lambda progresso: b"x" * 1000).resultado(timeout=5)
+    uso = {c.nome: c for c in caches_compartilhados()}
+    assert uso["Relatórios (fila)"].itens == 1
+    assert uso["Relatórios (fila)"].bytes_memoria >= 1000
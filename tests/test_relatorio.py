@@ -0,0 +1,10 @@
+import pytest
+
+from setpoint.relatorio import MAX_ITENS_DOCUMENTO, ItemRelatorio, gerar_pdf_lote
+
+
+def test_documento_unico_limitado(tmp_path):
+    itens = [ItemRelatorio(f"Válvula {i}", ["DN15"], None, None) for i in range(MAX_ITENS_DOCUMENTO + 1)]
+    with pytest.raises(ValueError, match="zip"):
+        gerar_pdf_lote(itens, None, str(tmp_path / "projeto.pdf"), "pdf")
+    assert not (tmp_path / "projeto.pdf").exists()
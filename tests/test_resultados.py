@@ -0,0 +1,234 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from setpoint import resultados
+from setpoint.dados import COLUNA_CAPACIDADE, COLUNA_SETTING, TabelaValvulas
+from setpoint.lote import COLUNA_UNIDADE, COLUNA_VAZAO_M3H, dimensionar_lote
+from setpoint.resultados import ArmazemResultados, armazem_resultados
+from setpoint.selecao import ResolvedorDN
+
+
+@pytest.fixture
+def arquivo(tmp_path, monkeypatch):
+    caminho = tmp_path / "resultados.sqlite"
+    monkeypatch.setattr(resultados, "ARQUIVO_RESULTADOS", str(caminho))
+    monkeypatch.setattr(resultados, "_armazem", None)
+    return caminho
+
+
+def test_armazem_nao_e_criado_sem_projeto_salvo(arquivo):
+    assert armazem_resultados(criar=False) is None
+    assert not arquivo.exists()
+    armazem = armazem_resultados()
+    assert arquivo.exists()
+    assert armazem_resultados(criar=False) is armazem
+    assert armazem.projetos().empty
+
+
+def test_pasta_inacessivel_levanta_sqlite_error(tmp_path):
+    with pytest.raises(sqlite3.Error):
+        ArmazemResultados(str(tmp_path / "nao_existe" / "resultados.sqlite"))
+
+
+# ----------------------------
+# Redimensionamento incremental
+# ----------------------------
+SETTINGS = np.arange(10, 101, 10)
+CURVAS = {
+    "DN15 (L/h)": SETTINGS * 2.0,
+    "DN20 HF (L/h)": SETTINGS * 6.0,
+    "DN32 (L/h)": SETTINGS * 15.0,
+}
+RESOLVEDOR = ResolvedorDN({12000: "DN 15", 24000: "DN 20 HF", 36000: "DN 32", 48000: "DN 40"})
+
+
+def _tabela(versao, curvas=CURVAS, settings=SETTINGS):
+    df = pd.DataFrame({COLUNA_SETTING: settings, **curvas})
+    return TabelaValvulas(df=df, dn_options=list(curvas), versao=versao)
+
+
+def _unidades():
+    # 3 unidades por DN, uma capacidade sem coluna na v1 (DN 40) e uma acima da maior máquina
+    capacidades = [12000, 12000, 12000, 24000, 24000, 24000, 36000, 36000, 36000, 48000, 48000, 60000]
+    return pd.DataFrame({
+        COLUNA_UNIDADE: [f"FC-{i:02d}" for i in range(len(capacidades))],
+        COLUNA_CAPACIDADE: capacidades,
+        COLUNA_VAZAO_M3H: [0.05, 0.11, 0.19, 0.12, 0.35, 0.55, 0.4, 0.9, 1.41, 0.3, 0.7, 0.5],
+    })
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return ArmazemResultados(str(tmp_path / "resultados.sqlite"))
+
+
+def _salvar(armazem, tabela, modo="linear", automatico=True, unidades=None):
+    df_lote = dimensionar_lote(_unidades() if unidades is None else unidades, tabela, modo, RESOLVEDOR)
+    armazem.salvar_lote("obra", df_lote, tabela, modo, automatico)
+    return df_lote
+
+
+def _conferir_com_lote_novo(armazem, tabela, modo="linear"):
+    # O projeto revalidado tem de ficar igual a um dimensionamento do zero
+    esperado = dimensionar_lote(_unidades(), tabela, modo, RESOLVEDOR)
+    obtido = armazem.carregar("obra")
+    assert obtido["DN"].tolist() == esperado["DN"].tolist()
+    np.testing.assert_allclose(obtido["Ajuste (%)"], esperado["Ajuste (%)"])
+    np.testing.assert_allclose(obtido["Vazão ajustada (L/h)"], esperado["Vazão ajustada (L/h)"])
+
+
+def _linhas_alteracoes(armazem):
+    with sqlite3.connect(armazem.caminho) as con:
+        return con.execute("SELECT unidade, versao_anterior, versao_nova FROM alteracoes ORDER BY id").fetchall()
+
+
+def test_so_o_dn_alterado_e_redimensionado(armazem):
+    v1 = _tabela("v1")
+    antes = _salvar(armazem, v1)
+    curvas = dict(CURVAS, **{"DN20 HF (L/h)": CURVAS["DN20 HF (L/h)"].copy()})
+    curvas["DN20 HF (L/h)"][3:] *= 1.1    # só a parte alta da curva
+    v2 = _tabela("v2", curvas)
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    assert list(r.diferenca.linhas_alteradas) == ["DN20 HF (L/h)"]
+    np.testing.assert_array_equal(r.diferenca.linhas_alteradas["DN20 HF (L/h)"], np.arange(3, 10))
+    assert not (r.diferenca.dns_novos or r.diferenca.dns_removidos or r.diferenca.settings_alterados)
+    # FC-03 (120 L/h) está no DN20 HF, mas abaixo do vizinho da primeira linha alterada
+    assert r.reavaliadas == 2
+    assert set(r.alteracoes[COLUNA_UNIDADE]) == {"FC-04", "FC-05"}
+    assert [u for u, _, _ in _linhas_alteracoes(armazem)] == r.alteracoes[COLUNA_UNIDADE].tolist()
+    assert all((va, vn) == ("v1", "v2") for _, va, vn in _linhas_alteracoes(armazem))
+
+    depois = armazem.carregar("obra")
+    outras = ~depois[COLUNA_UNIDADE].isin(["FC-04", "FC-05"])
+    pd.testing.assert_series_equal(depois.loc[outras, "Ajuste (%)"], antes.loc[outras, "Ajuste (%)"])
+    _conferir_com_lote_novo(armazem, v2)
+    assert armazem.projetos()["versao"].tolist() == ["v2"]
+    assert armazem.revalidar("obra", v2, RESOLVEDOR).diferenca is None
+
+
+def test_dn_novo_atende_unidades_sem_dn(armazem):
+    antes = _salvar(armazem, _tabela("v1"))
+    assert antes["DN"].isna().tolist() == [False] * 9 + [True] * 3
+    v2 = _tabela("v2", dict(CURVAS, **{"DN40 (L/h)": SETTINGS * 25.0}))
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    assert r.diferenca.dns_novos == ["DN40 (L/h)"]
+    assert r.reavaliadas == 2                 # a de 60000 continua sem DN e nem é lida
+    assert set(r.alteracoes[COLUNA_UNIDADE]) == {"FC-09", "FC-10"}
+    assert r.alteracoes["DN anterior"].isna().all()
+    assert (r.alteracoes["DN"] == "DN40 (L/h)").all()
+    _conferir_com_lote_novo(armazem, v2)
+
+
+def test_dn_removido(armazem):
+    _salvar(armazem, _tabela("v1"))
+    v2 = _tabela("v2", {dn: c for dn, c in CURVAS.items() if dn != "DN32 (L/h)"})
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    assert r.diferenca.dns_removidos == ["DN32 (L/h)"]
+    assert set(r.alteracoes[COLUNA_UNIDADE]) == {"FC-06", "FC-07", "FC-08"}
+    assert r.alteracoes["DN"].isna().all()
+    assert r.alteracoes["Ajuste (%)"].isna().all()
+    _conferir_com_lote_novo(armazem, v2)
+
+
+def test_dn_manual_nao_troca_de_coluna(armazem):
+    _salvar(armazem, _tabela("v1"), automatico=False)
+    v2 = _tabela("v2", dict(CURVAS, **{"DN40 (L/h)": SETTINGS * 25.0}))
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    # Coluna nova não muda DN gravado à mão (nem preenche quem não tinha)
+    assert r.reavaliadas == 0
+    assert r.alteracoes.empty
+    assert armazem.carregar("obra")["DN"].isna().sum() == 3
+
+
+def test_settings_alterados_reavaliam_todas_com_dn(armazem):
+    _salvar(armazem, _tabela("v1"), modo="pchip")
+    v2 = _tabela("v2", settings=SETTINGS + 1)
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    assert r.diferenca.settings_alterados
+    assert r.reavaliadas == 9
+    assert len(r.alteracoes) == 9
+    _conferir_com_lote_novo(armazem, v2, "pchip")
+
+
+def test_vazao_vazia_e_salva_como_null(armazem):
+    unidades = _unidades()
+    unidades.loc[0, COLUNA_VAZAO_M3H] = np.nan
+    _salvar(armazem, _tabela("v1"), unidades=unidades)
+    curvas = dict(CURVAS, **{"DN15 (L/h)": CURVAS["DN15 (L/h)"] * 1.2})
+
+    r = armazem.revalidar("obra", _tabela("v2", curvas), RESOLVEDOR)
+
+    assert r.reavaliadas == 2            # FC-00, sem vazão, nem é lida
+    assert "FC-00" not in set(r.alteracoes[COLUNA_UNIDADE])
+    assert np.isnan(armazem.carregar("obra").loc[0, "Ajuste (%)"])
+
+
+@pytest.mark.parametrize("modo", ["nearest", "linear", "pchip"])
+def test_so_valvulas_perto_da_linha_alterada(armazem, modo):
+    # Muitas válvulas num DN só: mudar uma célula reavalia só as vizinhas dela,
+    # e o resultado continua igual ao de um dimensionamento do zero
+    settings = np.arange(5, 101, 5)
+    curva = settings * 10.0
+    vazoes_lh = np.linspace(20, 1050, 200)
+    unidades = pd.DataFrame({
+        COLUNA_UNIDADE: [f"U{i:03d}" for i in range(len(vazoes_lh))],
+        COLUNA_CAPACIDADE: 12000,
+        COLUNA_VAZAO_M3H: vazoes_lh / 1000,
+    })
+    v1 = _tabela("v1", {"DN15 (L/h)": curva}, settings)
+    armazem.salvar_lote("obra", dimensionar_lote(unidades, v1, modo, RESOLVEDOR), v1, modo)
+    nova = curva.copy()
+    nova[9] = 480.0                  # linha 9: 500 -> 480 (vizinhas: 450 e 550)
+    v2 = _tabela("v2", {"DN15 (L/h)": nova}, settings)
+
+    r = armazem.revalidar("obra", v2, RESOLVEDOR)
+
+    faixa = (450, 550) if modo != "pchip" else (400, 600)
+    esperadas = int(((vazoes_lh >= faixa[0]) & (vazoes_lh <= faixa[1])).sum())
+    assert r.reavaliadas == esperadas < len(vazoes_lh) // 4
+    longe = unidades[COLUNA_UNIDADE][(vazoes_lh < faixa[0]) | (vazoes_lh > faixa[1])]
+    assert not set(r.alteracoes[COLUNA_UNIDADE]) & set(longe)
+
+    esperado = dimensionar_lote(unidades, v2, modo, RESOLVEDOR)
+    obtido = armazem.carregar("obra")
+    np.testing.assert_allclose(obtido["Ajuste (%)"], esperado["Ajuste (%)"])
+    np.testing.assert_allclose(obtido["Vazão ajustada (L/h)"], esperado["Vazão ajustada (L/h)"])
+
+
+@pytest.mark.parametrize("modo", ["nearest", "linear", "pchip"])
+def test_janela_cobre_mudancas_aleatorias(armazem, modo):
+    # A janela de vizinhos não pode deixar de fora nenhuma válvula que mudaria
+    rng = np.random.default_rng(7)
+    settings = np.arange(5, 101, 5)
+    curva = np.cumsum(rng.uniform(5, 40, len(settings)))
+    unidades = pd.DataFrame({
+        COLUNA_UNIDADE: [f"U{i:03d}" for i in range(300)],
+        COLUNA_CAPACIDADE: 12000,
+        COLUNA_VAZAO_M3H: rng.uniform(0, curva[-1] * 1.1, 300) / 1000,
+    })
+    tabela = _tabela("v0", {"DN15 (L/h)": curva}, settings)
+    armazem.salvar_lote("obra", dimensionar_lote(unidades, tabela, modo, RESOLVEDOR), tabela, modo)
+    for versao in range(1, 16):
+        curva = curva.copy()
+        linhas = rng.choice(len(curva), size=rng.integers(1, 3), replace=False)
+        curva[linhas] += rng.normal(0, 15, len(linhas))
+        tabela = _tabela(f"v{versao}", {"DN15 (L/h)": curva}, settings)
+        armazem.revalidar("obra", tabela, RESOLVEDOR)
+
+        esperado = dimensionar_lote(unidades, tabela, modo, RESOLVEDOR)
+        obtido = armazem.carregar("obra")
+        np.testing.assert_allclose(obtido["Ajuste (%)"], esperado["Ajuste (%)"])
+        np.testing.assert_allclose(obtido["Vazão ajustada (L/h)"], esperado["Vazão ajustada (L/h)"])
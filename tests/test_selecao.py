@@ -0,0 +1,111 @@
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from setpoint.dados import COLUNA_CAPACIDADE, COLUNA_DN, TabelaMaquinas
+from setpoint.selecao import (
+    RESOLVEDOR_PADRAO,
+    ResolvedorDN,
+    capacidade_to_dn,
+    dn_automatico,
+    find_matching_dn_column,
+    normalize_label,
+)
+
+DN_OPTIONS = ["DN15 LF (L/h)", "DN15 (L/h)", "DN15 HF (L/h)", "DN20 (L/h)", "DN20 HF (L/h)",
+              "DN25 (L/h)", "DN25 HF (L/h)", "DN32 (L/h)", "DN32 HF (L/h)"]
+
+
+def busca_linear(dn_label, dn_options):
+    # Busca original do main.py: primeira coluna que contém o rótulo normalizado
+    if dn_label is None:
+        return None
+    dn_norm = normalize_label(dn_label)
+    for col in dn_options:
+        if dn_norm in normalize_label(col):
+            return col
+    return None
+
+
+def test_indice_igual_a_busca_linear():
+    rotulos = [None, "", "DN 15", "DN 15 HF", "dn15hf", "DN 15 L/h", "DN 20 HF", "DN 32", "DN 40", "HF", "LF",
+               "L/h", "5", "15 (L", "DN15 HF (L/h)", "DN32 HF (L/h) extra", "x" * 40, "DN 25 HF L/h"]
+    rotulos += list(capacidade_to_dn.values())
+    for opcoes in (DN_OPTIONS, DN_OPTIONS[::-1], DN_OPTIONS[3:], []):
+        for rotulo in rotulos:
+            assert find_matching_dn_column(rotulo, opcoes) == busca_linear(rotulo, opcoes), (rotulo, opcoes)
+
+
+def test_indice_igual_a_busca_linear_com_trechos_aleatorios():
+    sorteio = random.Random(3)
+    normalizadas = [normalize_label(c) for c in DN_OPTIONS]
+    trechos = {n[i:j] for n in normalizadas for i, j in itertools.combinations(range(len(n) + 1), 2)}
+    trechos |= {"".join(sorteio.choices("dn0123456789hflx", k=sorteio.randint(1, 20))) for _ in range(500)}
+    for trecho in trechos:
+        assert find_matching_dn_column(trecho, DN_OPTIONS) == busca_linear(trecho, DN_OPTIONS), trecho
+
+
+@pytest.fixture
+def resolvedor():
+    return ResolvedorDN({12000: "DN 15 HF", 24000: "DN 20", 36000: "DN 32"})
+
+
+@pytest.mark.parametrize("capacidade, rotulo", [
+    (5000, "DN 15 HF"),        # abaixo da menor máquina
+    (12000, "DN 15 HF"),       # ponto de quebra exato
+    (12000.5, "DN 20"),        # logo acima: próxima máquina
+    (18000, "DN 20"),          # entre modelos
+    (24000, "DN 20"),
+    (36000, "DN 32"),          # maior máquina
+    (36001, None),             # acima da maior: sem DN automático
+    (None, None),
+    (float("nan"), None),
+])
+def test_faixas(resolvedor, capacidade, rotulo):
+    assert resolvedor.rotulo(capacidade) == rotulo
+    if capacidade is not None:
+        assert resolvedor.rotulos_de([capacidade]).tolist() == [rotulo]
+
+
+def test_rotulos_de_igual_a_rotulo(resolvedor):
+    caps = np.array([0, 11999, 12000, 12001, 23999.9, 24000, 30000, 36000, 36000.1, 1e9, np.nan])
+    assert resolvedor.rotulos_de(caps).tolist() == [resolvedor.rotulo(c) for c in caps]
+
+
+def test_padrao_reproduz_o_mapa_nas_capacidades_conhecidas():
+    for cap, rotulo in capacidade_to_dn.items():
+        assert RESOLVEDOR_PADRAO.rotulo(cap) == rotulo
+
+
+def test_da_tabela_primeira_linha_e_celulas_vazias():
+    df = pd.DataFrame({
+        COLUNA_CAPACIDADE: [12000, 12000, 24000, np.nan, 36000],
+        COLUNA_DN: ["DN 15 HF", "DN 20", " DN 20 HF ", "DN 32", None],
+    })
+    resolvedor = ResolvedorDN.da_tabela(df, COLUNA_CAPACIDADE, COLUNA_DN)
+    assert len(resolvedor) == 2
+    assert resolvedor.rotulo(12000) == "DN 15 HF"
+    assert resolvedor.rotulo(20000) == "DN 20 HF"
+    assert resolvedor.rotulo(30000) is None
+
+
+def _maquinas(df):
+    return TabelaMaquinas(df=df, capacidades=sorted(df[COLUNA_CAPACIDADE].astype(int).tolist()), versao="teste")
+
+
+def test_planilha_sem_coluna_dn_usa_mapa_padrao():
+    tabela = _maquinas(pd.DataFrame({COLUNA_CAPACIDADE: [10000, 36000]}))
+    assert tabela.resolvedor_dn is RESOLVEDOR_PADRAO
+    assert dn_automatico(36000, DN_OPTIONS, tabela.resolvedor_dn) == "DN20 HF (L/h)"
+    assert dn_automatico(10000, DN_OPTIONS, tabela.resolvedor_dn) == "DN15 (L/h)"
+    assert dn_automatico(60000, DN_OPTIONS, tabela.resolvedor_dn) is None
+
+
+def test_planilha_com_coluna_dn():
+    tabela = _maquinas(pd.DataFrame({COLUNA_CAPACIDADE: [9000, 18000], COLUNA_DN: ["DN 25", "DN 32 HF"]}))
+    assert dn_automatico(9000, DN_OPTIONS, tabela.resolvedor_dn) == "DN25 (L/h)"
+    assert dn_automatico(12000, DN_OPTIONS, tabela.resolvedor_dn) == "DN32 HF (L/h)"
+    assert dn_automatico(18001, DN_OPTIONS, tabela.resolvedor_dn) is None
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+
+from setpoint.servidor import Servidor, calcular_vazoes
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_inteiro_enorme_vira_erro_do_item():
+    resultados = calcular_vazoes([{"capacidade_btuh": 10 ** 400}, {"capacidade_btuh": 12000}])
+    assert "fora da faixa" in resultados[0]["erro"]
+    assert resultados[1]["q_l_h"] > 0
+
+
+async def _pedir(porta: int, caminho: str, corpo: bytes) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    writer.write(f"POST {caminho} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\nConnection: close\r\n\r\n"
+                 .encode("latin-1") + corpo)
+    await writer.drain()
+    resposta = await reader.read()
+    writer.close()
+    cabecalho, _, conteudo = resposta.partition(b"\r\n\r\n")
+    return int(cabecalho.split(b" ")[1]), json.loads(conteudo)
+
+
+def _servidor():
+    return Servidor(os.path.join(RAIZ, "tabela_valvulas.xlsx"),
+                    os.path.join(RAIZ, "Relação de capacidade das máquinas.xlsx"))
+
+
+async def _com_servidor(app, *pedidos):
+    srv = await app.iniciar("127.0.0.1", 0)
+    porta = srv.sockets[0].getsockname()[1]
+    try:
+        return [await _pedir(porta, caminho, corpo) for caminho, corpo in pedidos]
+    finally:
+        srv.close()
+        await srv.wait_closed()
+
+
+def test_http_400_para_inteiro_enorme():
+    corpo = b'{"capacidade_btuh": 1' + b"0" * 400 + b"}"
+    (status, resposta), = asyncio.run(_com_servidor(_servidor(), ("/vazao", corpo)))
+    assert status == 400
+    assert "fora da faixa" in resposta["erro"]
+
+
+def test_http_500_em_falha_inesperada(monkeypatch):
+    def quebra(itens):
+        raise RuntimeError("bug")
+
+    app = _servidor()
+    monkeypatch.setitem(app._processadores, "/faixa", quebra)
+    monkeypatch.setattr(app.agrupadores["/vazao"], "_processar", quebra)
+    respostas = asyncio.run(_com_servidor(
+        app, ("/faixa/lote", b'{"itens": []}'), ("/vazao", b'{"capacidade_btuh": 12000}')))
+    for status, resposta in respostas:
+        assert status == 500
+        assert resposta == {"erro": "Erro interno: RuntimeError."}
+
+
+def test_fluido_nao_textual_vira_erro_do_item():
+    resultados = calcular_vazoes([{"capacidade_btuh": 12000, "fluido": [1]},
+                                  {"capacidade_btuh": 12000, "fluido": {"nome": "agua"}},
+                                  {"capacidade_btuh": 12000}])
+    assert "Fluido inválido" in resultados[0]["erro"]
+    assert "Fluido inválido" in resultados[1]["erro"]
+    assert resultados[2]["q_l_h"] > 0
+
+
+def test_falha_inesperada_na_leitura_fica_no_item(monkeypatch):
+    from setpoint import servidor
+
+    def circuito(item):
+        if item.get("quebra"):
+            raise TypeError("bug")
+        return circuito_original(item)
+
+    circuito_original = servidor._circuito
+    monkeypatch.setattr(servidor, "_circuito", circuito)
+    resultados = calcular_vazoes([{"capacidade_btuh": 12000, "quebra": True}, {"capacidade_btuh": 12000}])
+    assert resultados[0] == {"erro": "Item inválido (TypeError)."}
+    assert resultados[1]["q_l_h"] > 0
+
+
+def test_item_invalido_nao_derruba_o_lote_agrupado():
+    app = Servidor(os.path.join(RAIZ, "tabela_valvulas.xlsx"),
+                   os.path.join(RAIZ, "Relação de capacidade das máquinas.xlsx"), janela_s=0.2)
+
+    async def juntos():
+        srv = await app.iniciar("127.0.0.1", 0)
+        porta = srv.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(
+                _pedir(porta, "/vazao", b'{"capacidade_btuh": 12000}'),
+                _pedir(porta, "/vazao", b'{"capacidade_btuh": 12000, "fluido": [1]}'))
+        finally:
+            srv.close()
+            await srv.wait_closed()
+
+    (status_ok, valido), (status_erro, invalido) = asyncio.run(juntos())
+    assert app.agrupadores["/vazao"].lotes == 1      # os dois no mesmo lote
+    assert status_ok == 200 and valido["q_l_h"] > 0
+    assert status_erro == 400 and "Fluido inválido" in invalido["erro"]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from setpoint import dados, snapshot
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    dados.limpar_cache()
+    yield
+    dados.limpar_cache()
+
+
+def _carregar_duas_vezes(caminho, tipo):
+    carregar = {"valvulas": dados.carregar_tabela_valvulas, "maquinas": dados.carregar_tabela_maquinas}[tipo]
+    do_excel = carregar(str(caminho))
+    snapshot.compilar(str(caminho), tipo)
+    dados.limpar_cache()
+    do_snapshot = carregar(str(caminho))
+    return do_excel, do_snapshot
+
+
+def test_maquinas_celulas_vazias_voltam_como_nan(tmp_path):
+    caminho = tmp_path / "maquinas.xlsx"
+    pd.DataFrame({
+        "Capacidade (Btuh)": [9000, 12000, 18000, 24000],
+        "DN": ["DN 15 L/h", None, "DN 20", "DN 25"],
+        "Obs": [None, None, "reserva", None],
+    }).to_excel(caminho, index=False)
+
+    do_excel, do_snapshot = _carregar_duas_vezes(caminho, "maquinas")
+    assert snapshot.verificar(str(caminho))
+    assert do_snapshot.df["DN"].isna().tolist() == [False, True, False, False]
+    pd.testing.assert_frame_equal(do_snapshot.df, do_excel.df)
+    assert do_snapshot.capacidades == do_excel.capacidades
+    assert do_snapshot.resolvedor_dn.rotulos_de(np.array([12000.0])) == do_excel.resolvedor_dn.rotulos_de(
+        np.array([12000.0]))
+
+
+def test_valvulas_igual_ao_read_excel(tmp_path):
+    caminho = tmp_path / "valvulas.xlsx"
+    pd.DataFrame({
+        "Setting (%)": [10, 20, 30],
+        "DN15 (L/h)": [20.0, np.nan, 60.0],
+        "DN20 (L/h)": [100, 200, 300],
+    }).to_excel(caminho, index=False)
+
+    do_excel, do_snapshot = _carregar_duas_vezes(caminho, "valvulas")
+    pd.testing.assert_frame_equal(do_snapshot.df, do_excel.df)
+    assert do_snapshot.dn_options == do_excel.dn_options
+    assert do_snapshot.versao == do_excel.versao
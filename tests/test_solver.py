@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from setpoint.dados import COLUNA_SETTING
+from setpoint.indice import ValveCurveIndex
+from setpoint.solver import SettingSolver
+
+
+@pytest.fixture
+def indice():
+    df = pd.DataFrame({
+        COLUNA_SETTING: [10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+        "DN15": [60.0, 95.0, 130.0, 170.0, 215.0, 250.0, 300.0, 330.0, 360.0, 380.0],
+        # espaçamento bem irregular (quase patamar seguido de salto): o PCHIP não pode oscilar
+        "DN20": [100.0, 150.0, 160.0, 400.0, 700.0, 720.0, 900.0, 1500.0, 1520.0, 1540.0],
+        "DN25": [np.nan] * 10,
+    })
+    return ValveCurveIndex.from_frame(df)
+
+
+@pytest.fixture
+def solver(indice):
+    return SettingSolver(indice)
+
+
+@pytest.mark.parametrize("modo", ["linear", "pchip"])
+@pytest.mark.parametrize("dn", ["DN15", "DN20"])
+def test_interpolacao_monotonica(solver, indice, dn, modo):
+    vazoes, _ = indice.curva(dn)
+    q = np.linspace(vazoes[0], vazoes[-1], 2001)
+    ajuste, vazao, erro = solver.resolver(dn, q, modo)
+    assert np.all(np.diff(ajuste) >= -1e-9)
+    np.testing.assert_allclose(vazao, q)
+    np.testing.assert_allclose(erro, 0.0, atol=1e-9)
+
+
+@pytest.mark.parametrize("modo", ["linear", "pchip"])
+def test_interpolacao_passa_pelos_pontos(solver, indice, modo):
+    vazoes, settings = indice.curva("DN15")
+    ajuste, _, _ = solver.resolver("DN15", vazoes, modo)
+    np.testing.assert_allclose(ajuste, settings)
+
+
+def test_linear_entre_pontos(solver):
+    ajuste, vazao, _ = solver.resolver_um("DN15", 150.0, "linear")
+    assert ajuste == pytest.approx(35.0)
+    assert vazao == 150.0
+
+
+@pytest.mark.parametrize("modo", ["linear", "pchip"])
+def test_vazoes_fora_da_curva_ficam_nas_pontas(solver, modo):
+    ajuste, vazao, erro = solver.resolver("DN15", [10.0, 1000.0], modo)
+    np.testing.assert_allclose(ajuste, [10.0, 100.0])
+    np.testing.assert_allclose(vazao, [60.0, 380.0])
+    np.testing.assert_allclose(erro, [50.0, -620.0])
+
+
+@pytest.mark.parametrize("dn", ["DN15", "DN20"])
+def test_nearest_igual_ao_indice(solver, indice, dn):
+    q = np.linspace(0.0, 2000.0, 801)
+    ajuste, vazao, erro = solver.resolver(dn, q, "nearest")
+    linhas = indice.nearest_rows(dn, q)
+    np.testing.assert_array_equal(ajuste, indice.settings[linhas])
+    np.testing.assert_array_equal(vazao, indice.flows_at_rows(dn, linhas))
+    np.testing.assert_array_equal(erro, vazao - q)
+    for i in range(0, len(q), 50):
+        assert (ajuste[i], vazao[i]) == indice.nearest(dn, q[i])
+
+
+@pytest.mark.parametrize("modo", ["nearest", "linear", "pchip"])
+@pytest.mark.parametrize("dn", ["DN25", "DN99"])
+def test_dn_vazio_ou_desconhecido_levanta_valueerror(solver, dn, modo):
+    with pytest.raises(ValueError):
+        solver.resolver(dn, [100.0], modo)
+
+
+def test_modo_invalido(solver):
+    with pytest.raises(ValueError):
+        solver.resolver("DN15", [100.0], "cubic")
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from setpoint.tarefas import FilaTarefas, arquivo_resultado
+
+
+def _gravar(destino, progresso):
+    with open(destino, "wb") as f:
+        f.write(b"x")
+    return destino
+
+
+def test_arquivo_resultado_usa_a_chave_inteira(tmp_path):
+    a = arquivo_resultado(("lote", "v1", "nearest", "abc"), "xlsx", str(tmp_path))
+    assert a == arquivo_resultado(("lote", "v1", "nearest", "abc"), "xlsx", str(tmp_path))
+    assert a != arquivo_resultado(("lote", "v2", "nearest", "abc"), "xlsx", str(tmp_path))
+    assert a != arquivo_resultado(("lote", "v1", "pchip", "abc"), "xlsx", str(tmp_path))
+    assert a.endswith(".xlsx") and os.path.dirname(a) == str(tmp_path)
+
+
+def test_descarte_apaga_o_arquivo_do_resultado(tmp_path):
+    fila = FilaTarefas(max_workers=1, max_resultados=1)
+    caminhos = [arquivo_resultado(i, "pdf", str(tmp_path)) for i in range(2)]
+    fila.solicitar(0, _gravar, caminhos[0]).resultado(timeout=5)
+    assert os.path.exists(caminhos[0])
+
+    fila.solicitar(1, _gravar, caminhos[1]).resultado(timeout=5)
+    fila.solicitar(2, lambda progresso: b"em memoria").resultado(timeout=5)
+    assert fila.obter(0) is None
+    assert not os.path.exists(caminhos[0])
+
+
+def test_descarte_de_tarefa_com_falha(tmp_path):
+    def falha(progresso):
+        raise RuntimeError("boom")
+
+    fila = FilaTarefas(max_workers=1, max_resultados=0)
+    with pytest.raises(RuntimeError):
+        fila.solicitar("a", falha).resultado(timeout=5)
+    fila.solicitar("b", lambda progresso: b"ok").resultado(timeout=5)
+    assert fila.obter("a") is None